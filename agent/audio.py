@@ -1,43 +1,162 @@
-from gtts import gTTS
-import speech_recognition as sr
 import io
-import os
+import re
+from concurrent.futures import ThreadPoolExecutor, wait
+from agent.audio_cache import get_tts_cache, tts_cache_key
+from agent.speech_backends import ASR_SAMPLE_RATE, get_tts_backend, get_asr_backend
+from agent.wav import load_mono, trim_silence, split_at_pauses, write_wav
+import config
+
+# Shared pool for speech synthesis so audio can be produced off the script thread
+_tts_executor = ThreadPoolExecutor(max_workers=config.TTS_WORKERS, thread_name_prefix="tts")
+# Background prewarming of uploaded banks; kept apart so it cannot starve live questions
+_prewarm_executor = ThreadPoolExecutor(max_workers=config.TTS_PREWARM_WORKERS, thread_name_prefix="tts-prewarm")
+# Chunks of one long voice answer are recognized in parallel
+_asr_executor = ThreadPoolExecutor(max_workers=config.ASR_WORKERS, thread_name_prefix="asr")
+
+# A sentence ends with . ! or ? followed by whitespace. Very short fragments
+# (e.g. "e.g.") are merged into the next sentence.
+_SENTENCE_END = re.compile(r"[.!?]+\s+")
+_MIN_SENTENCE_CHARS = 40
 
 def text_to_speech_bytes(text: str) -> io.BytesIO:
     """
-    Converts text to speech using gTTS and returns audio bytes.
+    Converts text to speech with the configured TTS backend and returns audio bytes.
+    Results are cached by content hash (memory LRU + disk, see agent/audio_cache.py).
     """
     try:
         if not text.strip():
             return None
-            
-        tts = gTTS(text=text, lang='en')
-        fp = io.BytesIO()
-        tts.write_to_fp(fp)
+
+        backend = get_tts_backend()
+        cache = get_tts_cache()
+        key = tts_cache_key(text, backend.voice)
+        audio = cache.get(key) if cache else None
+        if audio is None:
+            audio = backend.synthesize(text)
+            if cache:
+                cache.put(key, audio)
+        fp = io.BytesIO(audio)
         fp.seek(0)
         return fp
     except Exception as e:
         print(f"Error in TTS: {e}")
         return None
 
+def prewarm_tts(questions: list, block: bool = True) -> dict:
+    """
+    Synthesizes audio for every question (e.g. an uploaded question bank) into
+    the TTS cache so those questions play without a synthesis round trip.
+    Runs on its own pool (TTS_PREWARM_WORKERS), never on the one live questions use.
+    With block=False the work is queued and this returns at once.
+    Returns {"total", "cached", "synthesized", "failed"} (counts are only complete when blocking).
+    """
+    cache = get_tts_cache()
+    texts = list(dict.fromkeys(q.strip() for q in questions if q and q.strip()))
+    result = {"total": len(texts), "cached": 0, "synthesized": 0, "failed": 0}
+    if cache is None:
+        return result
+    voice = get_tts_backend().voice
+    pending = []
+    for text in texts:
+        if cache.get(tts_cache_key(text, voice)) is not None:
+            result["cached"] += 1
+        else:
+            pending.append(text)
+    futures = [_prewarm_executor.submit(text_to_speech_bytes, text) for text in pending]
+    if not block:
+        return result
+    wait(futures)
+    for future in futures:
+        if future.result() is None:
+            result["failed"] += 1
+        else:
+            result["synthesized"] += 1
+    return result
+
+def tts_audio_format() -> str:
+    """
+    MIME type of the audio returned by text_to_speech_bytes, for st.audio.
+    """
+    return f"audio/{get_tts_backend().format}"
+
 def audio_bytes_to_text(audio_bytes: bytes) -> str:
     """
-    Converts audio bytes to text using SpeechRecognition.
-    Assumes wav format if possible, but might need conversion.
+    Converts a WAV recording to text with the configured ASR backend.
     'streamlit-mic-recorder' returns wav bytes usually.
+    The recording is resampled to 16 kHz mono and trimmed of leading/trailing
+    silence; long answers are split at pauses into chunks that are transcribed
+    concurrently and joined in order.
     """
-    r = sr.Recognizer()
+    backend = get_asr_backend()
     try:
-        # Create a file-like object from bytes
-        audio_file = io.BytesIO(audio_bytes)
-        
-        with sr.AudioFile(audio_file) as source:
-            audio_data = r.record(source)
-            text = r.recognize_google(audio_data)
-            return text
-    except sr.UnknownValueError:
-        return ""
-    except sr.RequestError as e:
-        return f"Error: {e}"
+        try:
+            samples = trim_silence(load_mono(audio_bytes, ASR_SAMPLE_RATE), ASR_SAMPLE_RATE, config.ASR_SILENCE_DB)
+        except ValueError:
+            # Not a WAV we can decode; let the backend try the original bytes
+            return backend.transcribe(audio_bytes)
+        if not len(samples):
+            return ""
+        ranges = split_at_pauses(
+            samples, ASR_SAMPLE_RATE,
+            max_seconds=config.ASR_CHUNK_SECONDS,
+            min_pause_seconds=config.ASR_MIN_PAUSE_SECONDS,
+            silence_db=config.ASR_SILENCE_DB,
+        )
+        chunks = [write_wav(samples[start:end], ASR_SAMPLE_RATE) for start, end in ranges]
+        if len(chunks) == 1:
+            return backend.transcribe(chunks[0])
+        texts = _asr_executor.map(backend.transcribe, chunks)
+        return " ".join(t.strip() for t in texts if t and t.strip())
     except Exception as e:
         return f"Error converting audio: {e}"
+
+def _synthesize_segment(text: str) -> bytes:
+    fp = text_to_speech_bytes(text)
+    return fp.getvalue() if fp else b""
+
+class SentenceAudioSynthesizer:
+    """
+    Collects streamed question tokens and starts TTS for every complete
+    sentence as soon as it is available. The segments are joined in order
+    by `finish()`.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._streamed = ""
+        self._futures = []
+
+    def feed(self, token: str):
+        self._buffer += token
+        self._streamed += token
+        start = 0
+        for match in _SENTENCE_END.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            if len(sentence) >= _MIN_SENTENCE_CHARS:
+                self._futures.append(_tts_executor.submit(_synthesize_segment, sentence))
+                start = match.end()
+        self._buffer = self._buffer[start:]
+
+    def finish(self, final_text: str | None = None) -> io.BytesIO:
+        """
+        Synthesizes whatever is left and returns the complete audio.
+        If nothing was streamed (e.g. a bank question), or the streamed text is
+        not the final question (it was replaced by a retry), `final_text` is spoken whole.
+        """
+        tail = self._buffer.strip()
+        if final_text and " ".join(self._streamed.split()) != " ".join(final_text.split()):
+            self._futures = []
+        if not self._futures and final_text:
+            tail = final_text.strip()
+        if tail:
+            self._futures.append(_tts_executor.submit(_synthesize_segment, tail))
+        self._buffer = ""
+        self._streamed = ""
+
+        audio = get_tts_backend().join([f.result() for f in self._futures])
+        self._futures = []
+        if not audio:
+            return None
+        fp = io.BytesIO(audio)
+        fp.seek(0)
+        return fp
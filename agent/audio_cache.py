@@ -0,0 +1,159 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Optional
+from agent.logger import get_logger
+from agent.speech_backends import get_tts_backend
+import config
+
+logger = get_logger(__name__)
+
+def tts_cache_key(text: str, voice: str = "gtts:en") -> str:
+    """
+    Content hash of the spoken text (whitespace-normalized) and the voice that speaks it.
+    """
+    normalized = " ".join(text.split())
+    return hashlib.sha256(f"{voice}\n{normalized}".encode("utf-8")).hexdigest()
+
+class AudioCache:
+    """
+    Byte-bounded in-memory LRU in front of a size-bounded directory of files.
+    Disk entries are evicted least recently used first (mtime is bumped on every hit).
+    Safe to share between threads.
+    """
+
+    def __init__(self, directory: str, memory_bytes: int, disk_bytes: int, suffix: str = ".mp3"):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.suffix = suffix
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_size = 0
+        self._disk_size: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + self.suffix)
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return data
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes):
+        if not data:
+            return
+        with self._lock:
+            self._remember(key, data)
+        path = self._path(key)
+        if os.path.exists(path):
+            return
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write then rename so readers never see a partial file
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.warning(f"Audio cache write failed: {e}")
+            return
+        with self._lock:
+            if self._disk_size is None:
+                self._disk_size = self._scan_size()
+            else:
+                self._disk_size += len(data)
+            if self._disk_size > self.disk_bytes:
+                self._evict_disk()
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = data
+        self._memory_size += len(data)
+        while self._memory_size > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_size -= len(old)
+
+    def _entries(self):
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(self.suffix):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    yield path, st.st_size, st.st_mtime
+
+    def _scan_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict_disk(self):
+        # Drop oldest files until the store is back under 90% of its budget
+        target = int(self.disk_bytes * 0.9)
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        size = sum(e[1] for e in entries)
+        for path, file_size, _ in entries:
+            if size <= target:
+                break
+            try:
+                os.remove(path)
+                size -= file_size
+            except OSError:
+                pass
+        self._disk_size = size
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_size,
+                "disk_bytes": self._disk_size if self._disk_size is not None else self._scan_size(),
+            }
+
+_tts_cache: Optional[AudioCache] = None
+_tts_cache_lock = threading.Lock()
+
+def get_tts_cache() -> Optional[AudioCache]:
+    """
+    Process-wide cache of synthesized question audio, or None if disabled.
+    """
+    global _tts_cache
+    if not config.TTS_CACHE_ENABLED:
+        return None
+    if _tts_cache is None:
+        with _tts_cache_lock:
+            if _tts_cache is None:
+                _tts_cache = AudioCache(
+                    config.TTS_CACHE_DIR,
+                    memory_bytes=config.TTS_CACHE_MEMORY_MB * 1024 * 1024,
+                    disk_bytes=config.TTS_CACHE_DISK_MB * 1024 * 1024,
+                    suffix="." + get_tts_backend().format,
+                )
+    return _tts_cache
@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from agent.audio_cache import AudioCache
+from agent.logger import get_logger
+from agent.wav import normalize_wav
+import config
+
+logger = get_logger(__name__)
+
+# Interview audio (question speech, recorded answers) lives in one
+# content-addressed directory shared by all sessions. Session state only keeps
+# small references ({"key", "format"}); each session holds at most
+# AUDIO_SESSION_MEMORY_MB of clip bytes and reads the rest back from disk.
+
+_disk: Optional[AudioCache] = None
+_disk_lock = threading.Lock()
+
+def _get_disk() -> AudioCache:
+    global _disk
+    if _disk is None:
+        with _disk_lock:
+            if _disk is None:
+                # No shared memory tier: each session keeps its own bounded one
+                _disk = AudioCache(
+                    config.AUDIO_STORE_DIR,
+                    memory_bytes=0,
+                    disk_bytes=config.AUDIO_STORE_DISK_MB * 1024 * 1024,
+                    suffix=".bin",
+                )
+    return _disk
+
+def compress_answer(wav_bytes: bytes) -> bytes:
+    """
+    Recorded answers are kept as 16-bit mono WAV at ANSWER_AUDIO_SAMPLE_RATE.
+    Input that cannot be decoded is stored unchanged.
+    """
+    try:
+        return normalize_wav(wav_bytes, config.ANSWER_AUDIO_SAMPLE_RATE)
+    except ValueError as e:
+        logger.warning(f"Answer audio kept as recorded: {e}")
+        return wav_bytes
+
+class SessionAudio:
+    """
+    Audio references of one interview session with a byte-bounded LRU of
+    recently used clips in front of the shared on-disk store.
+    """
+
+    def __init__(self, memory_bytes: Optional[int] = None):
+        self.memory_bytes = config.AUDIO_SESSION_MEMORY_MB * 1024 * 1024 if memory_bytes is None else memory_bytes
+        self._recent: "OrderedDict[str, bytes]" = OrderedDict()
+        self._recent_size = 0
+
+    def put(self, data: bytes, format: str) -> Optional[Dict[str, str]]:
+        """
+        Stores `data` (MIME type `format`) and returns its reference, or None if empty.
+        """
+        if not data:
+            return None
+        key = hashlib.sha256(data).hexdigest()
+        _get_disk().put(key, data)
+        self._remember(key, data)
+        return {"key": key, "format": format}
+
+    def put_answer(self, wav_bytes: bytes) -> Tuple[Optional[Dict[str, str]], bytes]:
+        """
+        Stores a recorded answer via compress_answer. Returns (reference, stored WAV bytes);
+        the stored bytes are 16 kHz mono, which is also what the recognizer needs.
+        """
+        answer_wav = compress_answer(wav_bytes)
+        return self.put(answer_wav, "audio/wav"), answer_wav
+
+    def get(self, ref: Optional[Dict[str, str]]) -> Optional[bytes]:
+        if not ref:
+            return None
+        key = ref["key"]
+        data = self._recent.get(key)
+        if data is not None:
+            self._recent.move_to_end(key)
+            return data
+        data = _get_disk().get(key)
+        if data is None:
+            logger.warning(f"Session audio {key[:12]} is no longer on disk")
+            return None
+        self._remember(key, data)
+        return data
+
+    def _remember(self, key: str, data: bytes):
+        if key in self._recent or len(data) > self.memory_bytes:
+            return
+        self._recent[key] = data
+        self._recent_size += len(data)
+        while self._recent_size > self.memory_bytes:
+            _, old = self._recent.popitem(last=False)
+            self._recent_size -= len(old)
+
+    @property
+    def memory_used(self) -> int:
+        return self._recent_size
@@ -1,12 +1,17 @@
-import requests
-import json
+from concurrent.futures import ThreadPoolExecutor
+from agent import sandbox
+import config
 
-PISTON_API_URL = "https://emkc.org/api/v2/piston"
+# config.CODE_EXEC_BACKEND selects the local sandbox (agent/sandbox.py) or the
+# public Piston API. Both return Piston's response shape.
 
 def get_runtimes():
-    """Fetch available languages from Piston."""
+    """Fetch available languages."""
+    if config.CODE_EXEC_BACKEND == "local":
+        return sandbox.get_runtimes()
     try:
-        response = requests.get(f"{PISTON_API_URL}/runtimes")
+        import requests
+        response = requests.get(f"{config.PISTON_API_URL}/runtimes", timeout=config.PISTON_TIMEOUT_SECONDS)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -15,11 +20,14 @@ def get_runtimes():
 
 def execute_code(language, code, stdin=""):
     """
-    Execute code using Piston API.
+    Execute code in the local sandbox or with the Piston API.
     language: str (e.g., 'python', 'javascript')
     code: str
     stdin: str (Input for the program)
     """
+    if config.CODE_EXEC_BACKEND == "local":
+        return sandbox.execute(language, code, stdin)
+
     # Map common names to Piston versions if needed, or rely on wildcard
     payload = {
         "language": language,
@@ -33,12 +41,24 @@ def execute_code(language, code, stdin=""):
     }
     
     try:
-        response = requests.post(f"{PISTON_API_URL}/execute", json=payload)
+        import requests
+        response = requests.post(f"{config.PISTON_API_URL}/execute", json=payload, timeout=config.PISTON_TIMEOUT_SECONDS)
         response.raise_for_status()
         return response.json()
     except Exception as e:
         return {"run": {"output": f"Error executing code: {e}", "code": -1}}
 
+def _execute_all(language, code, inputs):
+    # Local: compile once, then run the test inputs concurrently on warm workers
+    if config.CODE_EXEC_BACKEND != "local":
+        return [execute_code(language, code, stdin) for stdin in inputs]
+    program = sandbox.prepare(language, code)
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, config.CODE_EXEC_WARM_WORKERS)) as executor:
+            return list(executor.map(lambda stdin: sandbox.run(program, stdin), inputs))
+    finally:
+        sandbox.cleanup(program)
+
 def run_test_cases(language, code, test_cases):
     """
     Run code against a list of test cases.
@@ -56,12 +76,11 @@ def run_test_cases(language, code, test_cases):
     passed = 0
     full_output = ""
     
-    for i, test in enumerate(test_cases, 1):
+    exec_results = _execute_all(language, code, [test.get("input", "") for test in test_cases])
+    for i, (test, exec_result) in enumerate(zip(test_cases, exec_results), 1):
         stdin = test.get("input", "")
         expected = test.get("output", "").strip()
         
-        exec_result = execute_code(language, code, stdin)
-        
         run_data = exec_result.get("run", {})
         actual_output = run_data.get("stdout", "").strip()
         stderr = run_data.get("stderr", "")
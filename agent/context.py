@@ -0,0 +1,92 @@
+import re
+from typing import Dict, List, Tuple
+import config
+
+# Rough size heuristic for Llama-style tokenizers on English text
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s")
+
+_CONCEPTS_HEADING = "Earlier questions (summarized):\n"
+_TURNS_HEADING = "Recent turns:\n"
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count of `text` (no tokenizer needed).
+    """
+    if not text:
+        return 0
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+def summarize_question(question: str, max_words: int = 15) -> str:
+    """
+    Compact one-line form of a question for the covered-concepts list:
+    the first sentence, without markdown, capped at `max_words` words.
+    """
+    text = " ".join(question.replace("*", "").replace("#", "").split())
+    first_sentence = _SENTENCE_END.split(text, maxsplit=1)[0]
+    words = first_sentence.split()
+    if len(words) > max_words:
+        return " ".join(words[:max_words]) + "..."
+    return first_sentence
+
+def build_question_context(history: List[Dict[str, str]], covered_concepts: List[str],
+                           token_budget: int | None = None, recent_turns: int | None = None) -> Tuple[str, int]:
+    """
+    Builds the history section of the question prompt within a token budget.
+    The most recent turns are kept verbatim (newest first until the budget or
+    `recent_turns` is reached); older questions are listed only by their
+    compact concept from `covered_concepts`.
+    Returns (context_text, estimated_tokens).
+    """
+    token_budget = token_budget or config.QUESTION_CONTEXT_TOKEN_BUDGET
+    if recent_turns is None:
+        recent_turns = config.QUESTION_CONTEXT_RECENT_TURNS
+
+    # Counted in characters (line plus its newline) so the joined text,
+    # section headings included, stays within the budget
+    budget = token_budget * CHARS_PER_TOKEN - len(_CONCEPTS_HEADING) - len(_TURNS_HEADING)
+
+    # Fill the budget from the newest turn backwards; follow-ups need those most
+    turn_lines = []
+    used = 0
+    start = len(history)
+    for msg in reversed(history[-recent_turns:] if recent_turns > 0 else []):
+        line = f"{msg['role']}: {msg['content']}"
+        cost = len(line) + 1
+        if used + cost > budget:
+            if not turn_lines:
+                # Always keep the latest message, truncated if needed
+                line = line[: max(0, budget - 1)]
+                turn_lines.append(line)
+                used += len(line) + 1
+                start -= 1
+            break
+        turn_lines.append(line)
+        used += cost
+        start -= 1
+    turn_lines.reverse()
+
+    # Older questions are represented by their stored concept (or a fresh summary)
+    older_questions = [m["content"] for m in history[:start] if m["role"] == "assistant"]
+    concepts = [
+        covered_concepts[i] if i < len(covered_concepts) else summarize_question(q)
+        for i, q in enumerate(older_questions)
+    ]
+    concept_lines = []
+    for concept in reversed(concepts):
+        line = f"- {concept}"
+        cost = len(line) + 1
+        if used + cost > budget:
+            break
+        concept_lines.append(line)
+        used += cost
+    concept_lines.reverse()
+
+    sections = []
+    if concept_lines:
+        sections.append(_CONCEPTS_HEADING + "\n".join(concept_lines))
+    if turn_lines:
+        sections.append(_TURNS_HEADING + "\n".join(turn_lines) if concept_lines else "\n".join(turn_lines))
+    context = "\n\n".join(sections)
+    return context, estimate_tokens(context)
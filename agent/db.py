@@ -1,14 +1,145 @@
+import atexit
 import sqlite3
 import json
+import hashlib
+import queue
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 import os
+import config
+from agent.metrics import is_skipped, summarize_evaluations
 
 DB_PATH = "candidates.db"
 
-def init_db():
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
+# Connection pools keyed by database path. Streamlit runs every rerun on a new
+# thread, so connections are pooled (check_same_thread=False) instead of
+# thread-local, and only ever used by one thread at a time.
+_pools: dict = {}
+_pools_lock = threading.Lock()
+
+def _open_connection(path: str) -> sqlite3.Connection:
+    # isolation_level=None: autocommit reads; writes use explicit transactions (see transaction())
+    conn = sqlite3.connect(
+        path,
+        timeout=config.DB_BUSY_TIMEOUT_MS / 1000,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    conn.row_factory = sqlite3.Row
+    # WAL lets dashboard readers run while interview results are being written
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA busy_timeout={int(config.DB_BUSY_TIMEOUT_MS)}")
+    conn.execute(f"PRAGMA cache_size=-{int(config.DB_CACHE_SIZE_KB)}")
+    conn.execute(f"PRAGMA mmap_size={int(config.DB_MMAP_SIZE_BYTES)}")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    # evaluations rows are removed with their candidate (ON DELETE CASCADE)
+    conn.execute("PRAGMA foreign_keys=ON")
+    return conn
+
+def _get_pool(path: str) -> queue.LifoQueue:
+    with _pools_lock:
+        pool = _pools.get(path)
+        if pool is None:
+            pool = queue.LifoQueue(maxsize=config.DB_POOL_SIZE)
+            _pools[path] = pool
+        return pool
+
+@contextmanager
+def connection(path: str | None = None):
+    """
+    Borrows a pooled connection (autocommit mode) for reads or single statements.
+    """
+    path = path or DB_PATH
+    pool = _get_pool(path)
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open_connection(path)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+@contextmanager
+def transaction(path: str | None = None):
+    """
+    Borrows a pooled connection inside a write transaction.
+    BEGIN IMMEDIATE takes the write lock up front, so concurrent writers wait
+    on busy_timeout instead of failing with "database is locked" mid-transaction.
+    Commits on success, rolls back on error.
+    """
+    with connection(path) as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+def close_all_connections():
+    """
+    Closes every pooled connection (e.g. before deleting or replacing a DB file).
+    """
+    flush_screening_cache_stats()
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    # A replaced file has to be migrated again
+    _migrated_paths.clear()
+    _load_question_bank.cache_clear()
+    for pool in pools:
+        while True:
+            try:
+                pool.get_nowait().close()
+            except queue.Empty:
+                break
+
+# Databases already migrated by this process (init_db is called on every Streamlit rerun)
+_migrated_paths: set = set()
+_migrate_lock = threading.Lock()
+
+def init_db(path: str | None = None):
+    """
+    Brings the schema up to date. The version is kept in PRAGMA user_version;
+    pending MIGRATIONS run in one BEGIN IMMEDIATE transaction, so concurrent
+    processes wait for each other and each step is applied once.
+    After the first call per process this is a set lookup.
+    """
+    path = path or DB_PATH
+    if path in _migrated_paths:
+        return
+    with _migrate_lock:
+        if path in _migrated_paths:
+            return
+        with transaction(path) as conn:
+            # Re-read inside the write lock: another process may have migrated already
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, migration in enumerate(MIGRATIONS[version:], start=version + 1):
+                print(f"Migrating DB: {migration.__doc__.strip()} (version {target})")
+                migration(conn)
+                conn.execute(f"PRAGMA user_version = {target}")
+        _migrated_paths.add(path)
+
+def _column_names(conn: sqlite3.Connection, table: str) -> set:
+    return {row["name"] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def _add_column(conn: sqlite3.Connection, table: str, column: str, definition: str):
+    # Databases created before versioning may already have the column
+    if column not in _column_names(conn, table):
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
+def _migrate_candidates(conn: sqlite3.Connection):
+    """candidates table"""
+    conn.execute('''
         CREATE TABLE IF NOT EXISTS candidates (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             name TEXT UNIQUE,
@@ -26,99 +157,693 @@ def init_db():
             timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
         )
     ''')
-    
-    # Migration Check
-    try:
-        c.execute("SELECT final_summary FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        print("Migrating DB: Adding final_summary column...")
-        c.execute("ALTER TABLE candidates ADD COLUMN final_summary TEXT DEFAULT NULL")
-        c.execute("ALTER TABLE candidates ADD COLUMN can_hire TEXT DEFAULT NULL")
-    
-    try:
-        c.execute("SELECT question_bank FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        print("Migrating DB: Adding question_bank column...")
-        c.execute("ALTER TABLE candidates ADD COLUMN question_bank TEXT DEFAULT NULL")
+    # Columns added to candidates before versioned migrations existed
+    _add_column(conn, "candidates", "final_summary", "TEXT DEFAULT NULL")
+    _add_column(conn, "candidates", "can_hire", "TEXT DEFAULT NULL")
+    _add_column(conn, "candidates", "question_bank", "TEXT DEFAULT NULL")
+    _add_column(conn, "candidates", "years_of_experience", "REAL DEFAULT 0")
 
-    try:
-        c.execute("SELECT years_of_experience FROM candidates LIMIT 1")
-    except sqlite3.OperationalError:
-        print("Migrating DB: Adding years_of_experience column...")
-        c.execute("ALTER TABLE candidates ADD COLUMN years_of_experience REAL DEFAULT 0")
+def _migrate_screening_cache(conn: sqlite3.Connection):
+    """resume screening cache"""
+    # Content-addressed LLM results
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS screening_cache (
+            cache_key TEXT PRIMARY KEY,
+            prompt_version TEXT NOT NULL,
+            result TEXT NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS screening_cache_stats (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+def _migrate_llm_calls(conn: sqlite3.Connection):
+    """LLM call metrics"""
+    # Per-call LLM latency and token accounting
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS llm_calls (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            node TEXT NOT NULL,
+            interview_id TEXT,
+            model TEXT,
+            prompt_tokens INTEGER,
+            completion_tokens INTEGER,
+            tokens_estimated INTEGER DEFAULT 0,
+            ttft_ms REAL,
+            latency_ms REAL,
+            status TEXT NOT NULL,
+            error TEXT,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_node ON llm_calls (node, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_calls_interview ON llm_calls (interview_id)")
+
+def _migrate_evaluations(conn: sqlite3.Connection):
+    """evaluations table"""
+    # One row per answered/skipped question (replaces the candidates.interview_data JSON blob)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS evaluations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+            question_index INTEGER NOT NULL,
+            question TEXT,
+            answer TEXT,
+            score NUMERIC DEFAULT 0,
+            feedback TEXT,
+            duration REAL,
+            skipped INTEGER NOT NULL DEFAULT 0,
+            complexity INTEGER,
+            topics TEXT
+        )
+    ''')
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_evaluations_candidate ON evaluations (candidate_id, question_index)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_evaluations_skipped ON evaluations (candidate_id, skipped)")
+    _backfill_evaluations(conn)
+
+def _migrate_listing_indexes(conn: sqlite3.Connection):
+    """candidate listing indexes"""
+    # Keyset pagination on (timestamp, id) plus the filterable columns
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_timestamp ON candidates (timestamp, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_status ON candidates (status, timestamp, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_can_hire ON candidates (can_hire, timestamp, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_resume_score ON candidates (resume_score)")
+
+def _migrate_candidate_summaries(conn: sqlite3.Connection):
+    """interview summary columns"""
+    # Maintained by update_interview_result
+    for column, definition in SUMMARY_COLUMNS.items():
+        _add_column(conn, "candidates", column, definition)
+    backfill_candidate_summaries(conn)
+    # Screened (not yet interviewed) candidates sort last: NULL score -> -1
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_interview_score ON candidates (COALESCE(interview_score, -1), id)")
+
+def _migrate_question_banks(conn: sqlite3.Connection):
+    """shared question bank store"""
+    # Questions and banks are deduplicated by content hash; candidates reference a bank
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS questions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT NOT NULL UNIQUE,
+            text TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS question_banks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            content_hash TEXT NOT NULL UNIQUE,
+            question_count INTEGER NOT NULL,
+            created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS question_bank_items (
+            bank_id INTEGER NOT NULL REFERENCES question_banks (id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            question_id INTEGER NOT NULL REFERENCES questions (id),
+            PRIMARY KEY (bank_id, position)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS candidate_question_usage (
+            candidate_id INTEGER NOT NULL REFERENCES candidates (id) ON DELETE CASCADE,
+            question_id INTEGER NOT NULL REFERENCES questions (id),
+            used_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (candidate_id, question_id)
+        ) WITHOUT ROWID
+    ''')
+    _add_column(conn, "candidates", "question_bank_id", "INTEGER REFERENCES question_banks (id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_candidates_question_bank ON candidates (question_bank_id)")
+
+    # Move per-candidate question_bank JSON copies into the shared store
+    rows = conn.execute(
+        "SELECT id, name, question_bank FROM candidates WHERE question_bank IS NOT NULL AND question_bank != ''"
+    ).fetchall()
+    for row in rows:
+        try:
+            questions = json.loads(row["question_bank"])
+        except Exception as e:
+            print(f"Error migrating question bank for {row['name']}: {e}")
+            continue
+        bank_id = _save_question_bank(conn, questions if isinstance(questions, list) else [])
+        conn.execute("UPDATE candidates SET question_bank = NULL, question_bank_id = ? WHERE id = ?", (bank_id, row["id"]))
+
+# Ordered schema steps; a database at user_version N has run the first N.
+# Append new steps at the end, never reorder or edit released ones.
+MIGRATIONS = [
+    _migrate_candidates,
+    _migrate_screening_cache,
+    _migrate_llm_calls,
+    _migrate_evaluations,
+    _migrate_listing_indexes,
+    _migrate_candidate_summaries,
+    _migrate_question_banks,
+]
+
+# Interview summary columns on candidates (see agent.metrics.summarize_evaluations)
+SUMMARY_COLUMNS = {
+    "evaluation_count": "INTEGER DEFAULT 0",
+    "answered_count": "INTEGER DEFAULT 0",
+    "skipped_count": "INTEGER DEFAULT 0",
+    "total_score": "REAL DEFAULT 0",
+    "total_duration": "REAL DEFAULT 0",
+}
+
+def _evaluation_rows(candidate_id: int, evaluations: list) -> list:
+    return [
+        (
+            candidate_id,
+            idx,
+            item.get("question"),
+            item.get("user_answer"),
+            item.get("score", 0),
+            item.get("feedback"),
+            item.get("duration"),
+            int(is_skipped(item)),
+            item.get("complexity"),
+            json.dumps(item.get("topics") or []),
+        )
+        for idx, item in enumerate(evaluations)
+    ]
 
-        
-    conn.commit()
-    conn.close()
+def _insert_evaluations(conn: sqlite3.Connection, candidate_id: int, evaluations: list):
+    conn.execute("DELETE FROM evaluations WHERE candidate_id = ?", (candidate_id,))
+    conn.executemany('''
+        INSERT INTO evaluations (candidate_id, question_index, question, answer, score, feedback,
+                                 duration, skipped, complexity, topics)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', _evaluation_rows(candidate_id, evaluations))
+
+def _backfill_evaluations(conn: sqlite3.Connection):
+    """
+    Moves legacy candidates.interview_data blobs into the evaluations table.
+    The blob is cleared once copied, so each row is only migrated once.
+    """
+    rows = conn.execute(
+        "SELECT id, name, interview_data FROM candidates WHERE interview_data IS NOT NULL AND interview_data != ''"
+    ).fetchall()
+    for row in rows:
+        try:
+            evaluations = json.loads(row["interview_data"])
+        except Exception as e:
+            print(f"Error migrating interview data for {row['name']}: {e}")
+            continue
+        _insert_evaluations(conn, row["id"], evaluations if isinstance(evaluations, list) else [])
+        conn.execute("UPDATE candidates SET interview_data = NULL WHERE id = ?", (row["id"],))
+
+def backfill_candidate_summaries(conn: sqlite3.Connection | None = None):
+    """
+    Recomputes the summary columns (and the fair interview_score) of every
+    completed candidate from the evaluations table. Runs as part of the
+    summary-columns migration; inside the caller's transaction if `conn` is given.
+    """
+    sql = '''
+        UPDATE candidates SET
+            evaluation_count = s.evaluation_count,
+            answered_count = s.answered_count,
+            skipped_count = s.skipped_count,
+            total_score = s.total_score,
+            total_duration = s.total_duration,
+            interview_score = CASE WHEN s.evaluation_count > 0 THEN s.total_score / ? ELSE interview_score END
+        FROM (
+            SELECT candidate_id,
+                   COUNT(*) AS evaluation_count,
+                   SUM(1 - skipped) AS answered_count,
+                   SUM(skipped) AS skipped_count,
+                   SUM(score) AS total_score,
+                   COALESCE(SUM(duration), 0) AS total_duration
+            FROM evaluations GROUP BY candidate_id
+        ) AS s
+        WHERE s.candidate_id = candidates.id
+    '''
+    params = (float(config.MAX_QUESTIONS_DEFAULT or 1),)
+    if conn is not None:
+        conn.execute(sql, params)
+        return
+    with transaction() as conn:
+        conn.execute(sql, params)
 
 def add_candidate(name: str, score: int, analysis: dict, topics: list, question_bank: list | None = None, years_of_experience: float = 0):
     try:
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        
-        # Check if exists, update if so (or ignore)
-        # For this logic, we'll INSERT OR REPLACE or just INSERT
-        
-        c.execute('''
-            INSERT OR REPLACE INTO candidates (name, resume_score, resume_analysis, extracted_topics, question_bank, years_of_experience, status)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (name.lower(), score, json.dumps(analysis), json.dumps(topics), json.dumps(question_bank or []), years_of_experience, 'screened'))
-        
-        conn.commit()
+        return add_candidates([{
+            "name": name,
+            "score": score,
+            "analysis": analysis,
+            "topics": topics,
+            "question_bank": question_bank,
+            "years_of_experience": years_of_experience,
+        }])[0]
     except Exception as e:
         print(f"Error adding candidate: {e}")
-    finally:
-        conn.close()
+
+def add_candidates(candidates: list) -> list:
+    """
+    Saves a whole screening batch in one transaction.
+    candidates: list of dicts with name, score, analysis, topics, years_of_experience and either
+    question_bank_id (from save_question_bank) or a question_bank list, stored once per distinct list
+    Re-screened candidates are upserted: only the screening fields are updated,
+    so interview results, status, recommendation and timestamp are kept.
+    Returns one {"name", "outcome", "error"} per input row, in order;
+    outcome is "inserted", "updated" or "error" (that row is not written).
+    """
+    outcomes, rows = [], []
+    for c in candidates:
+        try:
+            name = str(c["name"]).strip().lower()
+            if not name:
+                raise ValueError("missing candidate name")
+            row = (
+                name,
+                c["score"],
+                json.dumps(c.get("analysis", {})),
+                json.dumps(c.get("topics", [])),
+                # Resolved to a bank ID inside the transaction below
+                c["question_bank_id"] if c.get("question_bank_id") is not None else tuple(c.get("question_bank") or ()),
+                c.get("years_of_experience", 0),
+                'screened',
+            )
+        except KeyError as e:
+            outcomes.append({"name": c.get("name"), "outcome": "error", "error": f"missing field {e}"})
+            continue
+        except Exception as e:
+            outcomes.append({"name": c.get("name"), "outcome": "error", "error": str(e)})
+            continue
+        rows.append(row)
+        outcomes.append({"name": name, "outcome": None, "error": None})
+
+    if not rows:
+        return outcomes
+
+    with transaction() as conn:
+        names = list({row[0] for row in rows})
+        existing = set()
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(names), 500):
+            chunk = names[i:i + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            existing.update(
+                r["name"] for r in conn.execute(f"SELECT name FROM candidates WHERE name IN ({placeholders})", chunk)
+            )
+        # A batch usually shares one uploaded bank; store each distinct list once
+        bank_ids = {}
+        for i, row in enumerate(rows):
+            bank = row[4]
+            if isinstance(bank, tuple):
+                if bank not in bank_ids:
+                    bank_ids[bank] = _save_question_bank(conn, list(bank))
+                rows[i] = row[:4] + (bank_ids[bank],) + row[5:]
+        conn.executemany('''
+            INSERT INTO candidates (name, resume_score, resume_analysis, extracted_topics, question_bank_id, years_of_experience, status)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                resume_score = excluded.resume_score,
+                resume_analysis = excluded.resume_analysis,
+                extracted_topics = excluded.extracted_topics,
+                question_bank_id = excluded.question_bank_id,
+                years_of_experience = excluded.years_of_experience
+        ''', rows)
+
+    # Duplicate names in one batch: the first is an insert, later ones update it
+    for outcome in outcomes:
+        if outcome["outcome"] is None:
+            outcome["outcome"] = "updated" if outcome["name"] in existing else "inserted"
+            existing.add(outcome["name"])
+    return outcomes
 
 def get_candidate(name: str):
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM candidates WHERE name = ?", (name.lower(),))
-    row = c.fetchone()
-    conn.close()
+    with connection() as conn:
+        row = conn.execute("SELECT * FROM candidates WHERE name = ?", (name.lower(),)).fetchone()
     if row:
         return dict(row)
     return None
 
-def update_interview_result(name: str, evaluations: list, avg_score: float, final_summary: str = None, decision: str = None):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        UPDATE candidates 
-        SET interview_data = ?, interview_score = ?, status = ?, final_summary = ?, can_hire = ?
-        WHERE name = ?
-    ''', (json.dumps(evaluations), avg_score, 'completed', final_summary, decision, name.lower()))
-    conn.commit()
-    conn.close()
+def _content_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+def _save_question_bank(conn: sqlite3.Connection, questions: list):
+    questions = [str(q).strip() for q in questions if str(q).strip()]
+    if not questions:
+        return None
+    # Banks are identified by their ordered question list
+    bank_hash = _content_hash("\n".join(questions))
+    row = conn.execute("SELECT id FROM question_banks WHERE content_hash = ?", (bank_hash,)).fetchone()
+    if row:
+        return row["id"]
+
+    question_hashes = [_content_hash(q) for q in questions]
+    conn.executemany(
+        "INSERT OR IGNORE INTO questions (content_hash, text) VALUES (?, ?)",
+        list(zip(question_hashes, questions)),
+    )
+    ids = {}
+    unique_hashes = list(set(question_hashes))
+    # Stay under SQLite's bound-parameter limit
+    for i in range(0, len(unique_hashes), 500):
+        chunk = unique_hashes[i:i + 500]
+        placeholders = ", ".join("?" * len(chunk))
+        for r in conn.execute(f"SELECT id, content_hash FROM questions WHERE content_hash IN ({placeholders})", chunk):
+            ids[r["content_hash"]] = r["id"]
+
+    bank_id = conn.execute(
+        "INSERT INTO question_banks (content_hash, question_count) VALUES (?, ?)", (bank_hash, len(questions))
+    ).lastrowid
+    conn.executemany(
+        "INSERT INTO question_bank_items (bank_id, position, question_id) VALUES (?, ?, ?)",
+        [(bank_id, pos, ids[h]) for pos, h in enumerate(question_hashes)],
+    )
+    return bank_id
+
+def parse_question_bank(file_name: str, content) -> list:
+    """
+    Questions from an uploaded bank file (bytes or text): one question per
+    line, or for .csv files the first column of every row. Blank lines and
+    repeats are dropped, order is kept.
+    """
+    if isinstance(content, bytes):
+        content = content.decode("utf-8", errors="ignore")
+    questions = []
+    for line in content.splitlines():
+        if file_name.lower().endswith(".csv"):
+            line = line.split(",")[0]
+        line = line.strip()
+        if line:
+            questions.append(line)
+    return list(dict.fromkeys(questions))
+
+def save_question_bank(questions: list):
+    """
+    Stores an uploaded question bank once and returns its ID (None if empty).
+    Uploading the same list again returns the existing bank.
+    """
+    with transaction() as conn:
+        return _save_question_bank(conn, questions or [])
+
+@lru_cache(maxsize=32)
+def _load_question_bank(path: str, bank_id: int) -> tuple:
+    # Banks are immutable once saved, so they can be cached per process
+    with connection(path) as conn:
+        rows = conn.execute('''
+            SELECT q.text FROM question_bank_items i JOIN questions q ON q.id = i.question_id
+            WHERE i.bank_id = ? ORDER BY i.position
+        ''', (bank_id,)).fetchall()
+    return tuple(row["text"] for row in rows)
+
+def get_question_bank(bank_id: int | None) -> list:
+    if bank_id is None:
+        return []
+    return list(_load_question_bank(DB_PATH, bank_id))
+
+def get_candidate_question_bank(name: str) -> list:
+    """
+    The candidate's bank questions they have not been asked yet.
+    """
+    with connection() as conn:
+        row = conn.execute("SELECT id, question_bank_id FROM candidates WHERE name = ?", (name.lower(),)).fetchone()
+        if row is None or row["question_bank_id"] is None:
+            return []
+        used = {
+            r["text"] for r in conn.execute('''
+                SELECT q.text FROM candidate_question_usage u JOIN questions q ON q.id = u.question_id
+                WHERE u.candidate_id = ?
+            ''', (row["id"],))
+        }
+    return [q for q in get_question_bank(row["question_bank_id"]) if q not in used]
+
+def mark_questions_used(name: str, questions: list):
+    """
+    Records bank questions the candidate has been asked.
+    """
+    hashes = [_content_hash(str(q).strip()) for q in questions if str(q).strip()]
+    if not hashes:
+        return
+    with transaction() as conn:
+        row = conn.execute("SELECT id FROM candidates WHERE name = ?", (name.lower(),)).fetchone()
+        if row is None:
+            return
+        conn.executemany('''
+            INSERT OR IGNORE INTO candidate_question_usage (candidate_id, question_id)
+            SELECT ?, id FROM questions WHERE content_hash = ?
+        ''', [(row["id"], h) for h in hashes])
+
+def update_interview_result(name: str, evaluations: list, avg_score: float | None = None, final_summary: str = None, decision: str = None):
+    """
+    Saves the interview and its summary columns (answered/skipped counts,
+    total score and duration). `avg_score` defaults to the fair score.
+    """
+    summary = summarize_evaluations(evaluations)
+    if avg_score is None:
+        avg_score = summary["fair_score"]
+    with transaction() as conn:
+        row = conn.execute("SELECT id FROM candidates WHERE name = ?", (name.lower(),)).fetchone()
+        if row is None:
+            return
+        conn.execute('''
+            UPDATE candidates 
+            SET interview_data = NULL, interview_score = ?, status = ?, final_summary = ?, can_hire = ?,
+                evaluation_count = ?, answered_count = ?, skipped_count = ?, total_score = ?, total_duration = ?
+            WHERE id = ?
+        ''', (avg_score, 'completed', final_summary, decision,
+              summary["evaluation_count"], summary["answered_count"], summary["skipped_count"],
+              summary["total_score"], summary["total_duration"], row["id"]))
+        _insert_evaluations(conn, row["id"], evaluations)
+
+def get_evaluations(name: str) -> list:
+    """
+    Returns a candidate's evaluations in question order, in the same shape as
+    AgentState["evaluations"] (plus duration).
+    """
+    with connection() as conn:
+        rows = conn.execute('''
+            SELECT e.question, e.answer, e.score, e.feedback, e.duration, e.skipped, e.complexity, e.topics
+            FROM evaluations e JOIN candidates c ON c.id = e.candidate_id
+            WHERE c.name = ?
+            ORDER BY e.question_index
+        ''', (name.lower(),)).fetchall()
+    return [
+        {
+            "question": row["question"],
+            "user_answer": row["answer"],
+            "score": row["score"],
+            "feedback": row["feedback"],
+            "duration": row["duration"],
+            "skipped": bool(row["skipped"]),
+            "complexity": row["complexity"],
+            "topics": json.loads(row["topics"]) if row["topics"] else [],
+        }
+        for row in rows
+    ]
 
 def update_recommendation(name: str, final_summary: str, decision: str):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    c.execute('''
-        UPDATE candidates
-        SET final_summary = ?, can_hire = ?
-        WHERE name = ?
-    ''', (final_summary, decision, name.lower()))
-    conn.commit()
-    conn.close()
+    with transaction() as conn:
+        conn.execute('''
+            UPDATE candidates
+            SET final_summary = ?, can_hire = ?
+            WHERE name = ?
+        ''', (final_summary, decision, name.lower()))
 
 def get_all_candidates():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    c.execute("SELECT * FROM candidates ORDER BY timestamp DESC")
-    rows = c.fetchall()
-    conn.close()
+    with connection() as conn:
+        rows = conn.execute("SELECT * FROM candidates ORDER BY timestamp DESC").fetchall()
+    return [dict(row) for row in rows]
+
+# Columns list_candidates() can project
+CANDIDATE_COLUMNS = (
+    "id", "name", "email", "resume_score", "resume_analysis", "extracted_topics", "question_bank_id",
+    "years_of_experience", "interview_score", "status", "final_summary", "can_hire", "timestamp",
+) + tuple(SUMMARY_COLUMNS)
+DEFAULT_LISTING_COLUMNS = ("id", "name", "resume_score", "status", "can_hire", "timestamp")
+# Sort keys for list_candidates(); each matches an index ending in id
+CANDIDATE_SORT_KEYS = {
+    "timestamp": "c.timestamp",
+    "interview_score": "COALESCE(c.interview_score, -1)",
+}
+
+def list_candidates(columns=None, limit: int = 50, after=None, status: str | None = None,
+                    decision: str | None = None, min_resume_score: int | None = None,
+                    max_resume_score: int | None = None, name_prefix: str | None = None,
+                    min_interview_score: float | None = None, order_by: str = "timestamp"):
+    """
+    One page of candidates in descending `order_by` order (a CANDIDATE_SORT_KEYS
+    key), with only the requested `columns` (names from CANDIDATE_COLUMNS).
+    `after` is the cursor returned for the previous page.
+    Returns (rows, next_cursor); next_cursor is None on the last page.
+    """
+    columns = list(columns or DEFAULT_LISTING_COLUMNS)
+    unknown = [col for col in columns if col not in CANDIDATE_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown candidate columns: {unknown}")
+    if order_by not in CANDIDATE_SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {order_by}")
+    sort_expr = CANDIDATE_SORT_KEYS[order_by]
+
+    select = [f"c.{col}" for col in columns]
+    # The cursor values are always fetched, then dropped if not requested
+    select += [f"{sort_expr} AS _cursor_key", "c.id AS _cursor_id"]
+
+    where, params = [], []
+    if status:
+        where.append("c.status = ?")
+        params.append(status)
+    if decision:
+        where.append("c.can_hire = ?")
+        params.append(decision)
+    if min_resume_score is not None:
+        where.append("c.resume_score >= ?")
+        params.append(min_resume_score)
+    if max_resume_score is not None:
+        where.append("c.resume_score <= ?")
+        params.append(max_resume_score)
+    if min_interview_score is not None:
+        where.append("c.interview_score >= ?")
+        params.append(min_interview_score)
+    if name_prefix:
+        # Names are stored lowercased; a range keeps the UNIQUE(name) index usable
+        prefix = name_prefix.lower()
+        where.append("c.name >= ? AND c.name < ?")
+        params.extend([prefix, prefix + "\uffff"])
+    if after is not None:
+        where.append(f"({sort_expr}, c.id) < (?, ?)")
+        params.extend(after)
+
+    sql = f"SELECT {', '.join(select)} FROM candidates c"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {sort_expr} DESC, c.id DESC LIMIT ?"
+    params.append(limit + 1)
+
+    with connection() as conn:
+        rows = conn.execute(sql, params).fetchall()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = (rows[-1]["_cursor_key"], rows[-1]["_cursor_id"])
+    return [{col: row[col] for col in columns} for row in rows], next_cursor
+
+# Screening cache hit/miss counts not yet written, per database path. Counting
+# in the lookup itself would make every cache read a write transaction.
+_pending_cache_stats: dict = {}
+_cache_stats_lock = threading.Lock()
+
+def get_cached_screening(cache_key: str):
+    """
+    Returns the cached screening result for `cache_key` (or None) and counts the hit/miss.
+    """
+    with connection() as conn:
+        row = conn.execute("SELECT result FROM screening_cache WHERE cache_key = ?", (cache_key,)).fetchone()
+    with _cache_stats_lock:
+        counts = _pending_cache_stats.setdefault(DB_PATH, {"hits": 0, "misses": 0})
+        counts["hits" if row else "misses"] += 1
+        due = counts["hits"] + counts["misses"] >= config.SCREENING_STATS_FLUSH_EVERY
+    if due:
+        flush_screening_cache_stats()
+    return json.loads(row[0]) if row else None
+
+def flush_screening_cache_stats():
+    """
+    Writes the buffered screening cache hit/miss counts, one transaction per database.
+    """
+    with _cache_stats_lock:
+        for path, counts in list(_pending_cache_stats.items()):
+            try:
+                with transaction(path) as conn:
+                    conn.executemany('''
+                        INSERT INTO screening_cache_stats (name, value) VALUES (?, ?)
+                        ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+                    ''', [(name, value) for name, value in counts.items() if value])
+            except Exception as e:
+                print(f"Error saving screening cache stats: {e}")
+                continue
+            del _pending_cache_stats[path]
+
+atexit.register(flush_screening_cache_stats)
+
+def save_cached_screening(cache_key: str, prompt_version: str, result: dict):
+    with transaction() as conn:
+        conn.execute('''
+            INSERT OR REPLACE INTO screening_cache (cache_key, prompt_version, result)
+            VALUES (?, ?, ?)
+        ''', (cache_key, prompt_version, json.dumps(result)))
+
+def invalidate_screening_cache(keep_prompt_version: str | None = None) -> int:
+    """
+    Deletes cached screening results produced by other prompt versions
+    (or everything if no version is given). Returns the number of rows removed.
+    """
+    with transaction() as conn:
+        if keep_prompt_version is None:
+            cur = conn.execute("DELETE FROM screening_cache")
+        else:
+            cur = conn.execute("DELETE FROM screening_cache WHERE prompt_version != ?", (keep_prompt_version,))
+        return cur.rowcount
+
+def get_screening_cache_stats() -> dict:
+    """
+    Cache size and hit/miss counts, including lookups not flushed yet.
+    """
+    # Under the stats lock so a concurrent flush is not counted twice or missed
+    with _cache_stats_lock, connection() as conn:
+        entries = conn.execute("SELECT COUNT(*) FROM screening_cache").fetchone()[0]
+        counters = {row["name"]: row["value"] for row in conn.execute("SELECT name, value FROM screening_cache_stats")}
+        pending = _pending_cache_stats.get(DB_PATH, {})
+    return {
+        "entries": entries,
+        "hits": counters.get("hits", 0) + pending.get("hits", 0),
+        "misses": counters.get("misses", 0) + pending.get("misses", 0),
+    }
+
+def record_llm_calls(rows: list, path: str | None = None):
+    """
+    Inserts LLM call records in one transaction. Each row is (node, interview_id, model,
+    prompt_tokens, completion_tokens, tokens_estimated, ttft_ms, latency_ms, status, error).
+    Called by the agent.llm_metrics writer thread.
+    """
+    with transaction(path) as conn:
+        conn.executemany('''
+            INSERT INTO llm_calls (node, interview_id, model, prompt_tokens, completion_tokens, tokens_estimated,
+                                   ttft_ms, latency_ms, status, error)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', rows)
+
+def get_recent_llm_calls(limit: int = 5000):
+    """
+    Returns the most recent LLM call records (newest first).
+    """
+    with connection() as conn:
+        rows = conn.execute('''
+            SELECT node, interview_id, prompt_tokens, completion_tokens, ttft_ms, latency_ms, status
+            FROM llm_calls ORDER BY id DESC LIMIT ?
+        ''', (limit,)).fetchall()
+    return [dict(row) for row in rows]
+
+def get_llm_usage_by_interview():
+    """
+    Per-interview LLM totals: calls, tokens, latency and failures.
+    """
+    with connection() as conn:
+        rows = conn.execute('''
+            SELECT interview_id,
+                   COUNT(*) AS calls,
+                   SUM(prompt_tokens) AS prompt_tokens,
+                   SUM(completion_tokens) AS completion_tokens,
+                   SUM(latency_ms) AS total_latency_ms,
+                   SUM(CASE WHEN status != 'ok' THEN 1 ELSE 0 END) AS failures
+            FROM llm_calls
+            WHERE interview_id IS NOT NULL
+            GROUP BY interview_id
+            ORDER BY MAX(id) DESC
+        ''').fetchall()
     return [dict(row) for row in rows]
 
 def clear_db():
     try:
-        conn = sqlite3.connect(DB_PATH)
-        c = conn.cursor()
-        c.execute("DELETE FROM candidates")
-        conn.commit()
+        with transaction() as conn:
+            conn.execute("DELETE FROM evaluations")
+            conn.execute("DELETE FROM candidate_question_usage")
+            conn.execute("DELETE FROM candidates")
     except Exception as e:
         print(f"Error clearing DB: {e}")
-    finally:
-        conn.close()
@@ -1,6 +1,6 @@
 from langgraph.graph import StateGraph, END
 from agent.state import AgentState
-from agent.nodes import generate_question, evaluate_answer
+from agent.nodes import generate_question, evaluate_answer, evaluate_and_generate
 from agent.logger import get_logger
 
 logger = get_logger(__name__)
@@ -18,6 +18,9 @@ def route_start(state: AgentState):
     # Actually, simpler: check if the last message was from the user.
     history = state.get("history", [])
     if history and history[-1]["role"] == "user":
+        if config.PARALLEL_EVAL_AND_ASK:
+            logger.debug("Routing to evaluate_and_generate")
+            return "evaluate_and_generate"
         logger.debug("Routing to evaluate_answer")
         return "evaluate_answer"
     logger.debug("Routing to generate_question")
@@ -41,12 +44,14 @@ def create_graph():
     
     builder.add_node("generate_question", generate_question)
     builder.add_node("evaluate_answer", evaluate_answer)
+    builder.add_node("evaluate_and_generate", evaluate_and_generate)
     
     # Start -> Router
     builder.set_conditional_entry_point(
         route_start,
         {
             "evaluate_answer": "evaluate_answer",
+            "evaluate_and_generate": "evaluate_and_generate",
             "generate_question": "generate_question"
         }
     )
@@ -65,5 +70,8 @@ def create_graph():
     # Note: In our current app structure, 'generate_question' returns to app, app waits for input.
     # So 'generate_question' effectively ends the *graph run* but not the *session*.
     builder.add_edge("generate_question", END)
+
+    # Evaluate + Generate (concurrent) -> End; the node itself stops generating at max questions
+    builder.add_edge("evaluate_and_generate", END)
     
     return builder.compile()
@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from agent.context import estimate_tokens
+
+# Stand-in chat models so the graph can run (and be benchmarked) without the
+# live vLLM server. Selected with config.LLM_BACKEND, see agent.utils.get_llm.
+
+_TOKEN_PIECES = re.compile(r"\S+\s*|\s+")
+
+def prompt_hash(messages: List[BaseMessage], model: str, temperature: float, max_tokens: Optional[int]) -> str:
+    """
+    Key of a recorded request: the messages plus the sampling settings.
+    """
+    payload = {
+        "messages": [[m.type, m.content] for m in messages],
+        "model": model,
+        "temperature": temperature,
+        "max_tokens": max_tokens,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _usage(prompt_text: str, content: str) -> Dict[str, int]:
+    input_tokens = estimate_tokens(prompt_text)
+    output_tokens = estimate_tokens(content)
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+
+def _prompt_text(messages: List[BaseMessage]) -> str:
+    return "\n".join(str(m.content) for m in messages)
+
+class RecordingStore:
+    """
+    Append-only JSONL file of {"key", "content", "usage"} records, loaded into memory once.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        self._records[record["key"]] = record
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._records.get(key)
+
+    def save(self, key: str, content: str, usage: Optional[Dict[str, int]]):
+        record = {"key": key, "content": content, "usage": usage}
+        with self._lock:
+            self._records[key] = record
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+
+class RecordingChatModel(BaseChatModel):
+    """
+    Forwards to the live model and stores every response in a RecordingStore.
+    """
+    inner: Any
+    store: Any
+    llm_model: str
+    temperature: float
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def _key(self, messages):
+        return prompt_hash(messages, self.llm_model, self.temperature, self.max_tokens)
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        response = self.inner.invoke(messages, stop=stop)
+        self.store.save(self._key(messages), response.content, response.usage_metadata)
+        message = AIMessage(content=response.content, usage_metadata=response.usage_metadata)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        full = None
+        for chunk in self.inner.stream(messages, stop=stop):
+            full = chunk if full is None else full + chunk
+            generation = ChatGenerationChunk(message=chunk)
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content, chunk=generation)
+            yield generation
+        if full is not None:
+            self.store.save(self._key(messages), full.content, full.usage_metadata)
+
+class _ScriptedChatModel(BaseChatModel):
+    """
+    Base for stand-ins that produce a full response locally and replay it
+    token by token with configurable latency.
+    """
+    latency_seconds: float = 0.0
+    tokens_per_second: float = 0.0
+
+    def _respond(self, messages: List[BaseMessage], run_manager: Optional[CallbackManagerForLLMRun]) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> ChatResult:
+        response = self._respond(messages, run_manager)
+        pieces = _TOKEN_PIECES.findall(response["content"])
+        delay = self.latency_seconds
+        if self.tokens_per_second:
+            delay += len(pieces) / self.tokens_per_second
+        if delay:
+            time.sleep(delay)
+        message = AIMessage(content=response["content"], usage_metadata=response["usage"])
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager: Optional[CallbackManagerForLLMRun] = None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        response = self._respond(messages, run_manager)
+        if self.latency_seconds:
+            time.sleep(self.latency_seconds)
+        for piece in _TOKEN_PIECES.findall(response["content"]):
+            if self.tokens_per_second:
+                time.sleep(1 / self.tokens_per_second)
+            generation = ChatGenerationChunk(message=AIMessageChunk(content=piece))
+            if run_manager:
+                run_manager.on_llm_new_token(piece, chunk=generation)
+            yield generation
+        # Final empty chunk carries usage, like a live server with stream usage enabled
+        yield ChatGenerationChunk(message=AIMessageChunk(content="", usage_metadata=response["usage"]))
+
+class ReplayChatModel(_ScriptedChatModel):
+    """
+    Serves responses from a RecordingStore. Unknown prompts raise LookupError.
+    """
+    store: Any
+    llm_model: str
+    temperature: float
+    max_tokens: Optional[int] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def _respond(self, messages, run_manager):
+        key = prompt_hash(messages, self.llm_model, self.temperature, self.max_tokens)
+        record = self.store.get(key)
+        if record is None:
+            raise LookupError(f"No recorded LLM response for prompt {key[:12]}")
+        return {"content": record["content"], "usage": record.get("usage") or _usage(_prompt_text(messages), record["content"])}
+
+# Worded differently enough to stay under config.QUESTION_SIMILARITY_THRESHOLD
+_FAKE_QUESTIONS = [
+    "How would you track down a memory leak in a long-running service?",
+    "Why might a join on a large reporting table suddenly become slow?",
+    "How do you train a fraud classifier when positive cases are very rare?",
+    "What signals tell you that feature drift is hurting a deployed model?",
+    "What makes integration tests flaky in CI, and how do you stabilize them?",
+    "How can two worker threads corrupt shared state, and how do you prevent it?",
+    "When should cached user profiles be invalidated after an update?",
+    "How do you roll out a schema change on a live database safely?",
+    "How would you tune hyperparameters with a small compute budget?",
+    "How do you decide whether unusual sensor readings are errors or real events?",
+    "What are the options for imputing missing survey responses?",
+    "Where would you look first when request latency spikes behind a load balancer?",
+    "Why must payment API retries be idempotent, and how do you implement that?",
+    "How do you merge customer records coming from several source systems?",
+    "How would you explain a credit model's decision to a loan officer?",
+    "How do you version datasets so experiments can be reproduced later?",
+]
+
+class FakeChatModel(_ScriptedChatModel):
+    """
+    Synthetic responses shaped like each node expects (question text or the
+    JSON formats from prompts/templates.py). Deterministic per prompt.
+    The node is read from the `llm_node` run metadata set by invoke_llm.
+    """
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def _respond(self, messages, run_manager):
+        prompt_text = _prompt_text(messages)
+        seed = int(hashlib.sha256(prompt_text.encode("utf-8")).hexdigest()[:8], 16)
+        node = (run_manager.metadata.get("llm_node") if run_manager else None) or "generate_question"
+
+        if node == "evaluate_answer":
+            content = json.dumps({"score": 3 + seed % 7, "feedback": "Synthetic evaluation of the answer."})
+        elif node == "screen_resume":
+            content = json.dumps({
+                "name": f"Candidate {seed % 100000:05d}",
+                "score": 60 + seed % 40,
+                "years_of_experience": (seed % 20) / 2,
+                "reasoning": "Synthetic screening result.",
+                "extracted_topics": ["Python", "SQL", "Machine Learning"],
+            })
+        elif node == "hr_recommendation":
+            content = json.dumps({
+                "decision": "Hold",
+                "knowledge_level": "Mid",
+                "role_fit": "Medium",
+                "readiness": "Medium",
+                "summary": "Synthetic recommendation summary.",
+                "concerns": [],
+            })
+        else:
+            # First question not already in the history, so the near-duplicate check passes first time
+            start = seed % len(_FAKE_QUESTIONS)
+            candidates = _FAKE_QUESTIONS[start:] + _FAKE_QUESTIONS[:start]
+            content = next((q for q in candidates if q not in prompt_text), candidates[0])
+        return {"content": content, "usage": _usage(prompt_text, content)}
@@ -0,0 +1,88 @@
+import atexit
+import queue
+import threading
+import time
+from typing import Optional
+from agent import db
+from agent.logger import get_logger
+import config
+
+logger = get_logger(__name__)
+
+# LLM call metrics are queued in memory and written to the llm_calls table in
+# batches by one background thread, so invoke_llm never waits on an insert.
+
+_calls: "queue.Queue" = queue.Queue(maxsize=config.LLM_METRICS_QUEUE_SIZE)
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_dropped = 0
+
+def record_llm_call(node: str, interview_id: str | None, model: str, prompt_tokens: int, completion_tokens: int,
+                    tokens_estimated: bool, ttft_ms: float | None, latency_ms: float, status: str, error: str | None = None):
+    """
+    Queues one LLM call record for the current database. Never blocks: if the
+    queue is full the record is dropped and counted.
+    """
+    global _dropped
+    _ensure_writer()
+    row = (node, interview_id, model, prompt_tokens, completion_tokens, int(tokens_estimated),
+           ttft_ms, latency_ms, status, error)
+    try:
+        # The path is taken now so records land in the database that was current for the call
+        _calls.put_nowait((db.DB_PATH, row))
+    except queue.Full:
+        _dropped += 1
+        logger.warning(f"LLM metrics queue full; dropped {node} call ({_dropped} dropped so far)")
+
+def flush(timeout: float = 5.0) -> bool:
+    """
+    Waits until every call queued so far is written. Returns False on timeout.
+    """
+    if _writer is None:
+        return True
+    done = threading.Event()
+    try:
+        _calls.put(done, timeout=timeout)
+    except queue.Full:
+        return False
+    return done.wait(timeout)
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="llm-metrics-writer", daemon=True)
+            _writer.start()
+            atexit.register(flush)
+
+def _write_loop():
+    while True:
+        batches, waiters, size = {}, [], 0
+        item = _calls.get()
+        # Collect whatever else arrives within the flush interval, up to a batch
+        deadline = time.monotonic() + config.LLM_METRICS_FLUSH_SECONDS
+        while True:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                path, row = item
+                batches.setdefault(path, []).append(row)
+                size += 1
+            if size >= config.LLM_METRICS_BATCH_SIZE or waiters:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _calls.get(timeout=remaining)
+            except queue.Empty:
+                break
+        for path, rows in batches.items():
+            try:
+                db.record_llm_calls(rows, path)
+            except Exception as e:
+                logger.error(f"Failed to write {len(rows)} LLM call records: {e}")
+        for waiter in waiters:
+            waiter.set()
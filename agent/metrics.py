@@ -0,0 +1,71 @@
+import math
+from typing import Dict, List, Optional
+import config
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Nearest-rank percentile (pct in 0-100). Returns None for no values.
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+def summarize_llm_calls(calls: List[Dict]) -> List[Dict]:
+    """
+    Per-node latency percentiles and token averages from llm_calls records.
+    """
+    by_node: Dict[str, List[Dict]] = {}
+    for call in calls:
+        by_node.setdefault(call["node"], []).append(call)
+
+    summary = []
+    for node, node_calls in sorted(by_node.items()):
+        latencies = [c["latency_ms"] for c in node_calls if c["status"] == "ok" and c["latency_ms"] is not None]
+        ttfts = [c["ttft_ms"] for c in node_calls if c["ttft_ms"] is not None]
+        ok_calls = [c for c in node_calls if c["status"] == "ok"]
+        summary.append({
+            "node": node,
+            "calls": len(node_calls),
+            "errors": sum(1 for c in node_calls if c["status"] == "error"),
+            "timeouts": sum(1 for c in node_calls if c["status"] == "timeout"),
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+            "p99_ms": percentile(latencies, 99),
+            "ttft_p50_ms": percentile(ttfts, 50),
+            "ttft_p95_ms": percentile(ttfts, 95),
+            "avg_prompt_tokens": (
+                sum(c["prompt_tokens"] or 0 for c in ok_calls) / len(ok_calls) if ok_calls else None
+            ),
+            "avg_completion_tokens": (
+                sum(c["completion_tokens"] or 0 for c in ok_calls) / len(ok_calls) if ok_calls else None
+            ),
+        })
+    return summary
+
+def is_skipped(evaluation: Dict) -> bool:
+    """
+    True if the candidate skipped the question. Older evaluations have no
+    "skipped" flag, so they fall back to the zero score + feedback text check.
+    """
+    if "skipped" in evaluation:
+        return bool(evaluation["skipped"])
+    return evaluation.get("score") == 0 and "skipped" in (evaluation.get("feedback") or "").lower()
+
+def summarize_evaluations(evaluations: List[Dict]) -> Dict:
+    """
+    Per-interview totals stored with the candidate: answered/skipped counts,
+    total score and duration, and the fair score (total / MAX_QUESTIONS_DEFAULT,
+    so unanswered questions count as 0).
+    """
+    skipped = sum(1 for e in evaluations if is_skipped(e))
+    total_score = sum(e.get("score", 0) or 0 for e in evaluations)
+    return {
+        "evaluation_count": len(evaluations),
+        "answered_count": len(evaluations) - skipped,
+        "skipped_count": skipped,
+        "total_score": total_score,
+        "total_duration": sum(e.get("duration", 0) or 0 for e in evaluations),
+        "fair_score": total_score / config.MAX_QUESTIONS_DEFAULT if config.MAX_QUESTIONS_DEFAULT else 0,
+    }
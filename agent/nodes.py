@@ -1,13 +1,23 @@
 from agent.state import AgentState, Evaluation
-from agent.utils import get_llm, extract_json
+from agent.utils import invoke_llm, extract_json
+from agent.context import build_question_context, estimate_tokens, summarize_question
+from agent.similarity import most_similar, split_near_duplicates
 from prompts.templates import TOPIC_SOLICITATION, QUESTION_GENERATION, EVALUATION
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import ensure_config
 import config
 import random
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
 from agent.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Background pool for work that runs alongside a node (e.g. evaluation while the next question is generated)
+_node_executor = ThreadPoolExecutor(max_workers=config.NODE_WORKERS, thread_name_prefix="node")
+
+def _next_complexity(state: AgentState) -> int:
+    return min(state["complexity_level"] + 1, 10)
+
 def get_topics(state: AgentState):
     """
     This node effectively just acts as a pass-through or initialization in this design,
@@ -22,35 +32,77 @@ def get_topics(state: AgentState):
     """
     pass
 
+def is_bank_turn(state: AgentState) -> bool:
+    """
+    True if the next question should be picked from the uploaded question bank.
+    """
+    if not state.get("question_bank"):
+        return False
+    return bool(config.BANK_ASK_EVERY) and state.get("question_count", 0) % config.BANK_ASK_EVERY == 0
+
+def lookahead_state(state: AgentState) -> AgentState:
+    """
+    The state generate_question will see for the next question, assuming the
+    current one gets answered (complexity and question count move forward).
+    """
+    return {
+        **state,
+        "complexity_level": _next_complexity(state),
+        "question_count": state.get("question_count", 0) + 1,
+    }
+
 def generate_question(state: AgentState):
     """
     Generates a question based on current topics and complexity.
+    If the graph was invoked with `configurable.on_question_token`, the LLM
+    output is streamed and each token is passed to that callback.
+    If `configurable.question_prefetcher` holds a still-valid prefetched
+    question for this state, it is used instead of calling the LLM.
     """
+    run_config = ensure_config().get("configurable", {})
+    prefetcher = run_config.get("question_prefetcher")
+    if prefetcher is not None:
+        prefetched = prefetcher.take(state)
+        if prefetched is not None:
+            logger.info(f"Using prefetched question: {prefetched['current_question']}")
+            return prefetched
+
     logger.info("Generating question")
     topics = ", ".join(state["topics"])
     complexity = state.get("complexity_level", 1)
     history = state.get("history", [])
     question_bank = state.get("question_bank", []) or []
     bank_index = state.get("bank_index", 0)
+    asked_bank_questions = list(state.get("asked_bank_questions") or [])
     yoe = state.get("years_of_experience", 0)
     logger.info(f"Generating question for candidate with {yoe} years of experience")
     
-    # Format history for prompt
-    history_str = "\n".join([f"{msg['role']}: {msg['content']}" for msg in history]) # Use full context for variety check
+    covered_concepts = state.get("covered_concepts", []) or []
+    prompt_tokens = 0
     
     # Always ask conceptual/theoretical questions (no coding/practical)
     question_type = "conceptual/theoretical"
 
-    use_bank = False
-    if question_bank:
-        if config.BANK_ASK_EVERY and (state.get("question_count", 0) % config.BANK_ASK_EVERY == 0):
-            use_bank = True
+    selected_style = state.get("last_question_style")
+    use_bank = is_bank_turn(state)
     
+    # Everything asked so far; near-duplicates of these are never shown again
+    asked = [m["content"] for m in history if m["role"] == "assistant"]
+
+    if use_bank:
+        keep, dropped = split_near_duplicates(question_bank, asked)
+        if dropped:
+            logger.info(f"Dropping {len(dropped)} bank question(s) that repeat earlier questions")
+            question_bank = [question_bank[i] for i in keep]
+        if not question_bank:
+            use_bank = False
+
     if use_bank:
         pick_idx = random.randrange(len(question_bank))
         question_text = question_bank.pop(pick_idx).strip()
         logger.info(f"Picked question from bank: {question_text}")
         bank_index += 1
+        asked_bank_questions.append(question_text)
     else:
         logger.debug("Generating question via LLM")
         
@@ -76,33 +128,56 @@ def generate_question(state: AgentState):
         selected_style = random.choice(available_styles)
         logger.info(f"Selected Question Style: {selected_style}")
 
-        # Concept Exclusion Logic (Extract last 3 questions to avoid)
-        # We explicitly list them so the LLM knows what to semantic-avoid
-        recent_history = [m["content"] for m in history if m["role"] == "assistant"][-3:]
-        avoid_concepts = "\n- ".join(recent_history) if recent_history else "None"
-
-        prompt = QUESTION_GENERATION.format(
-            topics=topics,
-            complexity_level=complexity,
-            history=history_str,
-            question_type=question_type,
-            years_of_experience=state.get("years_of_experience", 0),
-            focus_topic=focus_topic,
-            style=selected_style,
-            avoid_concepts=avoid_concepts
-        )
-        
-        llm = get_llm(temperature=config.TEMPERATURE_ASK, max_tokens=config.MAX_TOKENS_QUESTION)
-        response = llm.invoke([HumanMessage(content=prompt)])
-        question_text = response.content.strip()
+        # Concept Exclusion Logic: compact concepts of recent questions, not their full text.
+        # Repeats the LLM makes anyway are caught by the similarity check below.
+        avoid = covered_concepts[-config.QUESTION_AVOID_CONCEPTS:]
+
+        # Bounded history: recent turns verbatim + compact list of older questions
+        history_str, history_tokens = build_question_context(history, covered_concepts)
+
+        best_score = None
+        for attempt in range(config.QUESTION_DEDUP_RETRIES + 1):
+            avoid_concepts = "\n- ".join(avoid) if avoid else "None"
+            prompt = QUESTION_GENERATION.format(
+                topics=topics,
+                complexity_level=complexity,
+                history=history_str,
+                question_type=question_type,
+                years_of_experience=state.get("years_of_experience", 0),
+                focus_topic=focus_topic,
+                style=selected_style,
+                avoid_concepts=avoid_concepts
+            )
+            prompt_tokens = estimate_tokens(prompt)
+            logger.info(f"Question prompt size: ~{prompt_tokens} tokens (history ~{history_tokens})")
+
+            candidate = invoke_llm(
+                "generate_question",
+                prompt,
+                temperature=config.TEMPERATURE_ASK,
+                max_tokens=config.MAX_TOKENS_QUESTION,
+                interview_id=state.get("interview_id"),
+                # Only the first attempt is streamed; a retry replaces it when the turn completes
+                on_token=run_config.get("on_question_token") if attempt == 0 else None,
+            ).strip()
+            score, _ = most_similar(candidate, asked)
+            if best_score is None or score < best_score:
+                question_text, best_score = candidate, score
+            if score < config.QUESTION_SIMILARITY_THRESHOLD:
+                break
+            logger.info(f"Generated question repeats an earlier one (similarity {score:.2f}); retrying")
+            avoid = avoid + [summarize_question(candidate)]
         logger.info(f"Generated Question: {question_text}")
     
     # Update state
     return {
         "current_question": question_text,
         "bank_index": bank_index,
+        "asked_bank_questions": asked_bank_questions,
         "question_bank": question_bank,
         "last_question_style": selected_style,
+        "covered_concepts": covered_concepts + [summarize_question(question_text)],
+        "last_prompt_tokens": prompt_tokens,
         # We don't append to history here yet, we append when we send it to user? 
         # Or we can append now. Let's append now for the record.
         # Actually, standard pattern: update state, then external loop prints it.
@@ -136,7 +211,8 @@ def evaluate_answer(state: AgentState):
             score=0,
             feedback="Question skipped by candidate.",
             topics=state["topics"],
-            complexity=state["complexity_level"]
+            complexity=state["complexity_level"],
+            skipped=True
         )
         logger.info("Question skipped by user")
     else:
@@ -145,9 +221,14 @@ def evaluate_answer(state: AgentState):
             user_answer=user_answer
         )
 
-        llm = get_llm(temperature=config.TEMPERATURE_EVAL, max_tokens=config.MAX_TOKENS_EVAL)
-        response = llm.invoke([HumanMessage(content=prompt)])
-        eval_data = extract_json(response.content)
+        response_text = invoke_llm(
+            "evaluate_answer",
+            prompt,
+            temperature=config.TEMPERATURE_EVAL,
+            max_tokens=config.MAX_TOKENS_EVAL,
+            interview_id=state.get("interview_id"),
+        )
+        eval_data = extract_json(response_text)
 
         new_evaluation = Evaluation(
             question=question,
@@ -155,13 +236,14 @@ def evaluate_answer(state: AgentState):
             score=eval_data.get("score", 0),
             feedback=eval_data.get("feedback", "No feedback."),
             topics=state["topics"],
-            complexity=state["complexity_level"]
+            complexity=state["complexity_level"],
+            skipped=False
         )
         logger.info(f"Answer evaluated. Score: {eval_data.get('score', 0)}")
     
     # Increase complexity
 
-    new_complexity = min(state["complexity_level"] + 1, 10)
+    new_complexity = _next_complexity(state)
     
     return {
         "evaluations": [new_evaluation], # LangGraph will append specific to reducer if configured, or we assume overwrite/append list logic depends on State definition. 
@@ -176,3 +258,24 @@ def evaluate_answer(state: AgentState):
         "question_count": state.get("question_count", 0) + 1,
         "current_question": None
     }
+
+def evaluate_and_generate(state: AgentState):
+    """
+    Evaluates the user's answer and generates the next question concurrently.
+    The next question only depends on the history and the complexity level
+    (which increases regardless of the score), so it does not wait for grading.
+    """
+    logger.info("Evaluating answer and generating next question concurrently")
+    # Copy the context so LangGraph's run config (callbacks, configurable) reaches the worker
+    eval_future = _node_executor.submit(contextvars.copy_context().run, evaluate_answer, state)
+
+    lookahead = lookahead_state(state)
+    question_update = {}
+    if lookahead["question_count"] < config.MAX_QUESTIONS_DEFAULT:
+        question_update = generate_question(lookahead)
+    else:
+        logger.info("Max questions reached. Skipping next question generation.")
+
+    eval_update = eval_future.result()
+    # evaluate_answer clears current_question; the freshly generated one wins
+    return {**eval_update, **question_update}
@@ -0,0 +1,130 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from agent.state import AgentState
+from agent.nodes import generate_question, is_bank_turn, lookahead_state
+from agent.logger import get_logger
+import config
+
+logger = get_logger(__name__)
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=config.PREFETCH_WORKERS, thread_name_prefix="prefetch")
+
+def _last_question(state: AgentState) -> Optional[str]:
+    for msg in reversed(state.get("history", [])):
+        if msg["role"] == "assistant":
+            return msg["content"]
+    return None
+
+def prefetch_key(state: AgentState):
+    """
+    Identifies the turn a question is generated for. A prefetched question is
+    only valid if generate_question is later called with a state that has the
+    same key.
+    """
+    return (
+        state.get("question_count", 0),
+        state.get("complexity_level", 1),
+        tuple(state.get("topics", [])),
+        _last_question(state),
+    )
+
+class QuestionPrefetcher:
+    """
+    Generates the next question in the background while the candidate is
+    answering the current one. Keep one instance per interview session and
+    pass it to the graph as `configurable.question_prefetcher`.
+    """
+
+    def __init__(self, synthesize: Optional[Callable[[str], Any]] = None):
+        self._synthesize = synthesize
+        self._lock = threading.Lock()
+        self._key = None
+        self._future: Optional[Future] = None
+        self._audio: Dict[str, Future] = {}
+        # Bumped on every start/invalidate so late audio jobs from older prefetches are dropped
+        self._generation = 0
+
+    def start(self, state: AgentState):
+        """
+        Starts generating the question that follows the one currently shown.
+        Call right after the current question is appended to history.
+        """
+        lookahead = lookahead_state(state)
+        if lookahead["question_count"] >= config.MAX_QUESTIONS_DEFAULT:
+            self.invalidate()
+            return
+        # Work on copies so a discarded prefetch never consumes bank questions
+        # and the app can keep appending to the live history
+        lookahead["question_bank"] = list(state.get("question_bank") or [])
+        lookahead["history"] = list(state.get("history", []))
+        key = prefetch_key(lookahead)
+
+        if is_bank_turn(lookahead):
+            # Bank questions need no LLM call, so the next one is known right away
+            future = Future()
+            future.set_result(generate_question(lookahead))
+        else:
+            future = _prefetch_executor.submit(generate_question, lookahead)
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            self._key = key
+            self._future = future
+            self._audio = {}
+        logger.info(f"Prefetching next question (question_count={lookahead['question_count']})")
+
+        if self._synthesize is not None:
+            future.add_done_callback(lambda f: self._start_audio(generation, f))
+
+    def _start_audio(self, generation: int, future: Future):
+        if future.exception() is not None:
+            return
+        text = future.result().get("current_question")
+        if not text:
+            return
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._audio[text] = _prefetch_executor.submit(self._synthesize, text)
+
+    def take(self, state: AgentState) -> Optional[Dict[str, Any]]:
+        """
+        Returns the prefetched state update if it was generated for `state`,
+        otherwise None. A prefetch can only be taken once.
+        """
+        with self._lock:
+            key, future = self._key, self._future
+            self._key, self._future = None, None
+        if future is None:
+            return None
+        if key != prefetch_key(state):
+            logger.info("Prefetched question invalidated; regenerating")
+            return None
+        try:
+            return future.result(timeout=config.PREFETCH_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Prefetched question unavailable: {e}")
+            return None
+
+    def audio_for(self, text: str):
+        """
+        Returns pre-synthesized audio for `text` if the prefetch produced it.
+        """
+        with self._lock:
+            future = self._audio.pop(text, None)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=config.PREFETCH_WAIT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Prefetched audio unavailable: {e}")
+            return None
+
+    def invalidate(self):
+        with self._lock:
+            self._generation += 1
+            self._key = None
+            self._future = None
+            self._audio = {}
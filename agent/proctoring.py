@@ -0,0 +1,154 @@
+import atexit
+import queue
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from agent import db
+from agent.logger import get_logger
+import config
+
+logger = get_logger(__name__)
+
+# Proctoring events from the tab switch tracker are queued in memory and written
+# to violations.db in batches by one background thread, so recording an event
+# never waits on disk.
+
+# Event types sent by components/tab_switch_tracker
+TAB_SWITCH = "tab_switch"
+AUTO_SUBMIT = "auto_submit"
+
+_events: "queue.Queue" = queue.Queue(maxsize=config.PROCTORING_QUEUE_SIZE)
+_writer: Optional[threading.Thread] = None
+_writer_lock = threading.Lock()
+_schema_ready = False
+_dropped = 0
+
+def init_violations_db():
+    """
+    Creates violations.db with the violations table and its index if they don't exist yet.
+    """
+    global _schema_ready
+    if _schema_ready:
+        return
+    with db.transaction(config.VIOLATIONS_DB_PATH) as conn:
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS violations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                violation_type TEXT NOT NULL,
+                timestamp INTEGER NOT NULL
+            )
+        ''')
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_violations_session ON violations (session_id, violation_type)")
+    _schema_ready = True
+
+def record_events(session_id: str, events: Iterable[Dict]) -> int:
+    """
+    Queues tracker events ({"type", "ts"} with ts in epoch ms) for `session_id`.
+    Never blocks: if the queue is full the event is dropped and counted.
+    Returns the number of events queued.
+    """
+    global _dropped
+    _ensure_writer()
+    queued = 0
+    for event in events:
+        row = (session_id.lower(), str(event.get("type", "unknown")), int(event.get("ts") or time.time() * 1000))
+        try:
+            _events.put_nowait(row)
+            queued += 1
+        except queue.Full:
+            _dropped += 1
+            logger.warning(f"Proctoring queue full; dropped event {row[1]} for {row[0]} ({_dropped} dropped so far)")
+    return queued
+
+def flush(timeout: float = 5.0) -> bool:
+    """
+    Waits until every event queued so far is written. Returns False on timeout.
+    """
+    if _writer is None:
+        return True
+    done = threading.Event()
+    try:
+        _events.put(done, timeout=timeout)
+    except queue.Full:
+        return False
+    return done.wait(timeout)
+
+def _ensure_writer():
+    global _writer
+    if _writer is not None:
+        return
+    with _writer_lock:
+        if _writer is None:
+            _writer = threading.Thread(target=_write_loop, name="proctoring-writer", daemon=True)
+            _writer.start()
+            atexit.register(flush)
+
+def _write_loop():
+    init_violations_db()
+    while True:
+        batch, waiters = [], []
+        item = _events.get()
+        # Collect whatever else arrives within the flush interval, up to a batch
+        deadline = time.monotonic() + config.PROCTORING_FLUSH_SECONDS
+        while True:
+            if isinstance(item, threading.Event):
+                waiters.append(item)
+            else:
+                batch.append(item)
+            if len(batch) >= config.PROCTORING_BATCH_SIZE or waiters:
+                break
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = _events.get(timeout=remaining)
+            except queue.Empty:
+                break
+        if batch:
+            try:
+                with db.transaction(config.VIOLATIONS_DB_PATH) as conn:
+                    conn.executemany(
+                        "INSERT INTO violations (session_id, violation_type, timestamp) VALUES (?, ?, ?)",
+                        batch,
+                    )
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} proctoring events: {e}")
+        for waiter in waiters:
+            waiter.set()
+
+def get_violation_summaries(session_ids: List[str]) -> Dict[str, Dict]:
+    """
+    Per-session aggregates for the given sessions:
+    {"total", "tab_switches", "auto_submitted", "by_type", "first_at", "last_at"} (epoch ms).
+    Sessions without events are omitted.
+    """
+    if not session_ids:
+        return {}
+    init_violations_db()
+    ids = [s.lower() for s in session_ids]
+    placeholders = ", ".join("?" * len(ids))
+    with db.connection(config.VIOLATIONS_DB_PATH) as conn:
+        rows = conn.execute(f'''
+            SELECT session_id, violation_type, COUNT(*) AS n, MIN(timestamp) AS first_at, MAX(timestamp) AS last_at
+            FROM violations WHERE session_id IN ({placeholders})
+            GROUP BY session_id, violation_type
+        ''', ids).fetchall()
+
+    summaries: Dict[str, Dict] = {}
+    for row in rows:
+        summary = summaries.setdefault(row["session_id"], {
+            "total": 0, "tab_switches": 0, "auto_submitted": False, "by_type": {},
+            "first_at": row["first_at"], "last_at": row["last_at"],
+        })
+        summary["total"] += row["n"]
+        summary["by_type"][row["violation_type"]] = row["n"]
+        summary["first_at"] = min(summary["first_at"], row["first_at"])
+        summary["last_at"] = max(summary["last_at"], row["last_at"])
+    for summary in summaries.values():
+        summary["tab_switches"] = summary["by_type"].get(TAB_SWITCH, 0)
+        summary["auto_submitted"] = AUTO_SUBMIT in summary["by_type"]
+    return summaries
+
+def get_violation_summary(session_id: str) -> Optional[Dict]:
+    return get_violation_summaries([session_id]).get(session_id.lower())
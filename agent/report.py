@@ -1,8 +1,8 @@
 from fpdf import FPDF
 import json
 from typing import Dict, Any, Optional
-from langchain_core.messages import HumanMessage
-from agent.utils import get_llm, extract_json
+from agent.utils import invoke_llm, extract_json
+from agent.metrics import summarize_evaluations
 from prompts.templates import HR_RECOMMENDATION_PROMPT
 import config
 
@@ -17,7 +17,14 @@ class PDFReport(FPDF):
         self.set_font('Arial', 'I', 8)
         self.cell(0, 10, f'Page {self.page_no()}', 0, 0, 'C')
 
-def generate_pdf_report(candidate_name, interview_data, avg_score, resume_score, recommendation: Optional[dict] = None):
+def generate_pdf_report(candidate_name, interview_data, avg_score, resume_score, recommendation: Optional[dict] = None,
+                        violations: Optional[dict] = None, summary: Optional[dict] = None):
+    """
+    `summary` is the candidate row's stored summary columns (evaluation_count,
+    answered_count, skipped_count, total_score, total_duration, as written by
+    db.update_interview_result), so the report shows the same numbers as the
+    dashboard. Only recomputed from `interview_data` if not given.
+    """
     pdf = PDFReport()
     pdf.add_page()
     
@@ -25,7 +32,6 @@ def generate_pdf_report(candidate_name, interview_data, avg_score, resume_score,
     pdf.cell(200, 10, txt="Interview Report", ln=True, align='C')
     pdf.ln(10)
     
-    # Calculate Skips
     if interview_data is None:
         interview_data = []
 
@@ -35,8 +41,11 @@ def generate_pdf_report(candidate_name, interview_data, avg_score, resume_score,
         except:
             interview_data = []
         
-    skipped_count = sum(1 for item in interview_data if item.get('score') == 0 and "skipped" in item.get('feedback', '').lower())
-    answered_count = len(interview_data) - skipped_count
+    if summary is None:
+        summary = summarize_evaluations(interview_data)
+    answered_count = summary.get("answered_count") or 0
+    skipped_count = summary.get("skipped_count") or 0
+    total_duration = summary.get("total_duration") or 0
     
     # Candidate Info
     pdf.set_font("Arial", size=12)
@@ -44,8 +53,22 @@ def generate_pdf_report(candidate_name, interview_data, avg_score, resume_score,
     pdf.cell(200, 10, txt=f"Resume Score: {resume_score}%", ln=True)
     pdf.cell(200, 10, txt=f"Interview Score: {avg_score:.1f} / 10", ln=True)
     pdf.cell(200, 10, txt=f"Answered: {answered_count} | Skipped: {skipped_count}", ln=True)
+    pdf.cell(200, 10, txt=f"Total Time: {round(total_duration, 1)}s", ln=True)
     pdf.ln(10)
 
+    # Proctoring summary (from agent.proctoring.get_violation_summary)
+    if violations:
+        pdf.set_font("Arial", 'B', 13)
+        pdf.cell(200, 8, txt="Proctoring", ln=True)
+        pdf.set_font("Arial", size=11)
+        pdf.cell(200, 6, txt=f"Tab Switches: {violations.get('tab_switches', 0)} | Events Recorded: {violations.get('total', 0)}", ln=True)
+        by_type = ", ".join(f"{k}: {v}" for k, v in sorted(violations.get("by_type", {}).items()))
+        if by_type:
+            pdf.cell(200, 6, txt=f"By Type: {by_type}", ln=True)
+        if violations.get("auto_submitted"):
+            pdf.cell(200, 6, txt="Interview was auto-submitted after repeated tab switches.", ln=True)
+        pdf.ln(8)
+
     # HR Recommendation Summary
     if recommendation:
         pdf.set_font("Arial", 'B', 13)
@@ -102,7 +125,7 @@ def generate_pdf_report(candidate_name, interview_data, avg_score, resume_score,
         
     return pdf.output(dest='S').encode('latin-1', 'replace') # Return bytes
 
-def generate_hr_recommendation(interview_data, avg_score: float, resume_score: float) -> Dict[str, Any]:
+def generate_hr_recommendation(interview_data, avg_score: float, resume_score: float, interview_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate an HR recommendation summary and decision based on interview data.
     """
@@ -112,9 +135,14 @@ def generate_hr_recommendation(interview_data, avg_score: float, resume_score: f
             resume_score=resume_score,
             interview_data=json.dumps(interview_data)
         )
-        llm = get_llm(temperature=config.TEMPERATURE_RECOMMEND, max_tokens=config.MAX_TOKENS_RECOMMEND)
-        response = llm.invoke([HumanMessage(content=prompt)])
-        rec = extract_json(response.content)
+        response_text = invoke_llm(
+            "hr_recommendation",
+            prompt,
+            temperature=config.TEMPERATURE_RECOMMEND,
+            max_tokens=config.MAX_TOKENS_RECOMMEND,
+            interview_id=interview_id,
+        )
+        rec = extract_json(response_text)
     except Exception:
         rec = {}
 
@@ -1,26 +1,183 @@
 from pypdf import PdfReader
 from io import BytesIO
-from langchain_core.messages import HumanMessage
-from agent.utils import get_llm, extract_json
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import hashlib
+import json
+import multiprocessing
+import threading
+import time
+from typing import Dict, Iterator, List, Tuple
+from agent.utils import invoke_llm, extract_json
 from prompts.templates import RESUME_SCREENING_PROMPT
+from agent.db import get_cached_screening, save_cached_screening, invalidate_screening_cache, flush_screening_cache_stats
 import config
 from agent.logger import get_logger
 
 logger = get_logger(__name__)
 
-def extract_text_from_pdf(file_obj) -> str:
+# Changes whenever RESUME_SCREENING_PROMPT is edited, which invalidates cached results
+SCREENING_PROMPT_VERSION = hashlib.sha256(RESUME_SCREENING_PROMPT.encode("utf-8")).hexdigest()[:16]
+
+_cache_lock = threading.Lock()
+_cache_checked = False
+
+def _ensure_cache_current():
+    """
+    Drops cached results from older prompt versions, once per process.
+    """
+    global _cache_checked
+    if _cache_checked:
+        return
+    with _cache_lock:
+        if not _cache_checked:
+            removed = invalidate_screening_cache(keep_prompt_version=SCREENING_PROMPT_VERSION)
+            if removed:
+                logger.info(f"Invalidated {removed} cached screening results from an older prompt")
+            _cache_checked = True
+
+def screening_cache_key(resume_text: str, jd_text: str, current_date: str) -> str:
+    """
+    Content hash of everything that determines a screening result.
+    Whitespace is normalized so re-extracted copies of the same PDF hit the cache.
+    """
+    payload = {
+        "resume": " ".join(resume_text.split()),
+        "jd": " ".join(jd_text.split()),
+        "prompt_version": SCREENING_PROMPT_VERSION,
+        "model": config.MODEL_NAME,
+        "temperature": config.TEMPERATURE_EVAL,
+        # "Present" in a resume is resolved against this, so it affects years of experience
+        "current_date": current_date,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+_pdf_pool: ProcessPoolExecutor | None = None
+_pdf_pool_lock = threading.Lock()
+
+def extract_text_from_pdf(file_obj, max_chars: int | None = None, max_pages: int | None = None,
+                          time_budget: float | None = None) -> str:
     """
     Extracts text from a PDF file object (bytes).
+    Stops early once `max_chars` characters were collected, after `max_pages`
+    pages, or when `time_budget` seconds have passed.
     """
     try:
         reader = PdfReader(file_obj)
-        text = ""
-        for page in reader.pages:
-            text += page.extract_text() or ""
-        return text
+        parts = []
+        collected = 0
+        started = time.monotonic()
+        for page_no, page in enumerate(reader.pages):
+            if max_pages is not None and page_no >= max_pages:
+                break
+            page_text = page.extract_text() or ""
+            parts.append(page_text)
+            collected += len(page_text)
+            if max_chars is not None and collected >= max_chars:
+                break
+            if time_budget is not None and time.monotonic() - started > time_budget:
+                logger.warning(f"PDF extraction stopped after {page_no + 1} pages (time budget exceeded)")
+                break
+        return "".join(parts)
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
+def _extract_pdf_bytes(file_bytes: bytes) -> str:
+    # Runs in a worker process
+    return extract_text_from_pdf(
+        BytesIO(file_bytes),
+        max_chars=config.RESUME_MAX_CHARS,
+        max_pages=config.PDF_MAX_PAGES,
+        time_budget=config.PDF_EXTRACT_TIMEOUT_SECONDS,
+    )
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            # Forking would copy the app's threads and held locks (DB pool, LLM clients) into the worker
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pdf_pool = ProcessPoolExecutor(max_workers=config.PDF_EXTRACT_WORKERS,
+                                            mp_context=multiprocessing.get_context(method))
+        return _pdf_pool
+
+def _reset_pdf_pool(pool: ProcessPoolExecutor, kill: bool = False):
+    """
+    Replaces `pool` (if it is still the shared one). With `kill`, its worker
+    processes are terminated first: a future timing out does not stop a worker
+    stuck in a single page's extract_text().
+    """
+    global _pdf_pool
+    with _pdf_pool_lock:
+        if _pdf_pool is pool:
+            _pdf_pool = None
+    if kill:
+        # ProcessPoolExecutor has no public way to stop running tasks
+        for process in list((pool._processes or {}).values()):
+            process.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def extract_text_in_pool(file_bytes: bytes) -> str:
+    """
+    Extracts PDF text in the shared process pool so big or scanned PDFs don't
+    block the calling thread's interpreter. Raises TimeoutError if the file
+    takes longer than PDF_EXTRACT_TIMEOUT_SECONDS (plus a grace period); the
+    stuck worker is killed and the pool recreated.
+    """
+    for attempt in range(2):
+        pool = _get_pdf_pool()
+        future = pool.submit(_extract_pdf_bytes, file_bytes)
+        try:
+            return future.result(timeout=config.PDF_EXTRACT_TIMEOUT_SECONDS + 5)
+        # Distinct from the builtin TimeoutError before Python 3.11
+        except (TimeoutError, FuturesTimeoutError):
+            logger.warning("PDF extraction timed out; restarting the PDF worker pool")
+            _reset_pdf_pool(pool, kill=True)
+            raise
+        except BrokenProcessPool:
+            with _pdf_pool_lock:
+                replaced = _pdf_pool is not pool
+            _reset_pdf_pool(pool)
+            # Killed along with another file's stuck worker: retry once in the new pool
+            if not replaced or attempt:
+                raise
+
+def _screen_resume(resume_text: str, jd_text: str) -> Dict:
+    """
+    Runs the screening prompt and returns the parsed JSON. Raises on LLM errors.
+    """
+    from datetime import datetime
+    resume_text = resume_text[:config.RESUME_MAX_CHARS]
+    jd_text = jd_text[:2000]
+    current_date = datetime.now().strftime("%B %Y")
+
+    _ensure_cache_current()
+    cache_key = screening_cache_key(resume_text, jd_text, current_date)
+    cached = get_cached_screening(cache_key)
+    if cached is not None:
+        logger.info("Screening cache hit")
+        return cached
+
+    prompt = RESUME_SCREENING_PROMPT.format(
+        resume_text=resume_text,
+        jd_text=jd_text,
+        current_date=current_date
+    )
+    
+    response_text = invoke_llm(
+        "screen_resume",
+        prompt,
+        temperature=config.TEMPERATURE_EVAL,
+        max_tokens=config.MAX_TOKENS_EVAL,
+    )
+    
+    result = extract_json(response_text)
+    # Don't cache unparseable responses; a retry may succeed
+    if result.get("reasoning") != "Parser Error":
+        save_cached_screening(cache_key, SCREENING_PROMPT_VERSION, result)
+    return result
+
 def screen_resume(resume_text: str, jd_text: str):
     """
     Screens the resume against the JD using the LLM.
@@ -28,17 +185,43 @@ def screen_resume(resume_text: str, jd_text: str):
     """
     try:
         logger.info("Screening resume against JD")
-        from datetime import datetime
-        prompt = RESUME_SCREENING_PROMPT.format(
-            resume_text=resume_text[:4000],
-            jd_text=jd_text[:2000],
-            current_date=datetime.now().strftime("%B %Y")
-        )
-        
-        llm = get_llm(temperature=config.TEMPERATURE_EVAL, max_tokens=config.MAX_TOKENS_EVAL)
-        response = llm.invoke([HumanMessage(content=prompt)])
-        
-        return extract_json(response.content)
+        return _screen_resume(resume_text, jd_text)
     except Exception as e:
         logger.error(f"Error screening resume: {e}")
         return {"score": 0, "reasoning": f"Error: {str(e)}", "name": "Unknown"}
+
+def _screen_resume_file(file_bytes: bytes, jd_text: str) -> Dict:
+    try:
+        resume_text = extract_text_in_pool(file_bytes)
+    except (TimeoutError, FuturesTimeoutError):
+        raise ValueError(f"PDF extraction timed out after {config.PDF_EXTRACT_TIMEOUT_SECONDS}s")
+    if resume_text.startswith("Error reading PDF") or not resume_text.strip():
+        raise ValueError(resume_text or "No text found in PDF")
+    return _screen_resume(resume_text, jd_text)
+
+def screen_resumes(files: List[Tuple[str, bytes]], jd_text: str, max_workers: int | None = None) -> Iterator[Dict]:
+    """
+    Screens a batch of resumes concurrently.
+    files: list of (file_name, pdf_bytes)
+    Yields one result per file as soon as it completes:
+    {"file_name": str, "analysis": dict | None, "error": str | None}
+    A failing resume only produces an error entry; the rest of the batch continues.
+    """
+    max_workers = max_workers or config.RESUME_SCREENING_WORKERS
+    logger.info(f"Screening {len(files)} resumes with {max_workers} workers")
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screening") as executor:
+            futures = {
+                executor.submit(_screen_resume_file, file_bytes, jd_text): file_name
+                for file_name, file_bytes in files
+            }
+            for future in as_completed(futures):
+                file_name = futures[future]
+                try:
+                    yield {"file_name": file_name, "analysis": future.result(), "error": None}
+                except Exception as e:
+                    logger.error(f"Error screening {file_name}: {e}")
+                    yield {"file_name": file_name, "analysis": None, "error": str(e)}
+    finally:
+        # Cache hit/miss counts are written once per batch
+        flush_screening_cache_stats()
@@ -0,0 +1,478 @@
+import atexit
+import json
+import os
+import platform
+import re
+import selectors
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from agent.logger import get_logger
+import config
+
+logger = get_logger(__name__)
+
+# Local code execution. Candidate code runs in short-lived worker processes
+# (agent/sandbox_worker.py) inside new user, mount, PID and network namespaces
+# (`unshare -rnm --pid --fork`): the filesystem is a read-only root with only
+# system directories and the run's working directory, there is no network, the
+# job runs without capabilities, and killing the worker kills every process the
+# job started. On top of that come
+# CPU / memory / file / process rlimits, a wall clock enforced here and output
+# caps. A few workers per language are kept started and waiting so a run does
+# not pay interpreter and namespace startup.
+
+_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "sandbox_worker.py")
+
+# language -> source file, optional compile command, run command (None = run
+# in the warm Python worker itself) and extra limits
+LANGUAGES: Dict[str, Dict] = {
+    "python": {
+        "aliases": ["py", "python3"],
+        "file": "main.py",
+        "run": None,
+    },
+    "javascript": {
+        "aliases": ["js", "node", "node-js"],
+        "file": "main.js",
+        # V8 reserves far more address space than it uses; cap the heap instead of RLIMIT_AS
+        "run": ["node", "--max-old-space-size={memory_mb}", "main.js"],
+        "address_space_limit": False,
+    },
+    "bash": {
+        "aliases": ["sh"],
+        "file": "main.sh",
+        "run": ["bash", "main.sh"],
+    },
+    "c": {
+        "aliases": ["gcc"],
+        "file": "main.c",
+        "compile": ["gcc", "-O2", "-std=c17", "-o", "main", "main.c", "-lm"],
+        "run": ["./main"],
+    },
+    "c++": {
+        "aliases": ["cpp", "g++"],
+        "file": "main.cpp",
+        "compile": ["g++", "-O2", "-std=c++17", "-o", "main", "main.cpp"],
+        "run": ["./main"],
+    },
+}
+
+_ALIASES = {alias: name for name, spec in LANGUAGES.items() for alias in [name] + spec["aliases"]}
+_VERSION = re.compile(r"\d+(?:\.\d+)+")
+
+# Killing unshare (--kill-child) kills the namespace's init, which takes every descendant with it
+_UNSHARE = ["unshare", "--user", "--map-root-user", "--net", "--mount", "--pid", "--fork", "--kill-child"]
+
+_versions: Dict[str, str] = {}
+_isolation: Optional[bool] = None
+
+def resolve_language(language: str) -> Optional[str]:
+    return _ALIASES.get((language or "").strip().lower())
+
+def _executable(name: str) -> Optional[str]:
+    spec = LANGUAGES[name]
+    if spec["run"] is None:
+        return sys.executable
+    return shutil.which((spec.get("compile") or spec["run"])[0])
+
+def _version(name: str) -> str:
+    if name not in _versions:
+        if name == "python":
+            _versions[name] = platform.python_version()
+        else:
+            try:
+                out = subprocess.run([_executable(name), "--version"], capture_output=True, text=True, timeout=5)
+                match = _VERSION.search(out.stdout + out.stderr)
+                _versions[name] = match.group(0) if match else "local"
+            except (OSError, subprocess.SubprocessError):
+                _versions[name] = "local"
+    return _versions[name]
+
+def get_runtimes() -> List[Dict]:
+    """
+    Languages that can run on this host, in the Piston runtimes format.
+    """
+    return [
+        {"language": name, "version": _version(name), "aliases": spec["aliases"]}
+        for name, spec in LANGUAGES.items()
+        if _executable(name)
+    ]
+
+def isolation_available() -> bool:
+    """
+    Whether this host allows unprivileged user, mount, PID and network namespaces.
+    """
+    global _isolation
+    if _isolation is None:
+        try:
+            _isolation = subprocess.run(_UNSHARE + ["true"], capture_output=True, timeout=5).returncode == 0
+        except (OSError, subprocess.SubprocessError):
+            _isolation = False
+        if not _isolation:
+            logger.warning("Namespaces (unshare) are not available; sandboxed code would not be isolated")
+    return _isolation
+
+def _worker_command() -> List[str]:
+    command = [sys.executable, "-I", "-u", _WORKER_SCRIPT]
+    if isolation_available():
+        command = _UNSHARE + command
+    return command
+
+def _worker_env(home: str) -> Dict[str, str]:
+    return {
+        "PATH": "/usr/local/bin:/usr/bin:/bin",
+        "HOME": home,
+        "LANG": "C.UTF-8",
+        "PYTHONIOENCODING": "utf-8",
+        "PYTHONDONTWRITEBYTECODE": "1",
+    }
+
+class WorkerPool:
+    """
+    Idle sandbox workers kept started for one language. `acquire` hands out a
+    waiting worker (or starts one) and refills the pool in the background.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self._idle: deque = deque()
+        self._lock = threading.Lock()
+        self._refilling = False
+
+    def _spawn(self) -> subprocess.Popen:
+        status_read, status_write = os.pipe()
+        command = _worker_command() + [str(status_write)]
+        cgroup = _create_pids_cgroup()
+        if cgroup:
+            # Join the cgroup before unshare starts, so every process of the job is counted
+            command = ["sh", "-c", 'echo $$ > "$0/cgroup.procs" && exec "$@"', cgroup] + command
+        try:
+            proc = subprocess.Popen(
+                command,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=tempfile.gettempdir(),
+                env=_worker_env(tempfile.gettempdir()),
+                pass_fds=(status_write,),
+                # Own process group so everything the job starts can be killed together
+                start_new_session=True,
+            )
+        except OSError:
+            os.close(status_read)
+            _remove_cgroup(cgroup)
+            raise
+        finally:
+            os.close(status_write)
+        proc.status_fd = status_read
+        proc.cgroup = cgroup
+        return proc
+
+    def acquire(self) -> subprocess.Popen:
+        worker = None
+        with self._lock:
+            while self._idle and worker is None:
+                candidate = self._idle.popleft()
+                if candidate.poll() is None:
+                    worker = candidate
+        self.refill()
+        return worker or self._spawn()
+
+    def refill(self):
+        with self._lock:
+            if self._refilling or len(self._idle) >= self.size:
+                return
+            self._refilling = True
+        _refill_executor.submit(self._refill)
+
+    def _refill(self):
+        try:
+            while True:
+                with self._lock:
+                    if len(self._idle) >= self.size:
+                        return
+                worker = self._spawn()
+                with self._lock:
+                    self._idle.append(worker)
+        except OSError as e:
+            logger.error(f"Failed to start sandbox worker: {e}")
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def close(self):
+        with self._lock:
+            workers, self._idle = list(self._idle), deque()
+        for worker in workers:
+            _kill(worker)
+            os.close(worker.status_fd)
+
+_refill_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="sandbox-refill")
+_pools: Dict[str, WorkerPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(name: str) -> WorkerPool:
+    pool = _pools.get(name)
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get(name)
+            if pool is None:
+                pool = WorkerPool(config.CODE_EXEC_WARM_WORKERS)
+                _pools[name] = pool
+    return pool
+
+def warm_up(languages: Optional[List[str]] = None):
+    """
+    Starts the idle workers for `languages` (default: every available one) in the background.
+    """
+    for language in languages or [r["language"] for r in get_runtimes()]:
+        name = resolve_language(language)
+        if name:
+            _get_pool(name).refill()
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+
+atexit.register(close_pools)
+
+def _kill(proc: subprocess.Popen):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    proc.wait()
+    _remove_cgroup(getattr(proc, "cgroup", None))
+
+def _create_pids_cgroup() -> Optional[str]:
+    """
+    A fresh child of CODE_EXEC_PIDS_CGROUP with pids.max = CODE_EXEC_MAX_PROCESSES,
+    or None when not configured. RLIMIT_NPROC alone does not bind a server running as root.
+    """
+    parent = config.CODE_EXEC_PIDS_CGROUP
+    if not parent or not config.CODE_EXEC_MAX_PROCESSES:
+        return None
+    path = tempfile.mkdtemp(prefix="sandbox-", dir=parent)
+    try:
+        with open(os.path.join(path, "pids.max"), "w") as f:
+            f.write(str(config.CODE_EXEC_MAX_PROCESSES))
+    except OSError as e:
+        logger.warning(f"Could not set up pids cgroup {path}: {e}")
+        _remove_cgroup(path)
+        return None
+    return path
+
+def _remove_cgroup(path: Optional[str]):
+    if not path:
+        return
+    # The kernel releases the killed processes asynchronously
+    for _ in range(50):
+        try:
+            os.rmdir(path)
+            return
+        except FileNotFoundError:
+            return
+        except OSError:
+            time.sleep(0.01)
+    logger.warning(f"Could not remove pids cgroup {path}")
+
+def _read_status(proc: subprocess.Popen) -> Dict:
+    # {"code", "signal"} of the job as reported by the worker; empty if it was killed first
+    try:
+        os.set_blocking(proc.status_fd, False)
+        data = os.read(proc.status_fd, 4096)
+        return json.loads(data) if data else {}
+    except (OSError, ValueError):
+        return {}
+    finally:
+        os.close(proc.status_fd)
+
+def _limits(spec: Dict, cpu_seconds: float, memory_mb: int) -> Dict:
+    return {
+        "cpu_seconds": max(1, int(cpu_seconds + 0.999)),
+        "memory_bytes": memory_mb * 1024 * 1024 if spec.get("address_space_limit", True) else None,
+        "file_bytes": config.CODE_EXEC_MAX_FILE_MB * 1024 * 1024,
+        "open_files": config.CODE_EXEC_MAX_OPEN_FILES,
+        "processes": config.CODE_EXEC_MAX_PROCESSES,
+    }
+
+def _note(stderr: str, message: str) -> str:
+    return stderr + ("\n" if stderr and not stderr.endswith("\n") else "") + message
+
+def _communicate(proc: subprocess.Popen, job: bytes, timeout: float, max_output: int) -> Dict:
+    """
+    Sends the job and collects output until the worker exits, the wall clock
+    runs out or the output cap is hit (the latter two kill the process group).
+    Returns a Piston-style stage: {"stdout", "stderr", "output", "code", "signal"}.
+    """
+    try:
+        proc.stdin.write(job)
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+
+    out_fd, err_fd = proc.stdout.fileno(), proc.stderr.fileno()
+    buffers = {out_fd: bytearray(), err_fd: bytearray()}
+    selector = selectors.DefaultSelector()
+    for fd in buffers:
+        os.set_blocking(fd, False)
+        selector.register(fd, selectors.EVENT_READ)
+    deadline = time.monotonic() + timeout
+    timed_out = truncated = exited = False
+    while selector.get_map() and not truncated and not exited:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            timed_out = True
+            break
+        # Wake up regularly: a process that left the pipes to a stray child has still finished
+        ready = selector.select(min(remaining, 0.05))
+        exited = proc.poll() is not None
+        if exited:
+            # Take what is already buffered, but do not wait on anyone still holding the pipes
+            ready = [(key, None) for key in selector.get_map().values()]
+        for key, _ in ready:
+            while True:
+                try:
+                    chunk = os.read(key.fd, 65536)
+                except BlockingIOError:
+                    break
+                if not chunk:
+                    selector.unregister(key.fd)
+                    break
+                buffers[key.fd] += chunk
+                if len(buffers[out_fd]) + len(buffers[err_fd]) > max_output:
+                    truncated = True
+                    break
+                if not exited:
+                    break
+            if truncated:
+                break
+    selector.close()
+
+    # Killing the worker also removes anything it left behind (its PID namespace, or its process group)
+    _kill(proc)
+    proc.stdout.close()
+    proc.stderr.close()
+
+    stdout = buffers[out_fd][:max_output].decode("utf-8", errors="replace")
+    stderr = buffers[err_fd][:max_output].decode("utf-8", errors="replace")
+    if timed_out:
+        stderr = _note(stderr, f"Time limit exceeded ({timeout:g}s)")
+    if truncated:
+        stderr = _note(stderr, f"Output limit exceeded ({max_output} bytes)")
+    status = _read_status(proc)
+    if timed_out or truncated:
+        code, sig = None, "SIGKILL"
+    elif status:
+        code = status["code"]
+        sig = signal.Signals(status["signal"]).name if status["signal"] else None
+    else:
+        # The worker itself failed before the job ran (its error is on stderr)
+        code, sig = proc.returncode if proc.returncode and proc.returncode > 0 else -1, None
+    if sig == "SIGXCPU":
+        stderr = _note(stderr, "CPU time limit exceeded")
+    return {"stdout": stdout, "stderr": stderr, "output": stdout + stderr, "code": code, "signal": sig}
+
+def _run_job(name: str, cwd: str, stdin: str, timeout: float, limits: Dict,
+             argv: Optional[List[str]] = None, python_file: Optional[str] = None) -> Dict:
+    job = {"cwd": os.path.join(cwd, "work"), "stdin": stdin, "limits": limits}
+    if isolation_available():
+        job["root"] = os.path.join(cwd, "root")
+    if python_file:
+        job["python_file"] = python_file
+    else:
+        job["argv"] = argv
+    worker = _get_pool(name).acquire()
+    return _communicate(worker, (json.dumps(job) + "\n").encode("utf-8"), timeout, config.CODE_EXEC_MAX_OUTPUT_BYTES)
+
+def _error(message: str, language: str = "", version: str = "") -> Dict:
+    stage = {"stdout": "", "stderr": message, "output": message, "code": -1, "signal": None}
+    return {"language": language, "version": version, "run": stage}
+
+def prepare(language: str, code: str) -> Dict:
+    """
+    Writes `code` to a fresh working directory and compiles it if the
+    language needs it. Returns a program for `run`; if it cannot run, the
+    program carries "result" (Piston shape, with the compile stage) instead.
+    Call `cleanup` when done.
+    """
+    name = resolve_language(language)
+    if name is None or not _executable(name):
+        return {"result": _error(f"Unsupported language: {language}", language)}
+    if config.CODE_EXEC_REQUIRE_ISOLATION and not isolation_available():
+        return {"result": _error("Code execution is unavailable: this host does not allow sandbox namespaces (unshare)", name)}
+
+    spec = LANGUAGES[name]
+    program = {
+        "name": name,
+        "version": _version(name),
+        "dir": tempfile.mkdtemp(prefix="sandbox-", dir=config.CODE_EXEC_WORK_DIR),
+    }
+    # work/ is the job's /work, root/ the empty mount point its sandbox root is built on
+    os.makedirs(os.path.join(program["dir"], "work"))
+    os.makedirs(os.path.join(program["dir"], "root"))
+    with open(os.path.join(program["dir"], "work", spec["file"]), "w", encoding="utf-8") as f:
+        f.write(code)
+    if spec.get("compile"):
+        stage = _run_job(
+            name, program["dir"], "",
+            timeout=config.CODE_EXEC_COMPILE_TIMEOUT_SECONDS,
+            # The compiler forks its own passes, so no process limit here
+            limits=dict(_limits(spec, config.CODE_EXEC_COMPILE_TIMEOUT_SECONDS, config.CODE_EXEC_COMPILE_MEMORY_MB), processes=None),
+            argv=spec["compile"],
+        )
+        program["compile"] = stage
+        if stage["code"] != 0:
+            # Report the compile failure as the run too, so callers checking "run" see it
+            program["result"] = {"language": name, "version": program["version"], "compile": stage, "run": stage}
+    return program
+
+def run(program: Dict, stdin: str = "") -> Dict:
+    """
+    Runs a prepared program once with `stdin`. Returns the Piston execute shape:
+    {"language", "version", "run": {"stdout", "stderr", "output", "code", "signal"}} (+ "compile").
+    Safe to call concurrently for one program: each run gets its own copy of
+    the prepared /work, so runs never see each other's files.
+    """
+    if "result" in program:
+        return program["result"]
+    name = program["name"]
+    spec = LANGUAGES[name]
+    limits = _limits(spec, config.CODE_EXEC_CPU_SECONDS, config.CODE_EXEC_MEMORY_MB)
+    run_dir = tempfile.mkdtemp(prefix="run-", dir=program["dir"])
+    try:
+        shutil.copytree(os.path.join(program["dir"], "work"), os.path.join(run_dir, "work"), symlinks=True)
+        os.makedirs(os.path.join(run_dir, "root"))
+        if spec["run"] is None:
+            stage = _run_job(name, run_dir, stdin, config.CODE_EXEC_TIMEOUT_SECONDS, limits,
+                             python_file=spec["file"])
+        else:
+            argv = [arg.format(memory_mb=config.CODE_EXEC_MEMORY_MB) for arg in spec["run"]]
+            stage = _run_job(name, run_dir, stdin, config.CODE_EXEC_TIMEOUT_SECONDS, limits, argv=argv)
+    finally:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    result = {"language": name, "version": program["version"], "run": stage}
+    if "compile" in program:
+        result["compile"] = program["compile"]
+    return result
+
+def cleanup(program: Dict):
+    if program.get("dir"):
+        shutil.rmtree(program["dir"], ignore_errors=True)
+
+def execute(language: str, code: str, stdin: str = "") -> Dict:
+    program = prepare(language, code)
+    try:
+        return run(program, stdin)
+    finally:
+        cleanup(program)
@@ -0,0 +1,231 @@
+"""
+Pre-warmed sandbox worker for agent/sandbox.py. Not imported by the app.
+
+Started ahead of time inside fresh user, mount, PID and network namespaces
+(`unshare -rnm --pid --fork`) and left waiting on stdin. It reads a single
+JSON job, builds a read-only root that only contains the system directories
+and the job's working directory (mounted at /work), pivots into it and
+detaches the old root. The job then drops every capability, applies the
+resource limits and either runs Python code in this already-initialized
+interpreter or execs the job's command. One job per process: the worker is
+discarded afterwards.
+
+Usage: sandbox_worker.py STATUS_FD. The job's exit is written to STATUS_FD
+as {"code", "signal"}.
+
+Job: {"cwd", "stdin", "root" (empty directory to build the new root on; no
+isolation if missing), "limits": {"cpu_seconds", "memory_bytes", "file_bytes",
+"open_files", "processes"}, and either "python_file" or "argv"}.
+Only the standard library is used here.
+"""
+import ctypes
+from errno import EINVAL
+import json
+import os
+import platform
+import resource
+import sys
+import traceback
+
+def _set_limit(name, value, grace=0):
+    if value is None:
+        return
+    limit = getattr(resource, name)
+    _, hard = resource.getrlimit(limit)
+    if hard != resource.RLIM_INFINITY:
+        value = min(value, hard - grace)
+    resource.setrlimit(limit, (value, value + grace))
+
+def _apply_limits(limits):
+    # CPU time already spent starting this interpreter does not count against the job
+    used = resource.getrusage(resource.RUSAGE_SELF)
+    spent = int(used.ru_utime + used.ru_stime)
+    # One second between the soft and hard limit so the job sees SIGXCPU before SIGKILL
+    _set_limit("RLIMIT_CPU", spent + limits["cpu_seconds"] if limits.get("cpu_seconds") else None, grace=1)
+    _set_limit("RLIMIT_AS", limits.get("memory_bytes"))
+    _set_limit("RLIMIT_FSIZE", limits.get("file_bytes"))
+    _set_limit("RLIMIT_NOFILE", limits.get("open_files"))
+    _set_limit("RLIMIT_NPROC", limits.get("processes"))
+    _set_limit("RLIMIT_CORE", 0)
+
+_MS_RDONLY = 1
+_MS_NOSUID = 2
+_MS_NODEV = 4
+_MS_REMOUNT = 32
+_MS_BIND = 4096
+_MS_REC = 16384
+_MS_PRIVATE = 1 << 18
+_MNT_DETACH = 2
+
+_PR_CAPBSET_DROP = 24
+_PR_SET_NO_NEW_PRIVS = 38
+_PR_CAP_AMBIENT = 47
+_PR_CAP_AMBIENT_CLEAR_ALL = 4
+_CAPABILITY_VERSION_3 = 0x20080522
+# glibc has no pivot_root() wrapper
+_SYS_PIVOT_ROOT = {"x86_64": 155, "aarch64": 41, "riscv64": 41, "i686": 217, "armv7l": 218, "ppc64le": 203, "s390x": 217}
+
+# Visible read-only inside the sandbox (plus this interpreter's prefix)
+_SYSTEM_DIRS = ["/usr", "/bin", "/sbin", "/lib", "/lib32", "/lib64", "/libx32"]
+_ETC_FILES = ["/etc/ld.so.cache", "/etc/ld.so.conf", "/etc/ld.so.conf.d", "/etc/alternatives", "/etc/localtime"]
+_DEVICES = ["/dev/null", "/dev/zero", "/dev/random", "/dev/urandom"]
+_TMP_SIZE = "64m"
+
+_libc = ctypes.CDLL(None, use_errno=True)
+
+def _mount(source, target, fstype, flags, data=None):
+    encode = lambda value: value.encode() if value is not None else None
+    if _libc.mount(encode(source), encode(target), encode(fstype), flags, encode(data)) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"mount {source} on {target}: {os.strerror(errno)}")
+
+def _bind(source, root, read_only=True, mode=0o755):
+    target = root + source
+    if os.path.islink(source):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.symlink(os.readlink(source), target)
+        return
+    if os.path.isdir(source):
+        os.makedirs(target, exist_ok=True)
+    else:
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        open(target, "w").close()
+    _mount(source, target, None, _MS_BIND | _MS_REC)
+    if read_only:
+        _mount(None, target, None, _MS_BIND | _MS_REMOUNT | _MS_RDONLY | _MS_NOSUID | _MS_NODEV)
+
+def _libc_call(name, *args):
+    if getattr(_libc, name)(*args) != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"{name}: {os.strerror(errno)}")
+
+def _pivot_root(root):
+    # pivot_root(".", ".") stacks the old root on top of the new one; detaching
+    # it leaves no path (not even through chroot tricks) back to the host filesystem
+    os.chdir(root)
+    if _libc.syscall(_SYS_PIVOT_ROOT[platform.machine()], b".", b".") != 0:
+        errno = ctypes.get_errno()
+        raise OSError(errno, f"pivot_root: {os.strerror(errno)}")
+    _libc_call("umount2", b".", _MNT_DETACH)
+    os.chdir("/")
+
+class _CapHeader(ctypes.Structure):
+    _fields_ = [("version", ctypes.c_uint32), ("pid", ctypes.c_int)]
+
+class _CapData(ctypes.Structure):
+    _fields_ = [("effective", ctypes.c_uint32), ("permitted", ctypes.c_uint32), ("inheritable", ctypes.c_uint32)]
+
+def _drop_privileges():
+    """
+    The job runs as root of its user namespace; take away every capability
+    (bounding, ambient, effective/permitted/inheritable) so it cannot chroot,
+    mount, or regain them through exec.
+    """
+    # No /proc in the sandbox to read cap_last_cap from: drop until the kernel reports an unknown capability
+    for cap in range(64):
+        if _libc.prctl(_PR_CAPBSET_DROP, cap, 0, 0, 0) != 0:
+            errno = ctypes.get_errno()
+            if errno == EINVAL and cap > 0:
+                break
+            raise OSError(errno, f"PR_CAPBSET_DROP {cap}: {os.strerror(errno)}")
+    _libc_call("prctl", _PR_CAP_AMBIENT, _PR_CAP_AMBIENT_CLEAR_ALL, 0, 0, 0)
+    _libc_call("prctl", _PR_SET_NO_NEW_PRIVS, 1, 0, 0, 0)
+    _libc_call("capset", ctypes.byref(_CapHeader(_CAPABILITY_VERSION_3, 0)), (_CapData * 2)())
+
+def _enter_sandbox(root, work):
+    """
+    Builds a new root on `root` (a tmpfs holding read-only system directories,
+    the device nodes programs need, a private /tmp and `work` at /work) and pivots into it.
+    Nothing else of the host filesystem (app code, databases, audio) is reachable.
+    """
+    _mount(None, "/", None, _MS_REC | _MS_PRIVATE)
+    _mount("tmpfs", root, "tmpfs", _MS_NOSUID | _MS_NODEV, "size=1m,mode=755")
+    prefixes = {os.path.realpath(sys.base_prefix), os.path.realpath(sys.prefix)}
+    for path in _SYSTEM_DIRS + _ETC_FILES + sorted(prefixes):
+        if os.path.lexists(path) and not os.path.lexists(root + path):
+            _bind(path, root)
+    for device in _DEVICES:
+        if os.path.exists(device):
+            _bind(device, root, read_only=False)
+    os.makedirs(root + "/tmp")
+    _mount("tmpfs", root + "/tmp", "tmpfs", _MS_NOSUID | _MS_NODEV, f"size={_TMP_SIZE},mode=1777")
+    os.makedirs(root + "/work")
+    _mount(work, root + "/work", None, _MS_BIND | _MS_NOSUID | _MS_NODEV)
+    _mount(None, root, None, _MS_REMOUNT | _MS_RDONLY | _MS_NOSUID | _MS_NODEV, "size=1m,mode=755")
+    _pivot_root(root)
+    os.chdir("/work")
+    os.environ["HOME"] = "/work"
+    os.environ["TMPDIR"] = "/tmp"
+
+def _run_python(path):
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    sys.argv = [os.path.basename(path)]
+    sys.path.insert(0, os.getcwd())
+    namespace = {"__name__": "__main__", "__file__": path, "__builtins__": __builtins__}
+    code = 0
+    try:
+        exec(compile(source, os.path.basename(path), "exec"), namespace)
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # Hide this worker's frame from the candidate's traceback
+        traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+        code = 1
+    for stream in (sys.stdout, sys.stderr):
+        try:
+            stream.flush()
+        except Exception:
+            pass
+    os._exit(code & 0xFF)
+
+def main():
+    status_fd = int(sys.argv[1])
+    job = json.loads(sys.stdin.buffer.readline())
+
+    # Program input comes from an anonymous in-memory file (runs may share a working directory)
+    fd = os.memfd_create("stdin")
+    data = memoryview((job.get("stdin") or "").encode("utf-8"))
+    while data:
+        data = data[os.write(fd, data):]
+    os.lseek(fd, 0, os.SEEK_SET)
+    os.dup2(fd, 0)
+    os.close(fd)
+    sys.stdin = open(0, encoding="utf-8", closefd=False)
+
+    if job.get("root"):
+        _enter_sandbox(job["root"], job["cwd"])
+    else:
+        os.chdir(job["cwd"])
+
+    # The job runs in a child; this process (the namespace's init when isolated)
+    # reports how it ended on the status pipe and exits, which ends every process the job left
+    pid = os.fork()
+    if pid == 0:
+        os.close(status_fd)
+        try:
+            _apply_limits(job.get("limits") or {})
+            if job.get("root"):
+                _drop_privileges()
+            if "python_file" in job:
+                _run_python(job["python_file"])
+            os.execvp(job["argv"][0], job["argv"])
+        except BaseException:
+            traceback.print_exc()
+            os._exit(127)
+    _, status = os.waitpid(pid, 0)
+    if os.WIFSIGNALED(status):
+        result = {"code": None, "signal": os.WTERMSIG(status)}
+    else:
+        result = {"code": os.WEXITSTATUS(status), "signal": None}
+    os.write(status_fd, json.dumps(result).encode("utf-8"))
+    os._exit(0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import math
+import re
+import zlib
+from collections import Counter
+from typing import List, Optional, Tuple
+import numpy as np
+import config
+
+# CPU-only question similarity: hashed TF-IDF vectors of words, word bigrams and
+# character n-grams compared by cosine. The n-grams let inflections and
+# compounds ("random forest"/"random forests", "bias-variance"/"bias and variance")
+# overlap. No model download; a few dozen questions vectorize in a few milliseconds.
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+_STOPWORDS = frozenset("""
+a an and are as at be by can could do does for from how if in into is it its of on or so that the their them then
+there these this those to was we what when where which while who why will with would you your
+explain describe discuss tell me us give example examples walk through between
+difference differ compare versus vs work works use using deal handle technique techniques way ways
+model models project projects time approach situation scenario
+""".split())
+
+# Spelled out so "ML pipeline" matches "machine learning pipeline"
+_ABBREVIATIONS = {
+    "ml": "machine learning",
+    "dl": "deep learning",
+    "ai": "artificial intelligence",
+    "nn": "neural network",
+}
+
+_CHAR_NGRAMS = (3, 5)
+
+def _stem(word: str) -> str:
+    # Crude suffix stripping so "queries"/"query" and "learners"/"learner" share a feature
+    if len(word) > 4:
+        if word.endswith("ies"):
+            return word[:-3] + "y"
+        for suffix in ("ing", "ed", "es", "s"):
+            if word.endswith(suffix) and not word.endswith("ss"):
+                return word[:-len(suffix)]
+    return word
+
+def _features(text: str) -> Counter:
+    tokens = _TOKEN.findall(text.lower())
+    tokens = " ".join(_ABBREVIATIONS.get(t, t) for t in tokens).split()
+    words = [_stem(w) for w in tokens if w not in _STOPWORDS]
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    for word in words:
+        padded = f"<{word}>"
+        for n in range(_CHAR_NGRAMS[0], _CHAR_NGRAMS[1] + 1):
+            features.update("#" + padded[i:i + n] for i in range(max(1, len(padded) - n + 1)))
+    return features
+
+def _bucket(feature: str, dim: int) -> int:
+    return zlib.crc32(feature.encode("utf-8")) % dim
+
+def vectorize(texts: List[str], dim: int | None = None) -> np.ndarray:
+    """
+    L2-normalized hashed TF-IDF matrix (one row per text). IDF is computed
+    over `texts` themselves, so terms shared by every question weigh less.
+    """
+    dim = dim or config.SIMILARITY_HASH_DIM
+    matrix = np.zeros((len(texts), dim), dtype=np.float32)
+    for row, text in enumerate(texts):
+        for feature, count in _features(text).items():
+            # Sublinear term frequency
+            matrix[row, _bucket(feature, dim)] += 1.0 + math.log(count)
+    if not len(texts):
+        return matrix
+    doc_freq = np.count_nonzero(matrix, axis=0)
+    idf = np.log((1.0 + len(texts)) / (1.0 + doc_freq)) + 1.0
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+def similarities(candidates: List[str], asked: List[str]) -> np.ndarray:
+    """
+    Cosine similarity of every candidate question (rows) to every asked question (columns).
+    """
+    if not candidates or not asked:
+        return np.zeros((len(candidates), len(asked)), dtype=np.float32)
+    vectors = vectorize(list(candidates) + list(asked))
+    return vectors[:len(candidates)] @ vectors[len(candidates):].T
+
+def most_similar(question: str, asked: List[str]) -> Tuple[float, Optional[int]]:
+    """
+    (highest similarity, index into `asked`) of `question`; (0.0, None) if nothing was asked.
+    """
+    scores = similarities([question], asked)
+    if not scores.size:
+        return 0.0, None
+    idx = int(scores[0].argmax())
+    return float(scores[0, idx]), idx
+
+def split_near_duplicates(candidates: List[str], asked: List[str],
+                          threshold: float | None = None) -> Tuple[List[int], List[int]]:
+    """
+    Splits candidate questions (e.g. the remaining question bank) into
+    (indices to keep, indices that repeat an asked question), in one matrix product.
+    """
+    threshold = config.QUESTION_SIMILARITY_THRESHOLD if threshold is None else threshold
+    if not asked:
+        return list(range(len(candidates))), []
+    best = similarities(candidates, asked).max(axis=1)
+    keep = [i for i, score in enumerate(best) if score < threshold]
+    dropped = [i for i, score in enumerate(best) if score >= threshold]
+    return keep, dropped
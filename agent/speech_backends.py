@@ -0,0 +1,235 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import wave
+from typing import Dict, List, Optional
+import numpy as np
+import speech_recognition as sr
+from agent.logger import get_logger
+from agent.wav import load_mono
+import config
+
+logger = get_logger(__name__)
+
+# Text-to-speech and speech recognition engines, selected with config.TTS_BACKEND
+# and config.ASR_BACKEND. Local engines ("pyttsx3", "vosk", "faster_whisper")
+# run on the CPU without network access; their packages and models are only
+# needed when selected. Each backend is created once per process and shared by
+# every session (see get_tts_backend / get_asr_backend).
+
+# Sample rate the local recognizers are fed
+ASR_SAMPLE_RATE = 16000
+
+class TTSBackend:
+    """
+    Turns text into a complete audio file. `format` is the file type
+    ("mp3"/"wav"), `voice` identifies the output in the TTS cache key.
+    """
+    name = ""
+    format = "mp3"
+
+    @property
+    def voice(self) -> str:
+        return self.name
+
+    def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+    def join(self, segments: List[bytes]) -> bytes:
+        # MP3 frames can simply be concatenated
+        return b"".join(segments)
+
+class GTTSBackend(TTSBackend):
+    """
+    Google Translate TTS (network).
+    """
+    name = "gtts"
+    format = "mp3"
+
+    def __init__(self, lang: str):
+        from gtts import gTTS
+        self._gtts = gTTS
+        self.lang = lang
+
+    @property
+    def voice(self) -> str:
+        return f"gtts:{self.lang}"
+
+    def synthesize(self, text: str) -> bytes:
+        fp = io.BytesIO()
+        self._gtts(text=text, lang=self.lang).write_to_fp(fp)
+        return fp.getvalue()
+
+class Pyttsx3Backend(TTSBackend):
+    """
+    Local system voices through pyttsx3 (eSpeak on Linux, SAPI5 on Windows).
+    The engine is not thread-safe, so synthesis is serialized.
+    """
+    name = "pyttsx3"
+    format = "wav"
+
+    def __init__(self, voice_id: Optional[str], rate: int):
+        import pyttsx3
+        self._lock = threading.Lock()
+        self._engine = pyttsx3.init()
+        if voice_id:
+            self._engine.setProperty("voice", voice_id)
+        self._engine.setProperty("rate", rate)
+        self.voice_id = voice_id or "default"
+        self.rate = rate
+
+    @property
+    def voice(self) -> str:
+        return f"pyttsx3:{self.voice_id}:{self.rate}"
+
+    def synthesize(self, text: str) -> bytes:
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            with self._lock:
+                self._engine.save_to_file(text, path)
+                self._engine.runAndWait()
+            with open(path, "rb") as f:
+                return f.read()
+        finally:
+            os.remove(path)
+
+    def join(self, segments: List[bytes]) -> bytes:
+        return join_wav(segments)
+
+def join_wav(segments: List[bytes]) -> bytes:
+    """
+    Concatenates WAV files that share one format into a single WAV file.
+    """
+    segments = [s for s in segments if s]
+    if len(segments) <= 1:
+        return segments[0] if segments else b""
+    out = io.BytesIO()
+    writer = None
+    for segment in segments:
+        with wave.open(io.BytesIO(segment), "rb") as reader:
+            if writer is None:
+                writer = wave.open(out, "wb")
+                writer.setparams(reader.getparams())
+            writer.writeframes(reader.readframes(reader.getnframes()))
+    writer.close()
+    return out.getvalue()
+
+class ASRBackend:
+    """
+    Transcribes a WAV recording. Returns "" when nothing was recognized.
+    """
+    name = ""
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        raise NotImplementedError
+
+def _read_samples(wav_bytes: bytes) -> np.ndarray:
+    # Mono float32 at ASR_SAMPLE_RATE, whatever the recorder produced
+    return load_mono(wav_bytes, ASR_SAMPLE_RATE)
+
+class GoogleASRBackend(ASRBackend):
+    """
+    Google Web Speech API through SpeechRecognition (network).
+    """
+    name = "google"
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        recognizer = sr.Recognizer()
+        with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+            audio = recognizer.record(source)
+        try:
+            return recognizer.recognize_google(audio)
+        except sr.UnknownValueError:
+            return ""
+        except sr.RequestError as e:
+            return f"Error: {e}"
+
+class VoskASRBackend(ASRBackend):
+    """
+    Offline Kaldi recognizer. The model is loaded once; each call gets its own recognizer.
+    """
+    name = "vosk"
+
+    def __init__(self, model_path: str):
+        import vosk
+        vosk.SetLogLevel(-1)
+        self._vosk = vosk
+        self._model = vosk.Model(model_path)
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        recognizer = self._vosk.KaldiRecognizer(self._model, ASR_SAMPLE_RATE)
+        pcm = (np.clip(_read_samples(wav_bytes), -1.0, 1.0) * 32767.0).astype("<i2")
+        recognizer.AcceptWaveform(pcm.tobytes())
+        return json.loads(recognizer.FinalResult()).get("text", "").strip()
+
+class FasterWhisperASRBackend(ASRBackend):
+    """
+    Whisper on CTranslate2 (faster-whisper), int8 on the CPU by default.
+    """
+    name = "faster_whisper"
+
+    def __init__(self, model: str, compute_type: str, cpu_threads: int, workers: int):
+        from faster_whisper import WhisperModel
+        self._model = WhisperModel(
+            model, device="cpu", compute_type=compute_type,
+            cpu_threads=cpu_threads, num_workers=workers,
+        )
+
+    def transcribe(self, wav_bytes: bytes) -> str:
+        segments, _ = self._model.transcribe(_read_samples(wav_bytes), language=config.ASR_LANGUAGE, beam_size=1)
+        return " ".join(segment.text.strip() for segment in segments).strip()
+
+_backends: Dict[tuple, object] = {}
+_backends_lock = threading.Lock()
+
+def _get_backend(key: tuple, create):
+    backend = _backends.get(key)
+    if backend is not None:
+        return backend
+    with _backends_lock:
+        backend = _backends.get(key)
+        if backend is None:
+            logger.info(f"Loading speech backend {key[0]}:{key[1]}")
+            backend = create()
+            _backends[key] = backend
+    return backend
+
+def get_tts_backend() -> TTSBackend:
+    """
+    Shared TTS engine for config.TTS_BACKEND: "gtts" or "pyttsx3".
+    """
+    name = config.TTS_BACKEND
+    if name == "gtts":
+        return _get_backend(("tts", name, config.TTS_LANGUAGE), lambda: GTTSBackend(config.TTS_LANGUAGE))
+    if name == "pyttsx3":
+        return _get_backend(
+            ("tts", name, config.PYTTSX3_VOICE, config.PYTTSX3_RATE),
+            lambda: Pyttsx3Backend(config.PYTTSX3_VOICE, config.PYTTSX3_RATE),
+        )
+    raise ValueError(f"Unknown TTS_BACKEND: {name}")
+
+def get_asr_backend() -> ASRBackend:
+    """
+    Shared recognizer for config.ASR_BACKEND: "google", "vosk" or "faster_whisper".
+    """
+    name = config.ASR_BACKEND
+    if name == "google":
+        return _get_backend(("asr", name), GoogleASRBackend)
+    if name == "vosk":
+        return _get_backend(("asr", name, config.VOSK_MODEL_PATH), lambda: VoskASRBackend(config.VOSK_MODEL_PATH))
+    if name == "faster_whisper":
+        return _get_backend(
+            ("asr", name, config.WHISPER_MODEL, config.WHISPER_COMPUTE_TYPE),
+            lambda: FasterWhisperASRBackend(
+                config.WHISPER_MODEL, config.WHISPER_COMPUTE_TYPE,
+                config.WHISPER_CPU_THREADS, config.ASR_WORKERS,
+            ),
+        )
+    raise ValueError(f"Unknown ASR_BACKEND: {name}")
+
+def reset_speech_backends():
+    with _backends_lock:
+        _backends.clear()
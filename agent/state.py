@@ -7,8 +7,10 @@ class Evaluation(TypedDict):
     feedback: str
     topics: List[str]
     complexity: str # e.g., "Beginner", "Intermediate", "Advanced"
+    skipped: bool # Candidate skipped the question (score is 0)
 
 class AgentState(TypedDict):
+    interview_id: Optional[str] # Candidate name; used to attribute LLM metrics
     topics: List[str]
     history: List[Dict[str, str]] # Chat history (user/assistant)
     current_question: Optional[str]
@@ -18,6 +20,8 @@ class AgentState(TypedDict):
     exit_session: bool
     question_bank: List[str]
     bank_index: int
+    asked_bank_questions: List[str] # Bank questions actually shown to the candidate
     years_of_experience: float
     last_question_style: Optional[str]
-    covered_concepts: List[str]
+    covered_concepts: List[str] # Compact summary of every question asked so far (one entry per question)
+    last_prompt_tokens: int # Estimated size of the last question-generation prompt
@@ -1,26 +1,204 @@
 import json
-from typing import List, Dict, Any
+import threading
+import time
+from typing import List, Dict, Any, Tuple, Callable, Optional
+import httpx
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import BaseMessage
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import BaseMessage, HumanMessage
 import sys
 import os
 
 # Add parent directory to path to import config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import config
+from agent.context import estimate_tokens
+from agent.llm_metrics import record_llm_call
+from agent.llm_backends import RecordingStore, RecordingChatModel, ReplayChatModel, FakeChatModel
+from agent.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Process-wide LLM client registry. Streamlit reruns and concurrent sessions
+# all share these, so keep-alive connections to the model server are reused
+# instead of paying TCP setup on every turn.
+_llm_registry: Dict[Tuple[str, str, str, float, int | None], BaseChatModel] = {}
+_registry_lock = threading.Lock()
+_http_client: httpx.Client | None = None
+_http_async_client: httpx.AsyncClient | None = None
+_recording_store: RecordingStore | None = None
+
+def _http_settings() -> Dict[str, Any]:
+    return {
+        "limits": httpx.Limits(
+            max_connections=config.LLM_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=config.LLM_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=config.LLM_POOL_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        "timeout": httpx.Timeout(
+            config.LLM_TIMEOUT_SECONDS,
+            connect=config.LLM_CONNECT_TIMEOUT_SECONDS,
+        ),
+    }
+
+def _get_http_clients() -> Tuple[httpx.Client, httpx.AsyncClient]:
+    # Caller must hold _registry_lock
+    global _http_client, _http_async_client
+    if _http_client is None:
+        _http_client = httpx.Client(**_http_settings())
+    if _http_async_client is None:
+        _http_async_client = httpx.AsyncClient(**_http_settings())
+    return _http_client, _http_async_client
+
+def _get_recording_store() -> RecordingStore:
+    # Caller must hold _registry_lock
+    global _recording_store
+    if _recording_store is None or _recording_store.path != config.LLM_RECORDINGS_PATH:
+        _recording_store = RecordingStore(config.LLM_RECORDINGS_PATH)
+    return _recording_store
 
 def get_llm(temperature: float = 0.7, max_tokens: int | None = None):
     """
-    Returns a ChatOpenAI instance configured with the settings from config.py.
+    Returns a shared chat model configured with the settings from config.py.
+    Instances are cached per (backend, model, base URL, temperature, max_tokens)
+    and all live ones use the same pooled HTTP client.
+    config.LLM_BACKEND selects "live", "record" (live + save responses),
+    "replay" (saved responses only) or "fake" (synthetic, no server).
     """
-    return ChatOpenAI(
+    backend = config.LLM_BACKEND
+    key = (backend, config.MODEL_NAME, config.BASE_URL, float(temperature), max_tokens)
+    llm = _llm_registry.get(key)
+    if llm is not None:
+        return llm
+
+    with _registry_lock:
+        llm = _llm_registry.get(key)
+        if llm is None:
+            llm = _create_llm(backend, temperature, max_tokens)
+            _llm_registry[key] = llm
+    return llm
+
+def _create_llm(backend: str, temperature: float, max_tokens: int | None) -> BaseChatModel:
+    # Caller must hold _registry_lock
+    if backend == "fake":
+        return FakeChatModel(
+            latency_seconds=config.FAKE_LLM_LATENCY_SECONDS,
+            tokens_per_second=config.FAKE_LLM_TOKENS_PER_SECOND,
+        )
+    if backend == "replay":
+        return ReplayChatModel(
+            store=_get_recording_store(),
+            llm_model=config.MODEL_NAME,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+    if backend not in ("live", "record"):
+        raise ValueError(f"Unknown LLM_BACKEND: {backend}")
+
+    http_client, http_async_client = _get_http_clients()
+    llm = ChatOpenAI(
         model=config.MODEL_NAME,
         openai_api_base=config.BASE_URL,
         openai_api_key=config.API_KEY,
         temperature=temperature,
         max_tokens=max_tokens,
         request_timeout=config.LLM_TIMEOUT_SECONDS,
+        # Report token usage on streamed responses too (for metrics)
+        stream_usage=True,
+        http_client=http_client,
+        http_async_client=http_async_client,
     )
+    if backend == "record":
+        return RecordingChatModel(
+            inner=llm,
+            store=_get_recording_store(),
+            llm_model=config.MODEL_NAME,
+            temperature=temperature,
+            max_tokens=max_tokens,
+        )
+    return llm
+
+def reset_llm_registry():
+    """
+    Drops all cached LLM clients and closes the shared HTTP connection pool.
+    Useful after changing config values at runtime.
+    """
+    global _http_client, _http_async_client, _recording_store
+    with _registry_lock:
+        _llm_registry.clear()
+        _recording_store = None
+        if _http_client is not None:
+            _http_client.close()
+        _http_client = None
+        # The async client is closed by garbage collection; closing it here
+        # would require a running event loop.
+        _http_async_client = None
+
+def invoke_llm(node: str, prompt: str, temperature: float, max_tokens: int | None = None,
+               interview_id: Optional[str] = None, on_token: Optional[Callable[[str], None]] = None) -> str:
+    """
+    Sends a single-prompt request to the LLM and returns the response text.
+    Streams tokens to `on_token` if given. Every call is recorded in the
+    llm_calls table (node, tokens, time-to-first-token, latency, status).
+    """
+    llm = get_llm(temperature=temperature, max_tokens=max_tokens)
+    messages = [HumanMessage(content=prompt)]
+    # Lets stand-in backends (agent.llm_backends) answer in the node's format
+    run_config = {"metadata": {"llm_node": node}}
+    started = time.perf_counter()
+    ttft = None
+    usage = None
+    text = ""
+    status = "ok"
+    error = None
+    try:
+        if on_token:
+            full = None
+            for chunk in llm.stream(messages, config=run_config):
+                if chunk.content:
+                    if ttft is None:
+                        ttft = time.perf_counter() - started
+                    on_token(chunk.content)
+                full = chunk if full is None else full + chunk
+            if full is not None:
+                text = full.content
+                usage = full.usage_metadata
+        else:
+            response = llm.invoke(messages, config=run_config)
+            text = response.content
+            usage = response.usage_metadata
+        return text
+    except Exception as e:
+        status = "timeout" if "timeout" in type(e).__name__.lower() else "error"
+        error = str(e)[:500]
+        raise
+    finally:
+        latency = time.perf_counter() - started
+        _record_llm_metrics(node, interview_id, prompt, text, usage, ttft, latency, status, error)
+
+def _record_llm_metrics(node, interview_id, prompt, text, usage, ttft, latency, status, error):
+    # Metrics must never break the interview flow
+    try:
+        if usage:
+            prompt_tokens = usage.get("input_tokens", 0)
+            completion_tokens = usage.get("output_tokens", 0)
+        else:
+            prompt_tokens = estimate_tokens(prompt)
+            completion_tokens = estimate_tokens(text)
+        record_llm_call(
+            node=node,
+            interview_id=interview_id,
+            model=config.MODEL_NAME,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            tokens_estimated=not usage,
+            ttft_ms=ttft * 1000 if ttft is not None else None,
+            latency_ms=latency * 1000,
+            status=status,
+            error=error,
+        )
+    except Exception as e:
+        logger.warning(f"Failed to record LLM metrics: {e}")
 
 def extract_json(text: str) -> Dict[str, Any]:
     """
@@ -0,0 +1,175 @@
+import io
+import struct
+import wave
+from typing import List, Tuple
+import numpy as np
+
+# Vectorized WAV helpers: decode any PCM/float WAV to float32 samples, downmix,
+# resample and encode back to 16-bit PCM. Used to shrink recorded answers and
+# to prepare audio for speech recognition.
+
+_PCM = 1
+_FLOAT = 3
+_EXTENSIBLE = 0xFFFE
+
+def read_wav(data: bytes) -> Tuple[np.ndarray, int]:
+    """
+    Decodes a WAV file to (float32 samples in [-1, 1] shaped (frames, channels), sample rate).
+    Handles 8/16/24/32-bit PCM, 32/64-bit float and WAVE_FORMAT_EXTENSIBLE headers.
+    Raises ValueError for anything else.
+    """
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Not a WAV file")
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = data[pos:pos + 4]
+        size = struct.unpack("<I", data[pos + 4:pos + 8])[0]
+        body = data[pos + 8:pos + 8 + size]
+        if chunk_id == b"fmt ":
+            tag, channels, rate = struct.unpack("<HHI", body[:8])
+            bits = struct.unpack("<H", body[14:16])[0]
+            if tag == _EXTENSIBLE and len(body) >= 26:
+                tag = struct.unpack("<H", body[24:26])[0]
+            fmt = (tag, channels, rate, bits)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk before fmt chunk")
+            # Browser recorders sometimes leave the streamed size at 0 / 0xFFFFFFFF
+            if size == 0 or pos + 8 + size > len(data):
+                body = data[pos + 8:]
+            tag, channels, rate, bits = fmt
+            return _decode(body, tag, channels, bits), rate
+        pos += 8 + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+def _decode(body: bytes, tag: int, channels: int, bits: int) -> np.ndarray:
+    width = bits // 8
+    if not channels or not width:
+        raise ValueError("Invalid WAV format")
+    body = body[:len(body) - len(body) % (width * channels)]
+    if tag == _FLOAT and bits in (32, 64):
+        samples = np.frombuffer(body, dtype=f"<f{width}").astype(np.float32)
+    elif tag == _PCM and bits == 8:
+        samples = (np.frombuffer(body, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif tag == _PCM and bits in (16, 32):
+        samples = np.frombuffer(body, dtype=f"<i{width}").astype(np.float32) / float(2 ** (bits - 1))
+    elif tag == _PCM and bits == 24:
+        raw = np.frombuffer(body, dtype=np.uint8).reshape(-1, 3).astype(np.int32)
+        values = raw[:, 0] | (raw[:, 1] << 8) | (raw[:, 2] << 16)
+        values = np.where(values >= 1 << 23, values - (1 << 24), values)
+        samples = values.astype(np.float32) / float(1 << 23)
+    else:
+        raise ValueError(f"Unsupported WAV encoding (format {tag}, {bits} bits)")
+    return samples.reshape(-1, channels)
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """
+    Averages channels: (frames, channels) -> (frames,).
+    """
+    return samples.mean(axis=1) if samples.ndim == 2 else samples
+
+def resample(samples: np.ndarray, src_rate: int, dst_rate: int) -> np.ndarray:
+    """
+    Linear-interpolation resampling of mono samples. When downsampling, a box
+    filter as wide as the rate ratio is applied first to limit aliasing.
+    """
+    if src_rate == dst_rate or not len(samples):
+        return samples.astype(np.float32, copy=False)
+    if dst_rate < src_rate:
+        width = int(round(src_rate / dst_rate))
+        if width > 1:
+            samples = np.convolve(samples, np.ones(width, dtype=np.float32) / width, mode="same")
+    count = int(round(len(samples) * dst_rate / src_rate))
+    positions = np.arange(count, dtype=np.float64) * (src_rate / dst_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def write_wav(samples: np.ndarray, rate: int) -> bytes:
+    """
+    Encodes mono float samples as a 16-bit PCM WAV file.
+    """
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767.0).astype("<i2")
+    out = io.BytesIO()
+    with wave.open(out, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes(pcm.tobytes())
+    return out.getvalue()
+
+def load_mono(data: bytes, rate: int) -> np.ndarray:
+    """
+    Decodes a WAV file to mono float32 samples at `rate`.
+    """
+    samples, src_rate = read_wav(data)
+    return resample(to_mono(samples), src_rate, rate)
+
+def normalize_wav(data: bytes, rate: int) -> bytes:
+    """
+    Re-encodes a WAV file as 16-bit mono at `rate` (e.g. a 48 kHz stereo
+    float recording shrinks 12x at 16 kHz).
+    """
+    return write_wav(load_mono(data, rate), rate)
+
+_FRAME_SECONDS = 0.02
+# Frames quieter than this are silence regardless of the recording's loudness
+_SILENCE_FLOOR_DB = -60.0
+
+def _frame_levels(samples: np.ndarray, rate: int) -> Tuple[np.ndarray, int]:
+    # Per-frame RMS level in dBFS for 20 ms frames (the last partial frame is padded)
+    frame = max(1, int(rate * _FRAME_SECONDS))
+    count = -(-len(samples) // frame)
+    padded = np.zeros(count * frame, dtype=np.float32)
+    padded[:len(samples)] = samples
+    rms = np.sqrt(np.mean(padded.reshape(count, frame) ** 2, axis=1))
+    return 20.0 * np.log10(np.maximum(rms, 1e-10)), frame
+
+def _voiced(levels: np.ndarray, silence_db: float) -> np.ndarray:
+    # Silence is `silence_db` below the loudest frame (or under the absolute floor)
+    threshold = max(float(levels.max()) - silence_db, _SILENCE_FLOOR_DB) if len(levels) else 0.0
+    return levels > threshold
+
+def trim_silence(samples: np.ndarray, rate: int, silence_db: float, pad_seconds: float = 0.2) -> np.ndarray:
+    """
+    Drops leading and trailing silence, keeping `pad_seconds` around the speech.
+    Returns an empty array if nothing rises above the silence threshold.
+    """
+    if not len(samples):
+        return samples
+    levels, frame = _frame_levels(samples, rate)
+    voiced = np.flatnonzero(_voiced(levels, silence_db))
+    if not len(voiced):
+        return samples[:0]
+    pad = int(pad_seconds * rate)
+    start = max(0, voiced[0] * frame - pad)
+    end = min(len(samples), (voiced[-1] + 1) * frame + pad)
+    return samples[start:end]
+
+def split_at_pauses(samples: np.ndarray, rate: int, max_seconds: float, min_pause_seconds: float,
+                    silence_db: float) -> List[Tuple[int, int]]:
+    """
+    Splits speech into (start, end) sample ranges of at most `max_seconds`,
+    cutting in the middle of pauses of at least `min_pause_seconds` where
+    possible (the last one before the limit), otherwise at the limit.
+    """
+    max_len = max(1, int(max_seconds * rate))
+    if len(samples) <= max_len:
+        return [(0, len(samples))] if len(samples) else []
+    levels, frame = _frame_levels(samples, rate)
+    silent = ~_voiced(levels, silence_db)
+    # Runs of silent frames: edges where the mask flips
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.astype(np.int8), [0]))))
+    run_starts, run_ends = edges[0::2], edges[1::2]
+    long_runs = (run_ends - run_starts) * frame >= int(min_pause_seconds * rate)
+    cuts = ((run_starts[long_runs] + run_ends[long_runs]) // 2) * frame
+
+    ranges = []
+    start = 0
+    while len(samples) - start > max_len:
+        limit = start + max_len
+        candidates = cuts[(cuts > start) & (cuts <= limit)]
+        end = int(candidates[-1]) if len(candidates) else limit
+        ranges.append((start, end))
+        start = end
+    ranges.append((start, len(samples)))
+    return ranges
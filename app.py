@@ -3,17 +3,24 @@ import sys
 import os
 import pandas as pd
 from agent.graph import create_graph
+from agent.prefetch import QuestionPrefetcher
 from agent.state import AgentState
-from agent.resume import extract_text_from_pdf, screen_resume
+from agent.resume import screen_resumes
 import config
-from agent.audio import text_to_speech_bytes, audio_bytes_to_text
+from agent.audio import text_to_speech_bytes, audio_bytes_to_text, tts_audio_format, SentenceAudioSynthesizer, prewarm_tts
 from streamlit_mic_recorder import mic_recorder
-from agent.db import init_db, add_candidate, get_candidate, get_all_candidates, update_interview_result, update_recommendation, clear_db
+from agent.db import init_db, add_candidates, get_screening_cache_stats, get_recent_llm_calls, get_llm_usage_by_interview, get_candidate, list_candidates, get_evaluations, update_interview_result, parse_question_bank, save_question_bank, get_candidate_question_bank, mark_questions_used, update_recommendation, clear_db
 from agent.report import generate_pdf_report, generate_hr_recommendation
+from agent.metrics import summarize_llm_calls, summarize_evaluations
+from agent.audio_store import SessionAudio
+from agent.proctoring import record_events, flush as flush_proctoring, get_violation_summaries, get_violation_summary
+from agent.llm_metrics import flush as flush_llm_metrics
 from agent.logger import get_logger
 import base64
 import time
 import json
+import queue
+from concurrent.futures import ThreadPoolExecutor
 import streamlit.components.v1 as components
 
 logger = get_logger(__name__)
@@ -31,6 +38,146 @@ tab_switch_tracker = components.declare_component(
     path=os.path.join(os.path.dirname(__file__), "components", "tab_switch_tracker"),
 )
 
+@st.cache_resource
+def get_graph_executor():
+    # Graph runs happen off the script thread so question tokens can be drawn while they stream
+    return ThreadPoolExecutor(thread_name_prefix="graph")
+
+@st.cache_resource
+def get_audio_executor():
+    # Question audio is synthesized off the script thread; the question card shows the player once it is ready
+    return ThreadPoolExecutor(max_workers=config.TTS_WORKERS, thread_name_prefix="question-audio")
+
+def _synthesize_question(q_text, prefetcher=None, speech=None):
+    audio = prefetcher.audio_for(q_text) if prefetcher else None
+    if audio is None:
+        audio = speech.finish(q_text) if speech is not None else text_to_speech_bytes(q_text)
+    return audio.getvalue() if audio else None
+
+def question_audio(q_text, speech=None):
+    """
+    Starts synthesizing the audio for `q_text` and returns its Future (audio bytes or None).
+    """
+    prefetcher = st.session_state.get("question_prefetcher")
+    return get_audio_executor().submit(_synthesize_question, q_text, prefetcher, speech)
+
+def question_message(q_text, audio_future):
+    return {
+        "role": "assistant",
+        "content": q_text,
+        "audio": None,
+        "audio_future": audio_future,
+        "audio_requested_at": time.time(),
+    }
+
+def resolve_question_audio(q_msg) -> bool:
+    """
+    Moves finished audio from the message's future into the session audio
+    store (q_msg["audio"] keeps the reference). Gives up after
+    TTS_TIMEOUT_SECONDS. Returns True while synthesis is still pending.
+    """
+    future = q_msg.get("audio_future")
+    if future is None:
+        return False
+    if future.done():
+        try:
+            q_msg["audio"] = st.session_state.session_audio.put(future.result(), tts_audio_format())
+        except Exception as e:
+            logger.warning(f"Question audio failed: {e}")
+    elif time.time() - q_msg.get("audio_requested_at", 0) > config.TTS_TIMEOUT_SECONDS:
+        future.cancel()
+        logger.warning(f"Question audio timed out after {config.TTS_TIMEOUT_SECONDS}s")
+    else:
+        return True
+    q_msg["audio_future"] = None
+    q_msg["audio_unavailable"] = not q_msg.get("audio")
+    return False
+
+def render_stored_audio(ref):
+    data = st.session_state.session_audio.get(ref)
+    if data:
+        st.audio(data, format=ref["format"])
+
+def render_question_audio(q_msg):
+    if resolve_question_audio(q_msg):
+        st.caption("🔊 Preparing audio...")
+    elif q_msg.get("audio"):
+        render_stored_audio(q_msg["audio"])
+    elif q_msg.get("audio_unavailable"):
+        st.caption("🔇 Audio unavailable for this question.")
+
+@st.fragment(run_every=config.TTS_POLL_SECONDS)
+def pending_question_audio(q_msg):
+    # Re-runs on its own until the audio is ready, without rerunning the whole page
+    if resolve_question_audio(q_msg):
+        st.caption("🔊 Preparing audio...")
+    else:
+        # Settled: a full rerun renders the player outside this fragment, which stops the polling
+        st.rerun()
+
+def start_prefetch():
+    prefetcher = st.session_state.get("question_prefetcher")
+    if prefetcher is not None:
+        prefetcher.start(st.session_state.agent_state)
+
+def run_graph_turn(agent_state):
+    """
+    Invokes the graph for one turn and renders the next question into the
+    current container. Returns (result_state, audio_future); the audio is
+    synthesized in the background, see question_audio.
+    """
+    configurable = {}
+    if st.session_state.get("question_prefetcher") is not None:
+        configurable["question_prefetcher"] = st.session_state.question_prefetcher
+
+    if not config.STREAM_QUESTIONS:
+        result = st.session_state.graph.invoke(agent_state, {"configurable": configurable})
+        q_text = result.get("current_question")
+        if q_text:
+            st.markdown(q_text)
+        return result, (question_audio(q_text) if q_text else None)
+
+    placeholder = st.empty()
+    tokens = queue.Queue()
+    speech = SentenceAudioSynthesizer()
+    configurable["on_question_token"] = tokens.put
+    future = get_graph_executor().submit(
+        st.session_state.graph.invoke,
+        agent_state,
+        {"configurable": configurable},
+    )
+    streamed = ""
+    while True:
+        try:
+            token = tokens.get(timeout=0.05)
+        except queue.Empty:
+            if future.done() and tokens.empty():
+                break
+            continue
+        streamed += token
+        speech.feed(token)
+        placeholder.markdown(streamed + "▌")
+
+    result = future.result()
+    q_text = result.get("current_question")
+    if q_text:
+        placeholder.markdown(q_text)
+        return result, question_audio(q_text, speech)
+    placeholder.empty()
+    return result, None
+
+# Columns loaded for the HR dashboard (no resume analysis / question bank blobs)
+DASHBOARD_COLUMNS = (
+    "name", "resume_score", "status", "interview_score", "final_summary", "can_hire",
+    "evaluation_count", "answered_count", "skipped_count", "total_score", "total_duration",
+)
+
+def record_bank_usage():
+    # Only questions the node actually picked from the bank; ones the
+    # near-duplicate filter dropped stay available for later interviews
+    asked = (st.session_state.get("agent_state") or {}).get("asked_bank_questions") or []
+    mark_questions_used(st.session_state.current_candidate_name, asked)
+
 def end_interview():
     if st.session_state.get("agent_state") is not None:
         evals = st.session_state.agent_state.get("evaluations", [])
@@ -38,7 +185,7 @@ def end_interview():
             avg_score = 0.0
             cand = get_candidate(st.session_state.current_candidate_name)
             resume_score = cand.get("resume_score", 0) if cand else 0
-            rec = generate_hr_recommendation([], avg_score, resume_score)
+            rec = generate_hr_recommendation([], avg_score, resume_score, interview_id=st.session_state.current_candidate_name)
             rec["auto_ended"] = bool(st.session_state.get("auto_ended", False))
             if rec["auto_ended"]:
                 rec["auto_end_reason"] = "Tab switch limit reached"
@@ -49,6 +196,9 @@ def end_interview():
                 final_summary=json.dumps(rec),
                 decision=rec.get("decision")
             )
+            record_bank_usage()
+    if st.session_state.get("question_prefetcher") is not None:
+        st.session_state.question_prefetcher.invalidate()
     st.session_state.interview_active = False
     st.session_state.confirm_end = False
 
@@ -68,6 +218,8 @@ if "interview_active" not in st.session_state:
     st.session_state.interview_active = False
 if "question_audio" not in st.session_state:
     st.session_state.question_audio = {}
+if "session_audio" not in st.session_state:
+    st.session_state.session_audio = SessionAudio()
 if "pending_voice_text" not in st.session_state:
     st.session_state.pending_voice_text = ""
 if "clear_answer_input" not in st.session_state:
@@ -135,9 +287,13 @@ with st.sidebar:
                 key="recorder_sidebar",
                 format="wav",
             )
-            if audio_input:
-                st.session_state.question_audio[current_q_idx] = audio_input["bytes"]
-                voice_text = audio_bytes_to_text(audio_input["bytes"])
+            # mic_recorder returns the last recording on every rerun; only handle a new one once
+            recording_id = audio_input.get("id", hash(audio_input["bytes"])) if audio_input else None
+            if audio_input and recording_id != st.session_state.get("last_recording_id"):
+                st.session_state.last_recording_id = recording_id
+                answer_ref, answer_wav = st.session_state.session_audio.put_answer(audio_input["bytes"])
+                st.session_state.question_audio[current_q_idx] = answer_ref
+                voice_text = audio_bytes_to_text(answer_wav)
                 if voice_text:
                     st.session_state.pending_voice_text = voice_text
 
@@ -153,25 +309,11 @@ if mode == "HR Admin":
         uploaded_files = st.file_uploader("Upload Resumes (PDF)", type="pdf", accept_multiple_files=True)
         question_file = st.file_uploader("Upload Question Bank (TXT)", type=["txt", "csv"])
 
-        def parse_question_bank(file_obj):
+        def read_question_file(file_obj):
             if not file_obj:
                 return []
             try:
-                content = file_obj.read().decode("utf-8", errors="ignore")
-                if file_obj.name.lower().endswith(".csv"):
-                    lines = [line.strip() for line in content.splitlines() if line.strip()]
-                    # Use first column as question text
-                    questions = [line.split(",")[0].strip() for line in lines if line.split(",")[0].strip()]
-                else:
-                    questions = [line.strip() for line in content.splitlines() if line.strip()]
-                # Deduplicate while preserving order
-                seen = set()
-                unique_questions = []
-                for q in questions:
-                    if q not in seen:
-                        unique_questions.append(q)
-                        seen.add(q)
-                return unique_questions
+                return parse_question_bank(file_obj.name, file_obj.read())
             except Exception:
                 return []
         
@@ -180,29 +322,74 @@ if mode == "HR Admin":
                 st.error("Please provide JD and Resumes.")
             else:
                 logger.info("Starting resume analysis")
-                with st.spinner("Analyzing resumes..."):
-                    results = []
-                    question_bank = parse_question_bank(question_file)
-                    for uploaded_file in uploaded_files:
-                        resume_text = extract_text_from_pdf(uploaded_file)
-                        analysis = screen_resume(resume_text, jd_text)
-                        
+                # Stored once and shared by every candidate in the batch
+                bank_questions = read_question_file(question_file)
+                question_bank_id = save_question_bank(bank_questions)
+                if bank_questions:
+                    # Pre-synthesize bank question audio in the background so it plays instantly
+                    prewarm_tts(bank_questions, block=False)
+                files = [(f.name, f.getvalue()) for f in uploaded_files]
+                progress = st.progress(0.0, text=f"Screening 0 / {len(files)} resumes...")
+                table = st.empty()
+                results = []
+                to_save = []
+                for done, item in enumerate(screen_resumes(files, jd_text), 1):
+                    analysis = item["analysis"]
+                    if item["error"]:
+                        results.append({
+                            "File": item["file_name"],
+                            "Name": None,
+                            "Score": None,
+                            "Status": f"Error: {item['error']}"
+                        })
+                    else:
                         name = analysis.get("name", "Unknown")
                         score = analysis.get("score", 0)
                         
-                        # Save to Database
                         # We store extracting topics for later interview use
-                        topics = analysis.get("extracted_topics", [])
-                        yoe = analysis.get("years_of_experience", 0)
-                        add_candidate(name, score, analysis, topics, question_bank, yoe)
-                        
+                        to_save.append({
+                            "result_idx": len(results),
+                            "name": name,
+                            "score": score,
+                            "analysis": analysis,
+                            "topics": analysis.get("extracted_topics", []),
+                            "question_bank_id": question_bank_id,
+                            "years_of_experience": analysis.get("years_of_experience", 0),
+                        })
                         results.append({
+                            "File": item["file_name"],
                             "Name": name,
                             "Score": score,
-                            "Status": "Saved to DB"
+                            "Status": "Screened"
                         })
+                    progress.progress(done / len(files), text=f"Screening {done} / {len(files)} resumes...")
+                    table.dataframe(pd.DataFrame(results))
+
+                # Save to Database in one batch
+                saved = 0
+                if to_save:
+                    for cand, outcome in zip(to_save, add_candidates(to_save)):
+                        row = results[cand["result_idx"]]
+                        if outcome["outcome"] == "inserted":
+                            row["Status"] = "Saved to DB"
+                        elif outcome["outcome"] == "updated":
+                            row["Status"] = "Updated (re-screened)"
+                        else:
+                            row["Status"] = f"Error: {outcome['error']}"
+                            continue
+                        saved += 1
+                    table.dataframe(pd.DataFrame(results))
+                failed = len(results) - saved
+                if failed:
+                    st.warning(f"Analysis complete. {saved} saved, {failed} failed.")
+                else:
                     st.success("Analysis Complete! Candidates saved to Database.")
-                    st.dataframe(pd.DataFrame(results))
+
+        cache_stats = get_screening_cache_stats()
+        st.caption(
+            f"Screening cache: {cache_stats['entries']} entries, "
+            f"{cache_stats['hits']} hits / {cache_stats['misses']} misses"
+        )
     
     with tab2:
         st.subheader("Candidate Database")
@@ -230,10 +417,55 @@ if mode == "HR Admin":
                     st.session_state.confirm_clear = False
                     st.rerun()
         
-        candidates = get_all_candidates()
+        # Filters and keyset pagination: only the page being viewed is loaded
+        f0, f1, f2, f3, f4 = st.columns([1, 1, 1, 1, 2])
+        with f0:
+            sort_label = st.selectbox("Sort by", ["Newest", "Interview score"])
+        with f1:
+            status_filter = st.selectbox("Status", ["All", "screened", "completed"])
+        with f2:
+            decision_filter = st.selectbox("Decision", ["All", "Move Forward", "Hold", "Reject"])
+        with f3:
+            name_filter = st.text_input("Name starts with")
+        with f4:
+            score_range = st.slider("Resume score", 0, 100, (0, 100))
+        filters = {
+            "status": None if status_filter == "All" else status_filter,
+            "decision": None if decision_filter == "All" else decision_filter,
+            "name_prefix": name_filter.strip() or None,
+            "min_resume_score": score_range[0] if score_range[0] > 0 else None,
+            "max_resume_score": score_range[1] if score_range[1] < 100 else None,
+            "order_by": "interview_score" if sort_label == "Interview score" else "timestamp",
+        }
+        # Cursor of every page visited so far; reset when the filters change
+        if st.session_state.get("dashboard_filters") != filters:
+            st.session_state.dashboard_filters = filters
+            st.session_state.dashboard_cursors = [None]
+        cursors = st.session_state.dashboard_cursors
+
+        candidates, next_cursor = list_candidates(
+            columns=DASHBOARD_COLUMNS,
+            limit=config.DASHBOARD_PAGE_SIZE,
+            after=cursors[-1],
+            **filters,
+        )
+
+        p1, p2, p3 = st.columns([1, 1, 3])
+        with p1:
+            if st.button("◀ Previous", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        with p2:
+            if st.button("Next ▶", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
+        with p3:
+            st.caption(f"Page {len(cursors)}")
+
         if candidates:
             # Display Summary Table
             dashboard_data = []
+            violations = get_violation_summaries([c["name"] for c in candidates])
             def parse_recommendation(rec_str):
                 if not rec_str:
                     return {}
@@ -243,34 +475,11 @@ if mode == "HR Admin":
                     return {"summary": rec_str}
 
             for c in candidates:
-                # Calculate stats
-                try:
-                    interview_data = json.loads(c['interview_data']) if c['interview_data'] else []
-                    skipped = 0
-                    answered = 0
-                    for item in interview_data:
-                        if item.get("skipped"):
-                            skipped += 1
-                        else:
-                            # Backward-compatible fallback for older entries
-                            if item.get('score') == 0 and "skipped" in item.get('feedback', '').lower():
-                                skipped += 1
-                            else:
-                                answered += 1
-                except:
-                    skipped = 0
-                    answered = 0
-                    interview_data = []
-                
-                # Recompute fair interview score from data (includes unanswered as 0)
-                total_score = sum(item.get("score", 0) for item in interview_data)
-                fair_score = (
-                    total_score / config.MAX_QUESTIONS_DEFAULT
-                    if config.MAX_QUESTIONS_DEFAULT else 0
-                )
-                # If interview was completed with zero attempts, show stored score (likely 0.0)
-                if not interview_data and c.get("interview_score") is not None:
-                    fair_score = c.get("interview_score", 0) or 0
+                # Summary columns are computed once when the interview result is saved
+                answered = c["answered_count"] or 0
+                skipped = c["skipped_count"] or 0
+                # Fair interview score (includes unanswered as 0)
+                fair_score = c.get("interview_score") or 0
 
                 # Use stored recommendation on dashboard to avoid repeated LLM calls
                 rec = parse_recommendation(c.get("final_summary"))
@@ -278,9 +487,7 @@ if mode == "HR Admin":
                 summary_text = rec.get("summary") or ""
                 short_summary = (summary_text[:120] + "...") if len(summary_text) > 120 else summary_text
 
-                total_duration = 0
-                if interview_data:
-                    total_duration = sum(item.get("duration", 0) or 0 for item in interview_data)
+                total_duration = c["total_duration"] or 0
 
                 dashboard_data.append({
                     "Name": c['name'],
@@ -296,7 +503,9 @@ if mode == "HR Admin":
                         "Not Eligible"
                         if c['resume_score'] < 70
                         else (f"{round(total_duration, 1)}s" if total_duration else "N/A")
-                    )
+                    ),
+                    "Tab Switches": violations.get(c['name'], {}).get("tab_switches", 0),
+                    "Proctoring Events": violations.get(c['name'], {}).get("total", 0),
                 })
             
             st.dataframe(pd.DataFrame(dashboard_data))
@@ -333,32 +542,46 @@ if mode == "HR Admin":
                 cand_data = next((c for c in candidates if c['name'] == selected_candidate), None)
                 if cand_data:
                     rec = None
-                    try:
-                        interview_data = json.loads(cand_data['interview_data']) if cand_data['interview_data'] else []
-                    except Exception:
-                        interview_data = []
-                    total_score = sum(item.get("score", 0) for item in interview_data)
-                    fair_score = (
-                        total_score / config.MAX_QUESTIONS_DEFAULT
-                        if config.MAX_QUESTIONS_DEFAULT else 0
-                    )
+                    interview_data = get_evaluations(cand_data['name'])
+                    fair_score = cand_data.get("interview_score") or 0
                     if cand_data.get("final_summary"):
                         try:
                             rec = json.loads(cand_data["final_summary"])
                         except Exception:
                             rec = {"summary": cand_data.get("final_summary"), "decision": cand_data.get("can_hire")}
+                    # Make sure events still in the write buffer are in the report
+                    flush_proctoring()
                     pdf_bytes = generate_pdf_report(
                         cand_data['name'], 
-                        cand_data['interview_data'], 
+                        interview_data, 
                         fair_score,
                         cand_data['resume_score'],
-                        rec
+                        rec,
+                        violations=get_violation_summary(cand_data['name']),
+                        # Same stored counts the dashboard table shows
+                        summary=cand_data,
                     )
                     b64_pdf = base64.b64encode(pdf_bytes).decode('latin-1')
                     href = f'<a href="data:application/pdf;base64,{b64_pdf}" download="{cand_data["name"]}_report.pdf">Download PDF Report</a>'
                     st.markdown(href, unsafe_allow_html=True)
         else:
-            st.info("No candidates found in database.")
+            st.info("No candidates match the current filters.")
+
+        # LLM latency / token accounting
+        st.divider()
+        with st.expander("⏱️ LLM Performance"):
+            # Include calls still in the write buffer
+            flush_llm_metrics()
+            llm_calls = get_recent_llm_calls(limit=config.LLM_METRICS_WINDOW)
+            if not llm_calls:
+                st.info("No LLM calls recorded yet.")
+            else:
+                st.caption(f"Latency percentiles over the last {len(llm_calls)} calls (ms)")
+                st.dataframe(pd.DataFrame(summarize_llm_calls(llm_calls)).round(1))
+                usage = get_llm_usage_by_interview()
+                if usage:
+                    st.write("**Per-interview totals**")
+                    st.dataframe(pd.DataFrame(usage).round(1))
             
     # Remove old indentations
     # No more password error
@@ -387,12 +610,13 @@ elif mode == "Candidate Access":
                     logger.info(f"Candidate {cand['name']} logged in successfully. Starting interview.")
                     st.session_state.interview_active = True
                     st.session_state.tab_switch_reset_token = str(time.time())
+                    st.session_state.proctoring_acked_seq = 0
                     st.session_state.auto_ended = False
                     st.session_state.question_audio = {}
+                    st.session_state.session_audio = SessionAudio()
                     st.session_state.pending_voice_text = ""
                     
-                    # Reset Proctoring Logic (Optional, JS persists but we can ignore previous counts if we wanted)
-                    # For now, we count specific session anomalies.
+                    # Proctoring events are recorded per candidate name (see agent/proctoring.py)
                     
                     # Load Topics from DB
                     import json
@@ -404,12 +628,8 @@ elif mode == "Candidate Access":
                             topics = ["General Technical"]
                     if not topics: topics = ["General Technical"]
 
-                    question_bank = []
-                    if cand.get("question_bank"):
-                        try:
-                            question_bank = json.loads(cand["question_bank"])
-                        except Exception:
-                            question_bank = []
+                    # Shared bank from the screening batch, minus questions already asked
+                    question_bank = get_candidate_question_bank(cand['name'])
 
                     st.session_state.agent_state = {
                         "topics": topics,
@@ -421,24 +641,32 @@ elif mode == "Candidate Access":
                         "exit_session": False,
                         "question_bank": question_bank,
                         "bank_index": 0,
-                        "years_of_experience": cand.get("years_of_experience", 0)
+                        "asked_bank_questions": [],
+                        "years_of_experience": cand.get("years_of_experience", 0),
+                        "covered_concepts": [],
+                        "interview_id": cand['name']
                     }
                     st.session_state.messages = []
+                    st.session_state.question_prefetcher = (
+                        QuestionPrefetcher(synthesize=text_to_speech_bytes)
+                        if config.PREFETCH_NEXT_QUESTION else None
+                    )
                     
                     # Start graph
                     logger.info("Invoking initial graph state")
-                    result = st.session_state.graph.invoke(st.session_state.agent_state)
+                    with st.chat_message("assistant"):
+                        result, audio_future = run_graph_turn(st.session_state.agent_state)
                     st.session_state.agent_state = result
                     if result.get("current_question"):
                         q_text = result["current_question"]
-                        c_audio = text_to_speech_bytes(q_text)
                         
                         st.session_state.current_q_start_time = time.time() # Start Timer
-                        st.session_state.messages.append({"role": "assistant", "content": q_text, "audio": c_audio})
+                        st.session_state.messages.append(question_message(q_text, audio_future))
                         st.session_state.agent_state["history"].append({"role": "assistant", "content": q_text})
                         st.session_state.current_q_idx = len(
                             [m for m in st.session_state.messages if m.get("role") == "assistant"]
                         ) - 1
+                        start_prefetch()
                     st.rerun()
                 else:
                     if cand and cand.get("status") == "completed":
@@ -453,14 +681,23 @@ elif mode == "Candidate Access":
         # Tab switch tracking (auto-end on second switch)
         if "current_candidate_name" in st.session_state:
             name = st.session_state.current_candidate_name
-            auto_submit_event = tab_switch_tracker(
+            acked_seq = st.session_state.get("proctoring_acked_seq", 0)
+            tracker_value = tab_switch_tracker(
                 local_key=f"tab_switch_local_{name}",
                 auto_key=f"tab_switch_autosubmit_{name}",
                 session_key=f"tab_switch_session_{name}",
                 reset_token=st.session_state.get("tab_switch_reset_token", ""),
-                default="",
+                acked_seq=acked_seq,
+                default=None,
             )
-            if auto_submit_event == "auto_submit":
+            # Tracker sends {"auto_submit", "events": [{"seq", "type", "ts"}]}; the same
+            # events are re-sent until acked_seq reaches them, so skip ones already queued
+            tracker_value = tracker_value if isinstance(tracker_value, dict) else {}
+            new_events = [e for e in tracker_value.get("events", []) if e.get("seq", 0) > acked_seq]
+            if new_events:
+                record_events(name, new_events)
+                st.session_state.proctoring_acked_seq = max(e["seq"] for e in new_events)
+            if tracker_value.get("auto_submit"):
                 st.session_state.auto_ended = True
                 end_interview()
                 st.rerun()
@@ -479,13 +716,15 @@ elif mode == "Candidate Access":
         for i, pair in enumerate(qa_pairs):
             q_msg = pair["question"]
             st.markdown(f"**Q{i+1}:** {q_msg['content']}")
-            if q_msg.get("audio"):
-                st.audio(q_msg["audio"], format="audio/mp3")
+            if resolve_question_audio(q_msg):
+                pending_question_audio(q_msg)
+            else:
+                render_question_audio(q_msg)
             if pair.get("answer"):
                 st.markdown(f"**Answer:** {pair['answer']['content']}")
 
-            if i in st.session_state.question_audio:
-                st.audio(st.session_state.question_audio[i], format="audio/wav")
+            if st.session_state.question_audio.get(i):
+                render_stored_audio(st.session_state.question_audio[i])
             st.divider()
 
         # Static recording controls parallel to answer input
@@ -516,7 +755,8 @@ elif mode == "Candidate Access":
             st.session_state.agent_state["history"].append({"role": "user", "content": final_answer})
             
             with st.spinner("AI is evaluating..."):
-                 result = st.session_state.graph.invoke(st.session_state.agent_state)
+                 with st.chat_message("assistant"):
+                     result, audio_future = run_graph_turn(st.session_state.agent_state)
                  st.session_state.agent_state = result
                  
                  # UPDATE EVALUATION WITH METRICS
@@ -527,17 +767,14 @@ elif mode == "Candidate Access":
             if result.get("current_question"):
                  q_text = result["current_question"]
                  logger.info(f"Generated Question: {q_text}")
-                 c_audio = text_to_speech_bytes(q_text)
                  
                  st.session_state.current_q_start_time = time.time() # Reset Timer
-                 with st.chat_message("assistant"):
-                     st.markdown(q_text)
-                     if c_audio: st.audio(c_audio, format="audio/mp3")
-                 st.session_state.messages.append({"role": "assistant", "content": q_text, "audio": c_audio})
+                 st.session_state.messages.append(question_message(q_text, audio_future))
                  st.session_state.agent_state["history"].append({"role": "assistant", "content": q_text})
                  st.session_state.current_q_idx = len(
                      [m for m in st.session_state.messages if m.get("role") == "assistant"]
                  ) - 1
+                 start_prefetch()
             else:
                 st.session_state.auto_ended = False
                 st.session_state.interview_active = False
@@ -556,12 +793,12 @@ if not st.session_state.interview_active and st.session_state.agent_state and st
     st.markdown("Here is the breakdown of your technical interview.")
     
     evals = st.session_state.agent_state["evaluations"]
-    total_score = sum(e["score"] for e in evals)
+    summary = summarize_evaluations(evals)
     # Fair average: include unanswered questions as 0
-    avg_score = total_score / config.MAX_QUESTIONS_DEFAULT if config.MAX_QUESTIONS_DEFAULT else 0
+    avg_score = summary["fair_score"]
     
-    skipped_count = sum(1 for e in evals if e.get("skipped") or (e.get('score') == 0 and "skipped" in e.get('feedback', '').lower()))
-    answered_count = len(evals) - skipped_count
+    skipped_count = summary["skipped_count"]
+    answered_count = summary["answered_count"]
 
     
     # Save Results to DB
@@ -570,7 +807,9 @@ if not st.session_state.interview_active and st.session_state.agent_state and st
         resume_score = cand.get("resume_score", 0) if cand else 0
 
         if "hr_recommendation" not in st.session_state:
-            st.session_state.hr_recommendation = generate_hr_recommendation(evals, avg_score, resume_score)
+            st.session_state.hr_recommendation = generate_hr_recommendation(
+                evals, avg_score, resume_score, interview_id=st.session_state.current_candidate_name
+            )
 
         rec = st.session_state.hr_recommendation
         rec["auto_ended"] = bool(st.session_state.get("auto_ended", False))
@@ -583,6 +822,7 @@ if not st.session_state.interview_active and st.session_state.agent_state and st
             final_summary=json.dumps(rec),
             decision=rec.get("decision")
         )
+        record_bank_usage()
         st.success("Results saved to HR Database!")
     
     col1, col2, col3 = st.columns(3)
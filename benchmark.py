@@ -0,0 +1,198 @@
+"""
+Offline benchmark for the interview agent.
+
+Drives create_graph() through full interviews, screens synthetic resumes and
+generates HR recommendations against the configured LLM backend, then reports
+throughput and latency percentiles. Metrics go to a temporary database so the
+real candidates.db is untouched.
+
+Examples:
+    python benchmark.py --backend fake --interviews 20 --concurrency 5
+    python benchmark.py --backend record --interviews 2 --concurrency 1 --seed 7
+    python benchmark.py --backend replay --interviews 2 --concurrency 1 --seed 7
+
+Replay needs the same seed, interview count and concurrency 1 as the recording
+run, because question topics/styles are picked at random.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import config
+from agent import db, llm_metrics
+from agent.utils import reset_llm_registry
+from agent.metrics import percentile, summarize_llm_calls
+
+JD_TEXT = "Data Scientist. Python, SQL, statistics, machine learning, model deployment and MLOps."
+
+# Distinct questions so the bank does not trip the near-duplicate check; rotated per interview
+_BANK_QUESTIONS = [
+    "What is overfitting and how do you detect it?",
+    "When would you use a tuple instead of a list in Python?",
+    "When would you use a LEFT JOIN instead of an INNER JOIN?",
+    "What does a p-value actually measure?",
+    "How does gradient boosting build its ensemble of trees?",
+]
+
+def _latency_summary(values):
+    return {
+        "count": len(values),
+        "p50_ms": _ms(percentile(values, 50)),
+        "p95_ms": _ms(percentile(values, 95)),
+        "p99_ms": _ms(percentile(values, 99)),
+    }
+
+def _ms(seconds):
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+def run_interview(graph, idx: int):
+    """
+    Runs one full interview with synthetic answers. Returns (final_state, per-turn latencies).
+    """
+    state = {
+        "topics": ["Python", "SQL", "Machine Learning"],
+        "history": [],
+        "current_question": None,
+        "evaluations": [],
+        "complexity_level": 1,
+        "question_count": 0,
+        "exit_session": False,
+        "question_bank": [_BANK_QUESTIONS[(idx + n) % len(_BANK_QUESTIONS)] for n in range(len(_BANK_QUESTIONS))],
+        "bank_index": 0,
+        "years_of_experience": 3,
+        "covered_concepts": [],
+        "interview_id": f"bench-{idx}",
+    }
+    turn_latencies = []
+    while True:
+        started = time.perf_counter()
+        state = graph.invoke(state)
+        turn_latencies.append(time.perf_counter() - started)
+        if not state.get("current_question"):
+            break
+        state["history"].append({"role": "assistant", "content": state["current_question"]})
+        state["history"].append({
+            "role": "user",
+            "content": f"Synthetic answer {len(state['evaluations'])} from candidate {idx}: "
+                       "I would profile first, then fix the bottleneck and add monitoring.",
+        })
+    return state, turn_latencies
+
+def bench_interviews(count: int, concurrency: int):
+    from agent.graph import create_graph
+    from agent.report import generate_hr_recommendation
+
+    graph = create_graph()
+    turn_latencies, interview_latencies, recommendation_latencies = [], [], []
+
+    def one(idx):
+        started = time.perf_counter()
+        state, turns = run_interview(graph, idx)
+        interview_time = time.perf_counter() - started
+        evals = state["evaluations"]
+        avg_score = sum(e["score"] for e in evals) / config.MAX_QUESTIONS_DEFAULT
+        rec_started = time.perf_counter()
+        generate_hr_recommendation(evals, avg_score, 80, interview_id=state["interview_id"])
+        return turns, interview_time, time.perf_counter() - rec_started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for turns, interview_time, rec_time in executor.map(one, range(count)):
+            turn_latencies.extend(turns)
+            interview_latencies.append(interview_time)
+            recommendation_latencies.append(rec_time)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "interviews": count,
+        "elapsed_s": round(elapsed, 2),
+        "interviews_per_min": round(count / elapsed * 60, 2) if elapsed else None,
+        "turns_per_s": round(len(turn_latencies) / elapsed, 2) if elapsed else None,
+        "turn_latency": _latency_summary(turn_latencies),
+        "interview_latency": _latency_summary(interview_latencies),
+        "recommendation_latency": _latency_summary(recommendation_latencies),
+    }
+
+def bench_screening(count: int, concurrency: int):
+    from agent.resume import screen_resume
+
+    resumes = [
+        f"Resume {n}\nJane Doe {n}\nData Scientist, 2019 - Present\nPython, SQL, pandas, scikit-learn, "
+        f"Airflow, Docker. Built {n} forecasting models."
+        for n in range(count)
+    ]
+
+    def one(text):
+        started = time.perf_counter()
+        screen_resume(text, JD_TEXT)
+        return time.perf_counter() - started
+
+    results = {}
+    # Second pass measures the screening cache
+    for label in ("cold", "cached"):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(one, resumes))
+        elapsed = time.perf_counter() - started
+        results[label] = {
+            "resumes": count,
+            "elapsed_s": round(elapsed, 2),
+            "resumes_per_s": round(count / elapsed, 2) if elapsed else None,
+            "latency": _latency_summary(latencies),
+        }
+    results["cache"] = db.get_screening_cache_stats()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark interviews, resume screening and HR recommendations.")
+    parser.add_argument("--backend", default="fake", choices=["live", "record", "replay", "fake"])
+    parser.add_argument("--interviews", type=int, default=10)
+    parser.add_argument("--resumes", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--questions", type=int, default=None, help="Override MAX_QUESTIONS_DEFAULT")
+    parser.add_argument("--fake-latency", type=float, default=None, help="Override FAKE_LLM_LATENCY_SECONDS")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", dest="json_path", default=None, help="Also write results to this file")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    config.LLM_BACKEND = args.backend
+    if args.questions:
+        config.MAX_QUESTIONS_DEFAULT = args.questions
+    if args.fake_latency is not None:
+        config.FAKE_LLM_LATENCY_SECONDS = args.fake_latency
+    reset_llm_registry()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, "benchmark.db")
+        db.init_db()
+
+        interviews = bench_interviews(args.interviews, args.concurrency)
+        screening = bench_screening(args.resumes, args.concurrency)
+        # LLM call records are written in the background
+        llm_metrics.flush()
+        results = {
+            "backend": args.backend,
+            "concurrency": args.concurrency,
+            "max_questions": config.MAX_QUESTIONS_DEFAULT,
+            "interviews": interviews,
+            "screening": screening,
+            "llm_nodes": summarize_llm_calls(db.get_recent_llm_calls(limit=1_000_000)),
+        }
+        db.close_all_connections()
+
+    print(json.dumps(results, indent=2))
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,13 @@ MODEL_NAME = "meta-llama/Meta-Llama-3.1-8B-Instruct"
 BASE_URL = "http://192.168.0.2:8000/v1"
 API_KEY = "EMPTY"
 
+# LLM backend: "live" (server above), "record" (live + save responses to
+# LLM_RECORDINGS_PATH), "replay" (saved responses only) or "fake" (synthetic)
+LLM_BACKEND = "live"
+LLM_RECORDINGS_PATH = "llm_recordings.jsonl"
+FAKE_LLM_LATENCY_SECONDS = 0.3
+FAKE_LLM_TOKENS_PER_SECOND = 40
+
 TEMPERATURE_ASK = 0.9
 TEMPERATURE_EVAL = 0.2
 TEMPERATURE_RECOMMEND = 0.2
@@ -19,6 +26,133 @@ MAX_TOKENS_EVAL = 220
 MAX_TOKENS_RECOMMEND = 350
 LLM_TIMEOUT_SECONDS = 15
 
+# Question prompt history: token budget and how many recent messages are kept verbatim
+QUESTION_CONTEXT_TOKEN_BUDGET = 1200
+QUESTION_CONTEXT_RECENT_TURNS = 6
+
+# Number of most recent LLM calls used for the dashboard latency percentiles
+LLM_METRICS_WINDOW = 5000
+# LLM call records are queued and written in batches by a background thread (agent/llm_metrics.py)
+LLM_METRICS_QUEUE_SIZE = 10000
+LLM_METRICS_BATCH_SIZE = 200
+LLM_METRICS_FLUSH_SECONDS = 1.0
+
+# LLM connection pooling (shared across all sessions in the process)
+LLM_POOL_MAX_CONNECTIONS = 100
+LLM_POOL_MAX_KEEPALIVE = 20
+LLM_POOL_KEEPALIVE_EXPIRY_SECONDS = 60
+LLM_CONNECT_TIMEOUT_SECONDS = 5
+
+# Resume screening: number of resumes screened concurrently per batch
+RESUME_SCREENING_WORKERS = 8
+# Screening cache hit/miss counters are kept in memory and written every N lookups (and after each batch)
+SCREENING_STATS_FLUSH_EVERY = 50
+# Only this many resume characters are sent to the LLM, so extraction stops there
+RESUME_MAX_CHARS = 4000
+# PDF text extraction runs in a process pool with limits for pathological files
+PDF_EXTRACT_WORKERS = 4
+PDF_MAX_PAGES = 20
+PDF_EXTRACT_TIMEOUT_SECONDS = 20
+
+# SQLite connection pool (WAL mode); sizes in KB / bytes as SQLite expects
+DB_POOL_SIZE = 8
+DB_BUSY_TIMEOUT_MS = 5000
+DB_CACHE_SIZE_KB = 16384
+DB_MMAP_SIZE_BYTES = 128 * 1024 * 1024
+# Candidates per page on the HR dashboard
+DASHBOARD_PAGE_SIZE = 25
+
+# Proctoring events (tab switch / blur / focus), written to their own DB in batches
+VIOLATIONS_DB_PATH = "violations.db"
+PROCTORING_QUEUE_SIZE = 10000
+PROCTORING_BATCH_SIZE = 200
+PROCTORING_FLUSH_SECONDS = 1.0
+
 # Question bank mixing (for uploaded HR question list)
 # Example: 2 means every 2nd question is from bank (if available)
 BANK_ASK_EVERY = 2
+
+# Streaming question delivery (tokens rendered as they arrive, TTS per sentence)
+STREAM_QUESTIONS = True
+TTS_WORKERS = 4
+# Question bank prewarming runs on its own small pool so live question audio never queues behind it
+TTS_PREWARM_WORKERS = 1
+# Question text renders at once; its audio player appears when synthesis finishes
+TTS_TIMEOUT_SECONDS = 20
+TTS_POLL_SECONDS = 0.5
+
+# Evaluate answer N and generate question N+1 concurrently in one graph step
+PARALLEL_EVAL_AND_ASK = True
+NODE_WORKERS = 8
+
+# Speculatively generate the next question while the candidate is answering
+PREFETCH_NEXT_QUESTION = True
+PREFETCH_WORKERS = 8
+PREFETCH_WAIT_SECONDS = 15
+
+# Near-duplicate question filter (agent/similarity.py, hashed TF-IDF cosine).
+# Calibrated on paraphrased interview questions (about 0.4 and up) against
+# unrelated ones from the same field (mostly under 0.1, topical neighbours up to ~0.3)
+QUESTION_SIMILARITY_THRESHOLD = 0.35
+SIMILARITY_HASH_DIM = 4096
+# Extra LLM attempts when a generated question repeats an earlier one
+QUESTION_DEDUP_RETRIES = 2
+# Most recent covered concepts listed in the prompt as banned
+QUESTION_AVOID_CONCEPTS = 8
+
+# Synthesized question audio cache (memory LRU in front of a size-bounded directory)
+TTS_CACHE_ENABLED = True
+TTS_CACHE_DIR = ".cache/tts"
+TTS_CACHE_MEMORY_MB = 64
+TTS_CACHE_DISK_MB = 1024
+
+# Speech backends (agent/speech_backends.py), loaded once per process.
+# TTS_BACKEND: "gtts" (Google, network) or "pyttsx3" (local system voices, offline)
+TTS_BACKEND = "gtts"
+TTS_LANGUAGE = "en"
+PYTTSX3_VOICE = None  # voice id, None = system default
+PYTTSX3_RATE = 175
+# ASR_BACKEND: "google" (network), "vosk" or "faster_whisper" (local CPU, offline)
+ASR_BACKEND = "google"
+ASR_LANGUAGE = "en"  # faster-whisper only
+VOSK_MODEL_PATH = "models/vosk-model-small-en-us-0.15"
+WHISPER_MODEL = "base.en"  # faster-whisper model size or path to a converted model
+WHISPER_COMPUTE_TYPE = "int8"
+WHISPER_CPU_THREADS = 4
+# Voice answers: trimmed, resampled to 16 kHz mono and split at pauses into chunks
+# of at most ASR_CHUNK_SECONDS that are recognized concurrently (ASR_WORKERS at a time)
+ASR_WORKERS = 4
+ASR_CHUNK_SECONDS = 15
+ASR_MIN_PAUSE_SECONDS = 0.3
+ASR_SILENCE_DB = 35  # frames this far below the loudest frame count as silence
+
+# Interview audio store (agent/audio_store.py): content-addressed files on disk,
+# session state keeps references; each session caches at most AUDIO_SESSION_MEMORY_MB
+AUDIO_STORE_DIR = ".cache/session_audio"
+AUDIO_STORE_DISK_MB = 2048
+AUDIO_SESSION_MEMORY_MB = 8
+# Recorded answers are stored as 16-bit mono WAV at this rate
+ANSWER_AUDIO_SAMPLE_RATE = 16000
+
+# Candidate code execution (agent/code_executor.py): "local" sandbox or the public "piston" API
+CODE_EXEC_BACKEND = "local"
+PISTON_API_URL = "https://emkc.org/api/v2/piston"
+PISTON_TIMEOUT_SECONDS = 30
+# Local sandbox (agent/sandbox.py): limits per run
+CODE_EXEC_TIMEOUT_SECONDS = 5  # wall clock
+CODE_EXEC_CPU_SECONDS = 3
+CODE_EXEC_MEMORY_MB = 256
+CODE_EXEC_MAX_OUTPUT_BYTES = 64 * 1024
+CODE_EXEC_MAX_FILE_MB = 8
+CODE_EXEC_MAX_OPEN_FILES = 64
+CODE_EXEC_MAX_PROCESSES = 32  # RLIMIT_NPROC per run, and pids.max of its cgroup below
+# Writable pids cgroup (v1 .../pids/<name> or v2 directory) to hold one child cgroup per worker.
+# Needed when the server runs as root, which RLIMIT_NPROC does not restrict. None = rlimit only
+CODE_EXEC_PIDS_CGROUP = None
+CODE_EXEC_COMPILE_TIMEOUT_SECONDS = 20
+CODE_EXEC_COMPILE_MEMORY_MB = 1024
+# Idle workers kept started per language; test cases of one submission run this many at a time
+CODE_EXEC_WARM_WORKERS = 4
+# Refuse to run code if the sandbox namespaces (read-only root, no network, own PIDs) are unavailable
+CODE_EXEC_REQUIRE_ISOLATION = True
+CODE_EXEC_WORK_DIR = None  # parent of the per-run directories, None = system temp dir
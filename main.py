@@ -27,7 +27,8 @@ def main():
         "question_count": 0,
         "exit_session": False,
         "question_bank": [],
-        "bank_index": 0
+        "bank_index": 0,
+        "covered_concepts": []
     }
     
     graph = create_graph()
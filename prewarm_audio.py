@@ -0,0 +1,51 @@
+"""
+Pre-generates question audio into the TTS cache (config.TTS_CACHE_DIR).
+
+Examples:
+    python prewarm_audio.py questions.csv
+    python prewarm_audio.py --bank-id 3
+    python prewarm_audio.py --all-banks
+
+Files use the same format as the HR question bank upload: one question per
+line, or a CSV whose first column is the question (db.parse_question_bank).
+"""
+import argparse
+import json
+import os
+import sys
+
+# Add current directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from agent import db
+from agent.audio import prewarm_tts
+
+def read_questions(path: str):
+    with open(path, "rb") as f:
+        return db.parse_question_bank(path, f.read())
+
+def main():
+    parser = argparse.ArgumentParser(description="Synthesize question bank audio ahead of interviews.")
+    parser.add_argument("files", nargs="*", help="Question bank files (.txt or .csv)")
+    parser.add_argument("--bank-id", type=int, action="append", default=[], help="Question bank stored in the DB")
+    parser.add_argument("--all-banks", action="store_true", help="Every question bank stored in the DB")
+    args = parser.parse_args()
+
+    questions = []
+    for path in args.files:
+        questions.extend(read_questions(path))
+    if args.bank_id or args.all_banks:
+        db.init_db()
+        bank_ids = list(args.bank_id)
+        if args.all_banks:
+            with db.connection() as conn:
+                bank_ids += [row["id"] for row in conn.execute("SELECT id FROM question_banks")]
+        for bank_id in bank_ids:
+            questions.extend(db.get_question_bank(bank_id))
+
+    if not questions:
+        parser.error("no questions given")
+    print(json.dumps(prewarm_tts(questions), indent=2))
+
+if __name__ == "__main__":
+    main()
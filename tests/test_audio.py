@@ -0,0 +1,50 @@
+import threading
+import time
+import pytest
+import config
+from agent import audio, audio_cache
+from agent.speech_backends import TTSBackend
+
+class SlowBackend(TTSBackend):
+    name = "slow"
+    format = "mp3"
+
+    def __init__(self):
+        self.delay = 0.2
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def synthesize(self, text: str) -> bytes:
+        time.sleep(self.delay)
+        with self._lock:
+            self.calls.append(text)
+        return text.encode("utf-8")
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = SlowBackend()
+    monkeypatch.setattr(config, "TTS_CACHE_ENABLED", True)
+    monkeypatch.setattr(config, "TTS_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_cache, "_tts_cache", None)
+    monkeypatch.setattr(audio_cache, "get_tts_backend", lambda: backend)
+    monkeypatch.setattr(audio, "get_tts_backend", lambda: backend)
+    yield backend
+    # Let queued prewarm jobs drain quickly
+    backend.delay = 0
+    audio._prewarm_executor.submit(lambda: None).result()
+    audio_cache._tts_cache = None
+
+def test_prewarm_fills_the_cache(backend):
+    result = audio.prewarm_tts(["What is overfitting?", "What is overfitting? ", "What is a p-value?"])
+    assert result == {"total": 2, "cached": 0, "synthesized": 2, "failed": 0}
+    assert audio.prewarm_tts(["What is a p-value?"])["cached"] == 1
+    assert len(backend.calls) == 2
+
+def test_live_audio_does_not_wait_for_prewarm(backend):
+    audio.prewarm_tts([f"Bank question number {n}?" for n in range(50)], block=False)
+    started = time.monotonic()
+    synthesizer = audio.SentenceAudioSynthesizer()
+    fp = synthesizer.finish("Explain the bias-variance tradeoff.")
+    # 50 queued bank questions take 10 s on one worker; the live question takes one synthesis
+    assert time.monotonic() - started < 1.0
+    assert fp.getvalue() == b"Explain the bias-variance tradeoff."
@@ -0,0 +1,63 @@
+import os
+import threading
+from agent.audio_cache import AudioCache, tts_cache_key
+
+def test_key_depends_on_normalized_text_and_voice():
+    assert tts_cache_key("What is  overfitting?\n") == tts_cache_key("What is overfitting?")
+    assert tts_cache_key("What is overfitting?", "gtts:en") != tts_cache_key("What is overfitting?", "pyttsx3:default:170")
+    assert tts_cache_key("What is overfitting?") != tts_cache_key("What is underfitting?")
+
+def test_disk_entries_survive_a_new_instance(tmp_path):
+    cache = AudioCache(str(tmp_path), memory_bytes=1024, disk_bytes=1024 * 1024)
+    cache.put("ab" + "0" * 62, b"audio")
+    assert cache.get("ab" + "0" * 62) == b"audio"
+    assert cache.get("cd" + "0" * 62) is None
+
+    reopened = AudioCache(str(tmp_path), memory_bytes=1024, disk_bytes=1024 * 1024)
+    assert reopened.get("ab" + "0" * 62) == b"audio"
+    assert reopened.stats()["hits"] == 1
+    # No temporary files are left behind
+    assert all(name.endswith(".mp3") for _, _, files in os.walk(tmp_path) for name in files)
+
+def test_memory_tier_is_bounded_lru(tmp_path):
+    cache = AudioCache(str(tmp_path), memory_bytes=10, disk_bytes=1024 * 1024)
+    cache.put("k1", b"aaaa")
+    cache.put("k2", b"bbbb")
+    cache.get("k1")
+    cache.put("k3", b"cccc")
+    stats = cache.stats()
+    assert stats["memory_bytes"] <= 10
+    assert list(cache._memory) == ["k1", "k3"]
+    # Entries larger than the memory budget only go to disk
+    cache.put("k4", b"x" * 100)
+    assert "k4" not in cache._memory
+    assert cache.get("k4") == b"x" * 100
+
+def test_disk_evicts_least_recently_used(tmp_path):
+    cache = AudioCache(str(tmp_path), memory_bytes=0, disk_bytes=300)
+    for n in range(3):
+        key = f"k{n}"
+        cache.put(key, bytes([n]) * 100)
+        os.utime(cache._path(key), (1000 + n, 1000 + n))
+    # Reading k0 makes it the most recently used entry
+    assert cache.get("k0") == bytes([0]) * 100
+    cache.put("k3", b"3" * 100)
+    assert cache.stats()["disk_bytes"] <= 300 * 0.9
+    assert cache.get("k1") is None
+    assert cache.get("k0") is not None
+    assert cache.get("k3") is not None
+
+def test_concurrent_writers(tmp_path):
+    cache = AudioCache(str(tmp_path), memory_bytes=1024, disk_bytes=1024 * 1024)
+    data = b"same audio" * 100
+
+    def write():
+        for _ in range(20):
+            cache.put("shared", data)
+
+    threads = [threading.Thread(target=write) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert AudioCache(str(tmp_path), memory_bytes=0, disk_bytes=1024 * 1024).get("shared") == data
@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+import config
+from agent import audio_store
+from agent.audio_store import SessionAudio
+from agent.wav import read_wav, write_wav
+
+@pytest.fixture(autouse=True)
+def store_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "AUDIO_STORE_DIR", str(tmp_path))
+    monkeypatch.setattr(audio_store, "_disk", None)
+
+def test_put_answer_stores_the_bytes_it_returns():
+    t = np.arange(44100) / 44100
+    stereo = np.stack([np.sin(2 * np.pi * 440 * t)] * 2, axis=1).astype(np.float32) * 0.5
+    session = SessionAudio()
+
+    ref, answer_wav = session.put_answer(write_wav(stereo, 44100))
+    samples, rate = read_wav(answer_wav)
+    assert rate == config.ANSWER_AUDIO_SAMPLE_RATE
+    assert samples.shape[1] == 1
+    assert ref["format"] == "audio/wav"
+    assert SessionAudio().get(ref) == answer_wav
+
+def test_undecodable_answer_is_stored_unchanged():
+    ref, answer_wav = SessionAudio().put_answer(b"not a wav")
+    assert answer_wav == b"not a wav"
+    assert SessionAudio().get(ref) == b"not a wav"
+    assert SessionAudio().put_answer(b"") == (None, b"")
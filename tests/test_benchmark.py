@@ -0,0 +1,41 @@
+import pytest
+import config
+from agent import db, llm_metrics
+from agent.similarity import similarities
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("langgraph")
+
+import benchmark
+from agent.graph import create_graph
+from agent.llm_backends import _FAKE_QUESTIONS
+from agent.utils import reset_llm_registry
+
+@pytest.fixture
+def fake_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "LLM_BACKEND", "fake")
+    monkeypatch.setattr(config, "FAKE_LLM_LATENCY_SECONDS", 0)
+    monkeypatch.setattr(config, "FAKE_LLM_TOKENS_PER_SECOND", 0)
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "bench.db"))
+    db.init_db()
+    reset_llm_registry()
+    yield
+    reset_llm_registry()
+    db.close_all_connections()
+
+def test_fake_questions_are_not_near_duplicates():
+    scores = similarities(_FAKE_QUESTIONS + benchmark._BANK_QUESTIONS,
+                          _FAKE_QUESTIONS + benchmark._BANK_QUESTIONS)
+    for i in range(len(scores)):
+        scores[i][i] = 0.0
+    assert scores.max() < config.QUESTION_SIMILARITY_THRESHOLD
+
+def test_benchmark_makes_one_question_call_per_turn(fake_backend):
+    state, _ = benchmark.run_interview(create_graph(), 0)
+    assert llm_metrics.flush()
+
+    calls = [c for c in db.get_recent_llm_calls()
+             if c["node"] == "generate_question" and c["interview_id"] == state["interview_id"]]
+    generated = len(state["evaluations"]) - len(state["asked_bank_questions"])
+    assert generated > 0
+    assert len(calls) == generated
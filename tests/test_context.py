@@ -0,0 +1,50 @@
+from agent.context import build_question_context, estimate_tokens, summarize_question
+
+def _interview(turns):
+    history = []
+    for n in range(turns):
+        history.append({"role": "assistant", "content": f"Question {n}: explain concept number {n} in detail. " * 3})
+        history.append({"role": "user", "content": f"Answer {n} " * 20})
+    return history
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abc") == 1
+    assert estimate_tokens("x" * 400) == 100
+
+def test_summarize_question_keeps_first_sentence_without_markdown():
+    assert summarize_question("**What is overfitting?** Give an example from your work.") == "What is overfitting?"
+    long_question = " ".join(f"word{n}" for n in range(30))
+    assert summarize_question(long_question, max_words=5) == "word0 word1 word2 word3 word4..."
+
+def test_context_stays_within_budget_as_history_grows():
+    for turns in (1, 10, 100):
+        history = _interview(turns)
+        concepts = [f"concept {n}" for n in range(turns)]
+        context, tokens = build_question_context(history, concepts, token_budget=300, recent_turns=4)
+        assert tokens <= 300
+        assert tokens == estimate_tokens(context)
+        # The latest turn is always there verbatim
+        assert history[-1]["content"].strip() in context
+
+def test_older_questions_are_listed_by_concept():
+    history = _interview(10)
+    concepts = [f"concept {n}" for n in range(10)]
+    context, _ = build_question_context(history, concepts, token_budget=2000, recent_turns=4)
+    assert "Earlier questions (summarized):" in context
+    # The last two turns (4 messages) are verbatim, the eight before as concepts
+    assert "- concept 7" in context
+    assert "- concept 8" not in context
+    assert "Question 8:" in context
+    assert "Question 7:" not in context
+
+def test_missing_concepts_are_summarized():
+    history = _interview(5)
+    context, _ = build_question_context(history, [], token_budget=2000, recent_turns=2)
+    assert "- Question 0: explain concept number 0 in detail." in context
+
+def test_oversized_latest_message_is_truncated():
+    history = [{"role": "user", "content": "x" * 10000}]
+    context, tokens = build_question_context(history, [], token_budget=50, recent_turns=4)
+    assert tokens <= 50
+    assert context.startswith("user: xxx")
@@ -0,0 +1,179 @@
+import json
+import sqlite3
+import pytest
+import config
+from agent import db
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "candidates.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    yield path
+    db.close_all_connections()
+
+def _user_version(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def _tables(path):
+    with sqlite3.connect(path) as conn:
+        return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+def _legacy_db(path):
+    # Schema and rows as written before versioned migrations (JSON blobs on candidates)
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE candidates (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT UNIQUE,
+            email TEXT,
+            resume_score INTEGER,
+            resume_analysis TEXT,
+            extracted_topics TEXT,
+            interview_data TEXT,
+            interview_score REAL,
+            status TEXT,
+            timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute("ALTER TABLE candidates ADD COLUMN question_bank TEXT DEFAULT NULL")
+    evaluations = [
+        {"question": "What is overfitting?", "user_answer": "...", "score": 8, "feedback": "ok", "duration": 30},
+        {"question": "What is a p-value?", "user_answer": "Skipped", "score": 0, "feedback": "", "duration": 5,
+         "skipped": True},
+    ]
+    conn.execute(
+        "INSERT INTO candidates (name, resume_score, interview_data, interview_score, status, question_bank) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ("alice", 85, json.dumps(evaluations), 8.0, "completed", json.dumps(["Q1?", "Q2?"])),
+    )
+    conn.execute(
+        "INSERT INTO candidates (name, resume_score, status, question_bank) VALUES (?, ?, ?, ?)",
+        ("bob", 75, "screened", json.dumps(["Q1?", "Q2?"])),
+    )
+    conn.commit()
+    conn.close()
+
+def test_fresh_database_gets_every_migration(db_path):
+    db.init_db()
+    assert _user_version(db_path) == len(db.MIGRATIONS)
+    assert {"candidates", "evaluations", "screening_cache", "llm_calls", "questions",
+            "question_banks", "question_bank_items", "candidate_question_usage"} <= _tables(db_path)
+
+def test_init_db_runs_each_migration_once(db_path, capsys):
+    db.init_db()
+    capsys.readouterr()
+    db.close_all_connections()
+    db.init_db()
+    db.init_db()
+    assert "Migrating DB" not in capsys.readouterr().out
+    assert _user_version(db_path) == len(db.MIGRATIONS)
+
+def test_partially_migrated_database_continues(db_path, capsys):
+    with sqlite3.connect(db_path) as conn:
+        for migration in db.MIGRATIONS[:3]:
+            conn.row_factory = sqlite3.Row
+            migration(conn)
+        conn.execute("PRAGMA user_version = 3")
+    capsys.readouterr()
+    db.init_db()
+    out = capsys.readouterr().out
+    assert out.count("Migrating DB") == len(db.MIGRATIONS) - 3
+    assert _user_version(db_path) == len(db.MIGRATIONS)
+
+def test_legacy_database_is_migrated_in_place(db_path):
+    _legacy_db(db_path)
+    db.init_db()
+
+    alice = db.get_candidate("Alice")
+    # Interview blob moved to the evaluations table, summary columns backfilled
+    assert alice["interview_data"] is None
+    assert [e["question"] for e in db.get_evaluations("alice")] == ["What is overfitting?", "What is a p-value?"]
+    assert (alice["evaluation_count"], alice["answered_count"], alice["skipped_count"]) == (2, 1, 1)
+    assert alice["total_score"] == 8
+    assert alice["total_duration"] == 35
+
+    # Identical per-candidate question banks become one shared bank
+    bob = db.get_candidate("bob")
+    assert alice["question_bank"] is None and bob["question_bank"] is None
+    assert alice["question_bank_id"] == bob["question_bank_id"] is not None
+    assert db.get_candidate_question_bank("bob") == ["Q1?", "Q2?"]
+
+def _screened(name, score=80, **extra):
+    return {"name": name, "score": score, "analysis": {"name": name}, "topics": ["ML"],
+            "question_bank": ["Q1?", "Q2?"], "years_of_experience": 2, **extra}
+
+def test_add_candidates_reports_outcomes(db_path):
+    db.init_db()
+    outcomes = db.add_candidates([
+        _screened("Alice"),
+        _screened("Bob"),
+        {"name": "Carol"},
+        _screened("  "),
+        _screened("alice", score=90),
+    ])
+    assert [(o["name"], o["outcome"]) for o in outcomes] == [
+        ("alice", "inserted"), ("bob", "inserted"), ("Carol", "error"), ("  ", "error"), ("alice", "updated"),
+    ]
+    assert "score" in outcomes[2]["error"]
+    # The later row of a duplicated name wins
+    assert db.get_candidate("alice")["resume_score"] == 90
+    assert db.get_candidate("carol") is None
+
+def test_rescreening_keeps_interview_results(db_path):
+    db.init_db()
+    db.add_candidates([_screened("alice", score=70)])
+    evaluations = [{"question": "What is overfitting?", "user_answer": "...", "score": 7, "feedback": "", "duration": 12}]
+    db.update_interview_result("alice", evaluations, final_summary='{"decision": "Hold"}', decision="Hold")
+    before = db.get_candidate("alice")
+
+    outcomes = db.add_candidates([_screened("alice", score=95, topics=["SQL"], question_bank=["Q3?"])])
+    assert outcomes[0]["outcome"] == "updated"
+    after = db.get_candidate("alice")
+    # Screening fields are refreshed...
+    assert after["resume_score"] == 95
+    assert json.loads(after["extracted_topics"]) == ["SQL"]
+    assert db.get_question_bank(after["question_bank_id"]) == ["Q3?"]
+    # ...interview results, status and timestamp are not
+    for column in ("id", "status", "interview_score", "final_summary", "can_hire", "timestamp",
+                   "evaluation_count", "answered_count", "total_score", "total_duration"):
+        assert after[column] == before[column], column
+    assert after["status"] == "completed"
+    assert len(db.get_evaluations("alice")) == 1
+
+def test_batch_shares_one_question_bank(db_path):
+    db.init_db()
+    db.add_candidates([_screened(f"candidate{n}") for n in range(5)])
+    bank_ids = {db.get_candidate(f"candidate{n}")["question_bank_id"] for n in range(5)}
+    assert len(bank_ids) == 1
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM question_banks").fetchone()[0] == 1
+
+def test_only_questions_marked_used_leave_the_candidate_bank(db_path):
+    db.init_db()
+    db.add_candidates([_screened("alice", question_bank=["Q1?", "Q2?", "Q3?"]), _screened("bob", question_bank=["Q1?", "Q2?", "Q3?"])])
+    db.mark_questions_used("alice", ["Q2?"])
+    db.mark_questions_used("alice", ["Q2?", "not in the bank"])
+    assert db.get_candidate_question_bank("alice") == ["Q1?", "Q3?"]
+    assert db.get_candidate_question_bank("bob") == ["Q1?", "Q2?", "Q3?"]
+
+def _stats_rows(path):
+    with sqlite3.connect(path) as conn:
+        return dict(conn.execute("SELECT name, value FROM screening_cache_stats").fetchall())
+
+def test_screening_cache_counts_are_buffered(db_path, monkeypatch):
+    monkeypatch.setattr(config, "SCREENING_STATS_FLUSH_EVERY", 3)
+    db.init_db()
+    db.save_cached_screening("k1", "v1", {"score": 80})
+
+    assert db.get_cached_screening("k1") == {"score": 80}
+    assert db.get_cached_screening("k2") is None
+    assert _stats_rows(db_path) == {}
+    assert db.get_screening_cache_stats() == {"entries": 1, "hits": 1, "misses": 1}
+
+    db.get_cached_screening("k1")
+    assert _stats_rows(db_path) == {"hits": 2, "misses": 1}
+    db.get_cached_screening("k3")
+    db.flush_screening_cache_stats()
+    assert _stats_rows(db_path) == {"hits": 2, "misses": 2}
+    assert db.get_screening_cache_stats() == {"entries": 1, "hits": 2, "misses": 2}
@@ -0,0 +1,39 @@
+import pytest
+from agent import db, llm_metrics
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = str(tmp_path / "candidates.db")
+    monkeypatch.setattr(db, "DB_PATH", path)
+    db.init_db()
+    yield path
+    llm_metrics.flush()
+    db.close_all_connections()
+
+def _record(node, interview_id="i1", latency_ms=100.0):
+    llm_metrics.record_llm_call(node=node, interview_id=interview_id, model="m", prompt_tokens=10,
+                                completion_tokens=5, tokens_estimated=False, ttft_ms=None,
+                                latency_ms=latency_ms, status="ok")
+
+def test_flush_writes_queued_calls(db_path):
+    for n in range(5):
+        _record("generate_question", latency_ms=float(n))
+    _record("evaluate_answer", interview_id="i2")
+
+    assert llm_metrics.flush()
+    calls = db.get_recent_llm_calls()
+    assert len(calls) == 6
+    assert calls[0]["node"] == "evaluate_answer"
+    assert {row["interview_id"]: row["calls"] for row in db.get_llm_usage_by_interview()} == {"i1": 5, "i2": 1}
+
+def test_calls_go_to_the_database_current_when_recorded(tmp_path, monkeypatch, db_path):
+    _record("generate_question")
+    other = str(tmp_path / "other.db")
+    monkeypatch.setattr(db, "DB_PATH", other)
+    db.init_db()
+    _record("screen_resume")
+
+    assert llm_metrics.flush()
+    assert [c["node"] for c in db.get_recent_llm_calls()] == ["screen_resume"]
+    monkeypatch.setattr(db, "DB_PATH", db_path)
+    assert [c["node"] for c in db.get_recent_llm_calls()] == ["generate_question"]
@@ -0,0 +1,177 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import time
+import pytest
+import config
+from agent import sandbox
+
+pytestmark = pytest.mark.skipif(not sandbox.isolation_available(), reason="sandbox namespaces (unshare) unavailable")
+
+@pytest.fixture(autouse=True)
+def limits(monkeypatch):
+    monkeypatch.setattr(config, "CODE_EXEC_TIMEOUT_SECONDS", 3)
+    monkeypatch.setattr(config, "CODE_EXEC_CPU_SECONDS", 1)
+    monkeypatch.setattr(config, "CODE_EXEC_MEMORY_MB", 128)
+    monkeypatch.setattr(config, "CODE_EXEC_MAX_OUTPUT_BYTES", 4096)
+    monkeypatch.setattr(config, "CODE_EXEC_MAX_FILE_MB", 1)
+
+def _run(code, stdin="", language="python"):
+    return sandbox.execute(language, code, stdin)["run"]
+
+def test_runs_code_with_stdin():
+    stage = _run("import sys\nprint(sys.stdin.read().upper())\nsys.exit(3)", stdin="hello")
+    assert stage["stdout"] == "HELLO\n"
+    assert stage["code"] == 3
+    assert stage["signal"] is None
+
+def test_wall_clock_limit():
+    config.CODE_EXEC_CPU_SECONDS = 10
+    started = time.monotonic()
+    stage = _run("import time\ntime.sleep(30)")
+    assert time.monotonic() - started < 6
+    assert stage["signal"] == "SIGKILL"
+    assert "Time limit exceeded" in stage["stderr"]
+
+def test_cpu_limit():
+    stage = _run("while True:\n    pass")
+    assert stage["signal"] == "SIGXCPU"
+    assert "CPU time limit exceeded" in stage["stderr"]
+
+def test_memory_limit():
+    stage = _run("data = bytearray(512 * 1024 * 1024)\nprint(len(data))")
+    assert stage["code"] != 0
+    assert "MemoryError" in stage["stderr"]
+
+def test_output_limit():
+    stage = _run("while True:\n    print('x' * 1000)")
+    assert len(stage["stdout"]) <= 4096
+    assert stage["signal"] == "SIGKILL"
+    assert "Output limit exceeded" in stage["stderr"]
+
+def test_file_size_limit():
+    stage = _run("with open('big', 'wb') as f:\n    f.write(b'x' * 4 * 1024 * 1024)")
+    assert stage["code"] != 0
+    assert "File too large" in stage["stderr"]
+
+def test_host_files_are_not_visible():
+    config_path = os.path.abspath(config.__file__)
+    stage = _run(
+        "import os, sys\n"
+        f"print(os.path.exists({config_path!r}))\n"
+        "try:\n"
+        "    open('/usr/sandbox-test', 'w')\n"
+        "except OSError as e:\n"
+        "    print('read-only', e.errno)\n"
+        "open('/tmp/scratch', 'w').write('ok')\n"
+        "print(os.getcwd())\n"
+    )
+    assert stage["stdout"].split("\n")[:3] == ["False", "read-only 30", "/work"]
+
+def test_no_network():
+    stage = _run(
+        "import socket\n"
+        "try:\n"
+        "    socket.create_connection(('1.1.1.1', 53), timeout=1)\n"
+        "    print('connected')\n"
+        "except OSError:\n"
+        "    print('blocked')\n"
+    )
+    assert stage["stdout"] == "blocked\n"
+
+def test_cannot_chroot_out_of_the_sandbox(tmp_path):
+    config_path = os.path.abspath(config.__file__)
+    marker = tmp_path / "escaped"
+    stage = _run(
+        "import os\n"
+        "try:\n"
+        "    os.makedirs('jail', exist_ok=True)\n"
+        "    os.chroot('jail')\n"
+        "    for _ in range(64):\n"
+        "        os.chdir('..')\n"
+        "    os.chroot('.')\n"
+        f"    print('visible', os.path.exists({config_path!r}))\n"
+        f"    open({str(marker)!r}, 'w').write('x')\n"
+        "except OSError as e:\n"
+        "    print('blocked', e.errno)\n"
+    )
+    assert stage["stdout"] == "blocked 1\n"
+    assert not marker.exists()
+
+def test_job_has_no_capabilities():
+    stage = _run(
+        "import os\n"
+        "for call in (lambda: os.chroot('/tmp'), lambda: os.mknod('/tmp/null', 0o20666, os.makedev(1, 3))):\n"
+        "    try:\n"
+        "        call()\n"
+        "        print('allowed')\n"
+        "    except PermissionError:\n"
+        "        print('denied')\n"
+    )
+    assert stage["stdout"] == "denied\ndenied\n"
+
+def _processes_running(argv):
+    found = []
+    for pid in os.listdir("/proc"):
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                if f.read().split(b"\0")[:-1] == [arg.encode() for arg in argv]:
+                    found.append(pid)
+        except OSError:
+            pass
+    return found
+
+def test_background_processes_are_killed():
+    marker = "314.159"
+    started = time.monotonic()
+    stage = _run(
+        "import subprocess\n"
+        f"subprocess.Popen(['sleep', '{marker}'], start_new_session=True)\n"
+        "print('parent done')\n"
+    )
+    assert stage["stdout"] == "parent done\n"
+    assert stage["code"] == 0
+    assert time.monotonic() - started < 3
+    assert _processes_running(["sleep", marker]) == []
+
+@pytest.mark.skipif(os.geteuid() == 0 and not config.CODE_EXEC_PIDS_CGROUP,
+                    reason="RLIMIT_NPROC does not apply to root; needs CODE_EXEC_PIDS_CGROUP")
+def test_process_limit():
+    stage = _run(
+        "import os, time\n"
+        "count = 0\n"
+        "for _ in range(200):\n"
+        "    try:\n"
+        "        if os.fork() == 0:\n"
+        "            time.sleep(2)\n"
+        "            os._exit(0)\n"
+        "        count += 1\n"
+        "    except OSError:\n"
+        "        break\n"
+        "print(count)\n"
+    )
+    assert int(stage["stdout"]) < config.CODE_EXEC_MAX_PROCESSES
+
+def test_compile_errors_are_reported():
+    if not sandbox.resolve_language("c") or not sandbox._executable("c"):
+        pytest.skip("no C compiler")
+    result = sandbox.execute("c", "int main( { return 0; }")
+    assert result["compile"]["code"] != 0
+    assert result["run"] is result["compile"]
+    assert _run('#include <stdio.h>\nint main(){puts("hi");return 0;}', language="c")["stdout"] == "hi\n"
+
+def test_concurrent_runs_do_not_share_files():
+    program = sandbox.prepare("python", (
+        "import os, sys, time\n"
+        "tag = sys.stdin.read()\n"
+        "print(sorted(f for f in os.listdir('.') if f.startswith('case-')))\n"
+        "open('case-' + tag, 'w').write(tag)\n"
+        "time.sleep(0.3)\n"
+        "print(sorted(f for f in os.listdir('.') if f.startswith('case-')))\n"
+    ))
+    try:
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            stages = list(executor.map(lambda tag: sandbox.run(program, tag)["run"], ["a", "b", "c", "d"]))
+    finally:
+        sandbox.cleanup(program)
+    for tag, stage in zip("abcd", stages):
+        assert stage["stdout"] == f"[]\n['case-{tag}']\n"
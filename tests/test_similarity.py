@@ -0,0 +1,71 @@
+import config
+from agent.similarity import most_similar, split_near_duplicates
+
+# Same question, reworded
+PARAPHRASES = [
+    ("Explain the bias-variance tradeoff.", "What is the tradeoff between bias and variance in a model?"),
+    ("How would you build a machine learning pipeline for production?",
+     "Walk me through designing an end-to-end ML pipeline that runs in production."),
+    ("What is the difference between L1 and L2 regularization?",
+     "Compare L1 vs L2 regularization and when you would use each."),
+    ("How do you handle missing values in a dataset?", "What techniques do you use to deal with missing data?"),
+    ("Explain how a random forest works.", "Can you describe how random forests make predictions?"),
+    ("What is overfitting and how do you prevent it?", "How would you avoid overfitting a model?"),
+    ("How does gradient descent work?", "Explain the gradient descent optimization algorithm."),
+    ("What is the difference between precision and recall?", "Explain precision versus recall."),
+    ("How do you deal with imbalanced classes?",
+     "What would you do if your classification dataset is highly imbalanced?"),
+    ("Explain cross-validation.", "Why do we use k-fold cross validation?"),
+    ("How does a SQL JOIN differ from a UNION?", "What is the difference between JOIN and UNION in SQL?"),
+]
+
+# Different questions from the same field, several with the same phrasing
+UNRELATED = [
+    ("Explain the bias-variance tradeoff.", "How do you handle missing values in a dataset?"),
+    ("What is the difference between L1 and L2 regularization?",
+     "What is the difference between precision and recall?"),
+    ("Explain how a random forest works.", "Explain how gradient boosting works."),
+    ("How do you deal with imbalanced classes?", "How do you deal with outliers in a dataset?"),
+    ("Explain cross-validation.", "Explain the central limit theorem."),
+    ("What is the difference between a list and a tuple in Python?",
+     "What is the difference between bagging and boosting?"),
+    ("How does a SQL JOIN differ from a UNION?", "How would you optimize a slow SQL query?"),
+    ("Describe a project where you used NLP.", "Describe a project where you used computer vision."),
+    ("How does k-means clustering work?", "How does k-nearest neighbors work?"),
+    ("What is a confusion matrix?", "What is a ROC curve?"),
+    ("Tell me about a time you disagreed with a stakeholder.",
+     "How would you explain a model to a non-technical stakeholder?"),
+]
+
+def test_paraphrases_are_near_duplicates():
+    for question, asked in PARAPHRASES:
+        score, _ = most_similar(question, [asked])
+        assert score >= config.QUESTION_SIMILARITY_THRESHOLD, (question, asked, score)
+
+def test_unrelated_questions_are_kept():
+    for question, asked in UNRELATED:
+        score, _ = most_similar(question, [asked])
+        assert score < config.QUESTION_SIMILARITY_THRESHOLD, (question, asked, score)
+
+def test_most_similar_points_at_the_repeated_question():
+    asked = [
+        "What is a confusion matrix?",
+        "What is the tradeoff between bias and variance in a model?",
+        "How does k-means clustering work?",
+    ]
+    score, idx = most_similar("Explain the bias-variance tradeoff.", asked)
+    assert idx == 1
+    assert most_similar("Explain the bias-variance tradeoff.", []) == (0.0, None)
+
+def test_split_near_duplicates_drops_only_repeats():
+    bank = [
+        "What techniques do you use to deal with missing data?",
+        "How would you optimize a slow SQL query?",
+        "Can you describe how random forests make predictions?",
+        "What is a ROC curve?",
+    ]
+    asked = ["How do you handle missing values in a dataset?", "Explain how a random forest works."]
+    keep, dropped = split_near_duplicates(bank, asked)
+    assert keep == [1, 3]
+    assert dropped == [0, 2]
+    assert split_near_duplicates(bank, []) == ([0, 1, 2, 3], [])
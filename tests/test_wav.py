@@ -0,0 +1,127 @@
+import struct
+import numpy as np
+import pytest
+from agent.wav import (
+    load_mono, normalize_wav, read_wav, resample, split_at_pauses, to_mono, trim_silence, write_wav,
+)
+
+def _wav(samples: np.ndarray, rate: int, tag: int, bits: int, extensible: bool = False, data_size=None,
+         channels=None) -> bytes:
+    # samples: (frames, channels) already in the target dtype
+    channels = channels or samples.shape[1]
+    body = samples.tobytes()
+    block = channels * bits // 8
+    if extensible:
+        fmt = struct.pack("<HHIIHHHHIH14s", 0xFFFE, channels, rate, rate * block, block, bits,
+                          22, bits, 0, tag, b"\x00" * 14)
+    else:
+        fmt = struct.pack("<HHIIHH", tag, channels, rate, rate * block, block, bits)
+    size = len(body) if data_size is None else data_size
+    chunks = b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", size) + body
+    return b"RIFF" + struct.pack("<I", 4 + len(chunks)) + b"WAVE" + chunks
+
+def _tone(rate: int, seconds: float = 0.5, freq: float = 440.0) -> np.ndarray:
+    t = np.arange(int(rate * seconds)) / rate
+    return (0.5 * np.sin(2 * np.pi * freq * t)).astype(np.float32)
+
+def test_16bit_round_trip():
+    tone = _tone(16000)
+    samples, rate = read_wav(write_wav(tone, 16000))
+    assert rate == 16000
+    assert samples.shape == (len(tone), 1)
+    assert np.abs(samples[:, 0] - tone).max() < 1e-4
+
+@pytest.mark.parametrize("tag,bits,dtype,scale", [
+    (1, 16, "<i2", 32767),
+    (1, 32, "<i4", 2 ** 31 - 1),
+    (3, 32, "<f4", 1.0),
+    (3, 64, "<f8", 1.0),
+])
+def test_decodes_pcm_and_float(tag, bits, dtype, scale):
+    tone = _tone(8000)
+    stereo = np.stack([tone, -tone], axis=1)
+    data = _wav((stereo * scale).astype(dtype), 8000, tag, bits)
+    samples, rate = read_wav(data)
+    assert rate == 8000
+    assert samples.dtype == np.float32
+    assert samples.shape == stereo.shape
+    assert np.abs(samples - stereo).max() < 1e-3
+
+def test_decodes_8_and_24_bit_pcm():
+    values = np.array([-1.0, -0.5, 0.0, 0.5], dtype=np.float32)
+    pcm8 = (values * 128 + 128).astype(np.uint8).reshape(-1, 1)
+    assert np.allclose(read_wav(_wav(pcm8, 8000, 1, 8))[0][:, 0], values)
+
+    ints = (values * (1 << 23)).astype(np.int32)
+    raw = np.stack([ints & 0xFF, (ints >> 8) & 0xFF, (ints >> 16) & 0xFF], axis=1).astype(np.uint8)
+    data = _wav(raw, 8000, 1, 24, channels=1)
+    assert np.allclose(read_wav(data)[0][:, 0], values)
+
+def test_extensible_header_and_streamed_size():
+    tone = (_tone(16000) * 32767).astype("<i2").reshape(-1, 1)
+    samples, _ = read_wav(_wav(tone, 16000, 1, 16, extensible=True))
+    assert samples.shape == (len(tone), 1)
+    # Browser recorders can leave the data size at 0 or 0xFFFFFFFF
+    for size in (0, 0xFFFFFFFF):
+        samples, _ = read_wav(_wav(tone, 16000, 1, 16, data_size=size))
+        assert samples.shape == (len(tone), 1)
+
+def test_rejects_invalid_input():
+    with pytest.raises(ValueError):
+        read_wav(b"not a wav file at all")
+    with pytest.raises(ValueError):
+        read_wav(_wav(np.zeros((10, 1), dtype=np.uint8), 8000, 2, 8))
+
+def test_to_mono_and_resample():
+    stereo = np.array([[1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    assert np.allclose(to_mono(stereo), [0.5, 0.5])
+    tone = _tone(48000, seconds=1.0)
+    down = resample(tone, 48000, 16000)
+    assert len(down) == 16000
+    # Still a 440 Hz tone of the same loudness
+    assert abs(np.sqrt(np.mean(down ** 2)) - np.sqrt(np.mean(tone ** 2))) < 0.01
+    assert np.argmax(np.abs(np.fft.rfft(down))) == 440
+    assert len(resample(tone[:100], 16000, 16000)) == 100
+
+def test_normalize_wav_shrinks_stereo_float_recordings():
+    tone = _tone(48000)
+    stereo = np.stack([tone, tone], axis=1)
+    recorded = _wav(stereo.astype("<f4"), 48000, 3, 32)
+    normalized = normalize_wav(recorded, 16000)
+    assert len(normalized) * 10 < len(recorded)
+    samples, rate = read_wav(normalized)
+    assert rate == 16000 and samples.shape[1] == 1
+    assert np.allclose(load_mono(normalized, 16000), samples[:, 0])
+
+def _speech_with_pauses(rate, parts):
+    # parts: list of ("tone" | "pause", seconds)
+    out = []
+    for kind, seconds in parts:
+        out.append(_tone(rate, seconds) if kind == "tone" else np.zeros(int(rate * seconds), dtype=np.float32))
+    return np.concatenate(out)
+
+def test_trim_silence_keeps_padded_speech():
+    rate = 16000
+    samples = _speech_with_pauses(rate, [("pause", 2.0), ("tone", 1.0), ("pause", 3.0)])
+    trimmed = trim_silence(samples, rate, silence_db=35, pad_seconds=0.2)
+    assert abs(len(trimmed) / rate - 1.4) < 0.05
+    assert len(trim_silence(np.zeros(rate, dtype=np.float32), rate, silence_db=35)) == 0
+    assert len(trim_silence(samples[:0], rate, silence_db=35)) == 0
+
+def test_split_at_pauses_cuts_inside_pauses():
+    rate = 16000
+    samples = _speech_with_pauses(rate, [("tone", 8.0), ("pause", 0.5), ("tone", 8.0), ("pause", 0.5), ("tone", 8.0)])
+    ranges = split_at_pauses(samples, rate, max_seconds=10, min_pause_seconds=0.3, silence_db=35)
+    assert len(ranges) == 3
+    assert ranges[0][0] == 0 and ranges[-1][1] == len(samples)
+    assert all(a[1] == b[0] for a, b in zip(ranges, ranges[1:]))
+    for (_, end) in ranges[:-1]:
+        # The cut lands in a pause, not in the middle of a word
+        assert np.abs(samples[end - 100:end + 100]).max() == 0
+
+def test_split_at_pauses_falls_back_to_the_limit():
+    rate = 8000
+    samples = _tone(rate, seconds=25.0)
+    ranges = split_at_pauses(samples, rate, max_seconds=10, min_pause_seconds=0.3, silence_db=35)
+    assert [end - start for start, end in ranges] == [10 * rate, 10 * rate, 5 * rate]
+    assert split_at_pauses(samples[:rate], rate, 10, 0.3, 35) == [(0, rate)]